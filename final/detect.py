@@ -14,6 +14,7 @@ from extract import extract_features
 CAM_INDEX = 0
 MIN_DET_CONF = 0.9
 MIN_TRK_CONF = 0.6
+MAX_HANDS = 2   # ทุกมือที่เจอจะถูกจำแนกใน predict ครั้งเดียว
 
 # ต้องคงเดิมกี่เฟรมจึง “นับว่าเจอจริง”
 STABLE_FRAMES_REQUIRED = 5
@@ -51,7 +52,8 @@ class_labels = ["Fighting", "MiniHeart", "ILY", "FU", "Like"]
 # MediaPipe
 mp_hands = mp.solutions.hands
 mp_draw  = mp.solutions.drawing_utils
-hands = mp_hands.Hands(min_detection_confidence=MIN_DET_CONF,
+hands = mp_hands.Hands(max_num_hands=MAX_HANDS,
+                       min_detection_confidence=MIN_DET_CONF,
                        min_tracking_confidence=MIN_TRK_CONF)
 
 # ---------- Utils ----------
@@ -161,23 +163,41 @@ while True:
     results = hands.process(img_rgb)
 
     prediction_text = ""
+    hand_labels = []   # (มือที่, handedness, label) ของทุกมือ เรียงตามที่ MediaPipe เจอ
 
     if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
+        feats, rows = [], []
+        for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
             mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+            try:
+                side = results.multi_handedness[i].classification[0].label
+            except (TypeError, IndexError, AttributeError):
+                side = "?"
+            hand_labels.append((i, side, "error"))   # มือที่ keypoints ไม่ครบ 21 จุด คงเป็น "error"
             keypoints = [[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark]
             if len(keypoints) == 21:
-                try:
-                    feats = extract_features(keypoints).reshape(1, -1)
-                    pred = model.predict(feats)[0]
-                    prediction_text = class_labels[pred]
-                except Exception:
-                    prediction_text = "error"
-            break  # ใช้มือแรกพอ
-
-    # แสดงข้อความเล็ก ๆ มุมภาพ
-    if prediction_text:
-        cv2.putText(frame, f"Gesture: {prediction_text}", (10, 40),
+                feats.append(extract_features(keypoints))
+                rows.append(i)
+        if feats:
+            # ทุกมือใน predict ครั้งเดียว แล้ววางผลกลับตาม index ของมือ
+            try:
+                preds = model.predict(np.stack(feats))
+            except Exception:
+                preds = [-1] * len(feats)
+            for i, p in zip(rows, preds):
+                label = class_labels[p] if 0 <= p < len(class_labels) else "error"
+                hand_labels[i] = (i, hand_labels[i][1], label)
+        valid = [l for _, _, l in hand_labels if l != "error"]
+        # ท่าที่กำลังนับอยู่ยังอยู่ในมือไหนก็ได้ -> นับต่อ ; ไม่งั้นใช้มือแรกที่จำแนกได้
+        if last_label in valid:
+            prediction_text = last_label
+        else:
+            prediction_text = valid[0] if valid else "error"
+
+    # แสดงข้อความเล็ก ๆ มุมภาพ (มือที่ / ซ้าย-ขวา: ท่า)
+    if hand_labels:
+        text = " / ".join(f"{i + 1}.{side}: {label}" for i, side, label in hand_labels)
+        cv2.putText(frame, f"Gesture: {text}", (10, 40),
                     cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 2)
 
     # Debounce ให้ค่าคงเดิมก่อนยืนยัน
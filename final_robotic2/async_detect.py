@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# async_detect.py
+# detect.py แบบ asyncio: งานที่ block (อ่านกล้อง, MediaPipe + predict) อยู่ใน executor thread ที่จองไว้
+# ส่วน debounce / ส่งอีเวนต์ / เล่นเสียง / telemetry / control server เป็น coroutine บน event loop เดียว
+# ไม่มีการสร้าง thread ใหม่ต่ออีเวนต์: เสียงผ่าน backend ของ audio_output (stream หรือ Popen + reaper thread เดียว)
+#   python async_detect.py            (q / Ctrl+C / SIGTERM = ปิดอย่างเรียบร้อย)
+#   CONTROL_PORT=8765 python async_detect.py  แล้ว  echo stats | nc 127.0.0.1 8765
+import asyncio, json, os, signal, time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+
+import detect as D
+import audio_output as AO
+import visual_output as VO
+import telemetry
+from capture import LatestFrameCapture
+from debounce import format_ttt
+from events import Event, JsonlSink
+from hdmi_display import place_on_hdmi
+
+CONTROL_PORT = int(os.environ.get("CONTROL_PORT", 0))         # 0 = ไม่เปิด control server
+CONTROL_HOST = os.environ.get("CONTROL_HOST", "127.0.0.1")
+STATS_SEC    = float(os.environ.get("ASYNC_STATS_SEC", 10.0))  # พิมพ์สถิติทุกกี่วินาที (0 = ตอนจบเท่านั้น)
+HEADLESS     = os.environ.get("HEADLESS", "0") == "1"          # ไม่เปิดหน้าต่าง
+
+class App:
+    def __init__(self):
+        self.stop = asyncio.Event()
+        self.tel = telemetry.from_env()
+        self.model = D.load_model()
+        self.classify = D.make_classifier(self.model, self.tel)
+        self.rgb = D.CAPTURE_RGB and HEADLESS      # มีจอ = ต้องได้ BGR อยู่ดี ไม่แปลงไปกลับ
+        self.detector = D.make_detector(tel=self.tel, input_rgb=self.rgb)
+        self.debouncer = D.make_debouncer(self.model)
+        self.events = asyncio.Queue(maxsize=D.EVENT_QUEUE)
+        self.audio = asyncio.Queue(maxsize=D.EVENT_QUEUE)
+        self.event_log = JsonlSink(D.EVENT_LOG) if D.EVENT_LOG else None
+        # MediaPipe ต้องอยู่ thread เดิมเสมอ: executor 1 thread ต่อหน้าที่
+        self.capture_pool = ThreadPoolExecutor(1, thread_name_prefix="capture")
+        self.vision_pool = ThreadPoolExecutor(1, thread_name_prefix="vision")
+        self.cap = None
+        self.counters = {"frames": 0, "events": 0, "events_dropped": 0}
+        self.t_start = self._t_stats = time.monotonic()
+
+    # ---------- vision path ----------
+    def _infer(self, frame):
+        kps, handedness = self.detector.detect(frame)
+        return kps, self.classify(kps, handedness)
+
+    async def vision(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while not self.stop.is_set():
+                t = self.tel.start()
+                ok, frame = await loop.run_in_executor(self.capture_pool, self.cap.read)
+                self.tel.stop("read", t)
+                if not ok:
+                    print("[WARN] camera read failed")
+                    break
+                kps, hand_preds = await loop.run_in_executor(self.vision_pool, self._infer, frame)
+                self.counters["frames"] += 1
+
+                label = D.update_debouncer(self.debouncer, hand_preds)
+                if label:
+                    self.publish(label)
+
+                if not HEADLESS:
+                    D.draw_predictions(frame, kps, hand_preds)
+                    frame = VO.apply_overlay(frame)
+                    self.tel.draw_hud(frame)
+                    t = self.tel.start()
+                    cv2.imshow(D.WINDOW_NAME, frame)
+                    key = cv2.waitKey(1) & 0xFF
+                    self.tel.stop("imshow", t)
+                    if key == ord('q'):
+                        break
+                self.tel.frame()
+        finally:
+            self.stop.set()    # vision ตาย (exception) ก็ต้องปลุก run() ให้ปิดระบบ ไม่ค้างรอ stop
+
+    # ---------- events ----------
+    def publish(self, label, source="gesture"):
+        try:
+            self.events.put_nowait((label, time.monotonic(), source))
+        except asyncio.QueueFull:
+            self.counters["events_dropped"] += 1
+
+    async def dispatch(self):
+        while True:
+            label, t, source = await self.events.get()
+            self.counters["events"] += 1
+            VO.handle_event(label)
+            try:
+                self.audio.put_nowait(label)
+            except asyncio.QueueFull:
+                self.counters["events_dropped"] += 1
+            if self.event_log is not None:
+                self.event_log(Event(label, {"source": source}))
+            self.tel.record("event_dispatch", time.monotonic() - t)
+
+    async def audio_player(self):
+        while True:
+            label = await self.audio.get()
+            if AO.claim(label):
+                AO.play(label)
+
+    # ---------- side tasks ----------
+    async def stats(self):
+        while True:
+            await asyncio.sleep(1.0)
+            self.tel.maybe_flush()
+            if STATS_SEC > 0 and time.monotonic() - self._t_stats >= STATS_SEC:
+                self._t_stats = time.monotonic()
+                print(f"[ASYNC] {self.format_stats()}")
+
+    def format_stats(self):
+        c = self.counters
+        elapsed = max(time.monotonic() - self.t_start, 1e-9)
+        return (f"{c['frames']} frames ({c['frames'] / elapsed:.1f} FPS), {c['events']} events "
+                f"({c['events_dropped']} dropped), audio {AO.format_stats()}")
+
+    async def control(self, reader, writer):
+        # 1 บรรทัดต่อคำสั่ง: stats | fire <label> | quit
+        try:
+            while not self.stop.is_set():
+                line = await reader.readline()
+                if not line:
+                    break
+                cmd, _, arg = line.decode(errors="replace").strip().partition(" ")
+                if cmd == "stats":
+                    reply = dict(self.counters, audio=AO.stats(), debounce=self.debouncer.stats(),
+                                 telemetry=self.tel.summary() if self.tel.enabled else None)
+                elif cmd == "fire" and arg:
+                    self.publish(arg, source="control")
+                    reply = {"ok": True, "label": arg}
+                elif cmd == "quit":
+                    self.stop.set()
+                    reply = {"ok": True}
+                else:
+                    reply = {"error": f"unknown command: {cmd}"}
+                writer.write((json.dumps(reply) + "\n").encode())
+                await writer.drain()
+        finally:
+            writer.close()
+
+    # ---------- lifecycle ----------
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        VO.init_visual(D.ICON_MAP, display_sec=D.DISPLAY_DURATION_SEC, position=D.BANNER_POSITION, max_icon_w=300)
+        AO.init_audio(D.AUDIO_MAP)
+        cap = await loop.run_in_executor(self.capture_pool, D.open_camera)
+        if not cap or not cap.isOpened():
+            print("[ERROR] cannot open camera")
+            self.capture_pool.shutdown()
+            self.vision_pool.shutdown()
+            return
+        self.cap = LatestFrameCapture(cap, rgb=self.rgb).start()
+        if not HEADLESS:
+            place_on_hdmi(D.WINDOW_NAME)
+
+        server = None
+        if CONTROL_PORT:
+            server = await asyncio.start_server(self.control, CONTROL_HOST, CONTROL_PORT)
+            print(f"[INFO] control server on {CONTROL_HOST}:{CONTROL_PORT}")
+
+        tasks = [asyncio.create_task(coro, name=name) for name, coro in (
+            ("vision", self.vision()), ("dispatch", self.dispatch()), ("audio", self.audio_player()),
+            ("stats", self.stats()))]
+        try:
+            await self.stop.wait()
+        finally:
+            await self.shutdown(tasks, server)
+
+    async def shutdown(self, tasks, server):
+        self.stop.set()
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+        # vision จบเองเมื่อ stop ถูกตั้ง (รออ่าน/ตรวจเฟรมสุดท้ายให้เสร็จ) ที่เหลือ cancel ได้เลย
+        vision = tasks[0]
+        try:
+            try:
+                await asyncio.wait_for(vision, timeout=3.0)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            except Exception as e:
+                print(f"[ERROR] vision task failed: {e!r}")
+            for task in tasks[1:]:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            # ปล่อยกล้อง / executor / เสียงเสมอ แม้ขั้นบนจะพัง
+            self.cap.release()
+            self.capture_pool.shutdown(wait=True)
+            self.vision_pool.shutdown(wait=True)
+            AO.close_audio()                # รอเสียงที่กำลังเล่นจบก่อน (ไม่เกิน 2 s)
+            if self.event_log is not None:
+                self.event_log.close()
+            if not HEADLESS:
+                cv2.destroyAllWindows()
+
+        print(f"[INFO] {self.format_stats()}")
+
+        print(f"[INFO] debounce ({D.DEBOUNCE_MODE}): {format_ttt(self.debouncer.stats())}")
+        D.print_detector_stats(self.detector)
+        if self.tel.enabled:
+            print(f"[INFO] telemetry:\n{self.tel.format_summary()}")
+            self.tel.close()
+
+
+async def main():
+    await App().run()
+
+if __name__ == "__main__":
+    asyncio.run(main())
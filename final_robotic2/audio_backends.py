@@ -0,0 +1,374 @@
+# audio_backends.py
+# ช่องทางเล่นเสียงของ audio_output: ทุกแบบมี open() / play(label) / stats() / close()
+#   stream  = output stream เดียวเปิดค้าง (audio_engine.py)
+#   alsa    = aplay ต่ออีเวนต์ (ผ่าน VoiceManager)
+#   pulse   = paplay ต่ออีเวนต์ (ผ่าน VoiceManager)
+#   command = คำสั่งเอง (AUDIO_PLAYER_CMD) ต่ออีเวนต์
+#   file    = ไม่มีเสียงออก: จด timestamp ตอนเข้าคิว แล้วตอน close เขียน WAV ของทั้ง session
+#   null    = ไม่ทำอะไร (นับอย่างเดียว)
+# การตรวจว่าใช้ได้ (which / ตรวจ device) ทำครั้งเดียวใน open() ไม่ใช่ทุกอีเวนต์
+import json, os, re, shlex, shutil, subprocess, threading, time, wave
+from collections import deque
+
+import numpy as np
+
+def alsa_device_ok(device):
+    """Whether ALSA PCM `device` exists. hw:/plughw: are checked against
+    /proc/asound, other names against `aplay -L`. None if it cannot be told."""
+    if not device or device == "default":
+        return True
+    m = re.fullmatch(r"(?:plug)?hw:(?:CARD=)?([^,]+)(?:,(?:DEV=)?(\d+))?", device)
+    if m:
+        card, dev = m.group(1), m.group(2) or "0"
+        card_dir = f"/proc/asound/card{card}" if card.isdigit() else f"/proc/asound/{card}"
+        return os.path.exists(f"{card_dir}/pcm{dev}p")
+    if shutil.which("aplay") is None:
+        return None
+    try:
+        out = subprocess.run(["aplay", "-L"], capture_output=True, text=True, timeout=3.0).stdout
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    names = {line.strip() for line in out.splitlines() if line and not line[0].isspace()}
+    return device in names or device.split(":")[0] in {n.split(":")[0] for n in names}
+
+
+class VoiceManager:
+    """Bounded set of player processes for the per-event (spawn) backends.
+
+    request(label, wav) starts a player unless `label` is already playing
+    or queued (coalesced). With `max_voices` players running, `policy`
+    decides: "preempt" terminates the oldest, "drop" ignores the request,
+    "queue" keeps up to `max_queue` requests (oldest dropped) and starts
+    them as players finish. One reaper thread polls the players, so
+    finished ones are waited on (no zombies) and queued requests start.
+    request() returns False when the player could not be started (or the
+    manager is closed), so the caller can fall back to another backend; a
+    request dropped by `policy` is a deliberate limit and returns True.
+    """
+
+    def __init__(self, spawn, max_voices=2, policy="preempt", max_queue=4, poll_sec=0.05):
+        self.spawn = spawn            # wav -> Popen | None
+        self.max_voices = max_voices
+        self.policy = policy
+        self.max_queue = max_queue
+        self.poll_sec = poll_sec
+        self.active = []          # [(label, Popen)] เก่าสุดก่อน
+        self.stopping = []        # process ที่สั่ง terminate แล้ว รอ reap
+        self.queue = deque()      # [(label, wav)]
+        self.counters = {"requested": 0, "started": 0, "reaped": 0, "preempted": 0,
+                         "dropped": 0, "coalesced": 0, "failed": 0}
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._reaper, name="audio-reaper", daemon=True)
+        self._thread.start()
+
+    def _start(self, label, wav):
+        proc = self.spawn(wav)
+        if proc is None:
+            self.counters["failed"] += 1
+            return False
+        self.active.append((label, proc))
+        self.counters["started"] += 1
+        self._cond.notify()
+        return True
+
+    def _reap(self):
+        alive = [(l, p) for l, p in self.active if p.poll() is None]
+        stopping = [p for p in self.stopping if p.poll() is None]
+        self.counters["reaped"] += len(self.active) - len(alive) + len(self.stopping) - len(stopping)
+        self.active, self.stopping = alive, stopping
+        while self.queue and len(self.active) < self.max_voices:
+            self._start(*self.queue.popleft())
+
+    def request(self, label, wav):
+        with self._cond:
+            self.counters["requested"] += 1
+            if self._closed:
+                self.counters["dropped"] += 1
+                return False
+            self._reap()
+            if any(l == label for l, _ in self.active) or any(l == label for l, _ in self.queue):
+                self.counters["coalesced"] += 1
+                return True               # เล่นอยู่/รอเล่นอยู่แล้ว
+            if len(self.active) < self.max_voices:
+                return self._start(label, wav)
+            if self.policy == "preempt":
+                _, old = self.active.pop(0)
+                old.terminate()
+                self.stopping.append(old)
+                self.counters["preempted"] += 1
+                return self._start(label, wav)
+            if self.policy == "queue":
+                if len(self.queue) >= self.max_queue:
+                    self.queue.popleft()
+                    self.counters["dropped"] += 1
+                self.queue.append((label, wav))
+                return True
+            self.counters["dropped"] += 1
+            return True                   # ตั้งใจไม่เล่น (เต็ม) ไม่ใช่ backend เสีย -> ไม่ต้อง fallback
+
+    def _reaper(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self.active or self.stopping or self.queue or self._closed)
+                if self._closed:
+                    return
+                self._reap()
+            time.sleep(self.poll_sec)
+
+    def close(self, timeout=2.0):
+        """Let playing voices finish (up to `timeout`), then terminate the rest."""
+        with self._cond:
+            self._closed = True
+            self.queue.clear()
+            self._cond.notify()
+            procs = [p for _, p in self.active] + self.stopping
+            self.active, self.stopping = [], []
+        deadline = time.monotonic() + timeout
+        for p in procs:
+            try:
+                p.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                p.terminate()
+                p.wait()
+
+    def stats(self):
+        with self._cond:
+            return dict(self.counters, active=len(self.active), stopping=len(self.stopping),
+                        queued=len(self.queue))
+
+
+class Backend:
+    """Base: `clips` maps label -> WAV path (only files that exist)."""
+    name = "base"
+
+    def __init__(self, clips):
+        self.clips = clips
+
+    def open(self):
+        """Probe and start. False = not usable here, try the next backend."""
+        return True
+
+    def play(self, label):
+        """Start `label`. False = could not play (caller may fall back)."""
+        return False
+
+    def stats(self):
+        return {}
+
+    def describe(self):
+        return self.name
+
+    def close(self):
+        pass
+
+
+class NullBackend(Backend):
+    name = "null"
+
+    def __init__(self, clips):
+        super().__init__(clips)
+        self.played = 0
+
+    def play(self, label):
+        self.played += 1
+        return True
+
+    def stats(self):
+        return {"played": self.played}
+
+
+class SpawnBackend(Backend):
+    """One player process per event: `cmd` + [wav], through a VoiceManager."""
+    name = "spawn"
+
+    def __init__(self, clips, cmd, max_voices=2, policy="preempt"):
+        super().__init__(clips)
+        self.cmd = cmd
+        self.max_voices = max_voices
+        self.policy = policy
+        self.voices = None
+        self.error = None
+
+    def open(self):
+        if not self.cmd or shutil.which(self.cmd[0]) is None:
+            return False
+        self.voices = VoiceManager(self._spawn, self.max_voices, self.policy)
+        return True
+
+    def argv(self, wav):
+        return self.cmd + [wav]
+
+    def _spawn(self, wav):
+        try:
+            return subprocess.Popen(self.argv(wav), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            if self.error is None:    # แจ้งครั้งแรกครั้งเดียว ที่เหลือนับใน failed
+                self.error = e
+                print(f"[audio] {self.name}: {e}")
+            return None
+
+    def play(self, label):
+        wav = self.clips.get(label)
+        if wav is None or self.voices is None:
+            return False
+        return self.voices.request(label, wav)
+
+    def stats(self):
+        return self.voices.stats() if self.voices is not None else {}
+
+    def describe(self):
+        return f"{self.name} ({' '.join(self.cmd)} <wav>, {self.max_voices} voices, {self.policy})"
+
+    def close(self):
+        if self.voices is not None:
+            self.voices.close()
+            self.voices = None
+
+
+class AlsaBackend(SpawnBackend):
+    name = "alsa"
+
+    def __init__(self, clips, device=None, **kw):
+        super().__init__(clips, ["aplay", "-q"] + (["-D", device] if device else []), **kw)
+
+
+class PulseBackend(SpawnBackend):
+    name = "pulse"
+
+    def __init__(self, clips, **kw):
+        super().__init__(clips, ["paplay"], **kw)
+
+
+class CommandBackend(SpawnBackend):
+    """Player from a template, "{wav}" = file ("sleep 0.2" = stub without sound)."""
+    name = "command"
+
+    def __init__(self, clips, template, **kw):
+        super().__init__(clips, shlex.split(template), **kw)
+
+    def argv(self, wav):
+        return [a.replace("{wav}", wav) for a in self.cmd]
+
+    def describe(self):
+        return f"{self.name} ({' '.join(self.cmd)}, {self.max_voices} voices, {self.policy})"
+
+
+def _decode_clips(clips, rate=None):
+    """Decode every clip to one rate / channel count (the first file's)."""
+    from audio_engine import decode_wav
+    pcm, channels = {}, None
+    for label, path in clips.items():
+        try:
+            x, sr = decode_wav(path, rate, channels)
+        except Exception as e:
+            print(f"[audio] cannot decode {path}: {e}")
+            continue
+        rate, channels = sr, x.shape[1]
+        pcm[label] = x
+    return pcm, rate, channels
+
+
+class StreamBackend(Backend):
+    """Persistent output stream (audio_engine.AudioEngine)."""
+    name = "stream"
+
+    def __init__(self, clips, device=None, rate=None, lead_ms=30, cmd=None):
+        super().__init__(clips)
+        self.device = device
+        self.rate = rate
+        self.lead_ms = lead_ms
+        self.cmd = cmd                # None = aplay -t raw / pacat
+        self.engine = None
+
+    def open(self):
+        from audio_engine import AudioEngine
+        pcm, rate, channels = _decode_clips(self.clips, self.rate)
+        if not pcm:
+            return False
+        engine = AudioEngine(pcm, rate, channels, self.device, lead_ms=self.lead_ms, cmd=self.cmd)
+        if not engine.start():
+            return False
+        self.engine = engine
+        return True
+
+    def play(self, label):
+        return self.engine is not None and self.engine.play(label)
+
+    def stats(self):
+        return self.engine.stats() if self.engine is not None else {}
+
+    def describe(self):
+        if self.engine is None:
+            return self.name
+        return f"{self.name} ({' '.join(self.engine.proc.args)})"
+
+    def close(self):
+        if self.engine is not None:
+            self.engine.close()
+            self.engine = None
+
+
+class FileSinkBackend(Backend):
+    """No sound: records (monotonic time, label) at every play() and, on
+    close(), writes the session as a WAV (each clip mixed in at its enqueue
+    time) plus a JSONL of the enqueue timestamps next to it.
+
+    `events` stays readable in-process for headless latency/ordering checks.
+    """
+    name = "file"
+
+    def __init__(self, clips, path="audio_sink.wav", rate=None, max_sec=600.0):
+        super().__init__(clips)
+        self.path = path
+        self.rate = rate
+        self.max_sec = max_sec
+        self.events = []              # [(t_monotonic, label)]
+        self.t0 = None
+        self.pcm = {}
+
+    def open(self):
+        self.pcm, self.rate, self.channels = _decode_clips(self.clips, self.rate)
+        self.t0 = time.monotonic()
+        return bool(self.pcm)
+
+    def play(self, label):
+        if label not in self.pcm:
+            return False
+        self.events.append((time.monotonic(), label))
+        return True
+
+    def stats(self):
+        return {"played": len(self.events), "path": self.path}
+
+    def describe(self):
+        return f"{self.name} ({self.path})"
+
+    def render(self):
+        """Mix every recorded clip at its offset from open(); int16 (frames, ch)."""
+        if not self.events:
+            return np.zeros((0, self.channels or 1), dtype=np.int16)
+        limit = int(self.max_sec * self.rate)
+        end = max(int((t - self.t0) * self.rate) + len(self.pcm[l]) for t, l in self.events)
+        mix = np.zeros((min(end, limit), self.channels), dtype=np.int32)
+        for t, label in self.events:
+            start = int((t - self.t0) * self.rate)
+            if start >= len(mix):
+                continue
+            clip = self.pcm[label][:len(mix) - start]
+            mix[start:start + len(clip)] += clip
+        return np.clip(mix, -32768, 32767).astype(np.int16)
+
+    def close(self):
+        if self.t0 is None:
+            return
+        with wave.open(self.path, "wb") as w:
+            w.setnchannels(self.channels or 1)
+            w.setsampwidth(2)
+            w.setframerate(self.rate or 24000)
+            w.writeframes(self.render().tobytes())
+        with open(os.path.splitext(self.path)[0] + ".jsonl", "w") as fh:
+            for t, label in self.events:
+                fh.write(json.dumps({"t": t, "offset_ms": round(1e3 * (t - self.t0), 3),
+                                     "label": label}) + "\n")
+        self.t0 = None
@@ -0,0 +1,231 @@
+# audio_engine.py
+# เล่นเสียงผ่าน output stream เดียวที่เปิดค้างไว้ (aplay -t raw / pacat อ่าน PCM จาก stdin)
+# WAV ถูก decode เป็น int16 ตั้งแต่ตอน init: ตอนเกิดอีเวนต์แค่ใส่ buffer เข้าคิว
+# thread mixer ผสมเสียงที่กำลังเล่นทีละ period (ช่วงเงียบเขียน 0) แล้วเขียนเมื่อข้อมูลที่ค้างใน pipe
+# (player ยังไม่อ่าน) เหลือไม่เกิน lead_ms: จังหวะมาจากฝั่ง player/device ไม่ใช่นาฬิกาเครื่อง
+import fcntl, shutil, struct, subprocess, termios, threading, time, wave
+from collections import deque
+import numpy as np
+
+def decode_wav(path, rate=None, channels=None):
+    """Read a PCM WAV into an int16 array of shape (frames, channels).
+
+    Converts 8/24/32-bit samples to 16-bit; with `rate` / `channels` set,
+    resamples (linear) and up/down-mixes to match the output stream.
+    Returns (pcm, rate).
+    """
+    with wave.open(path, "rb") as w:
+        ch, width, sr, n = w.getnchannels(), w.getsampwidth(), w.getframerate(), w.getnframes()
+        raw = w.readframes(n)
+    if width == 1:
+        x = (np.frombuffer(raw, np.uint8).astype(np.int32) - 128) << 8
+    elif width == 2:
+        x = np.frombuffer(raw, "<i2").astype(np.int32)
+    elif width == 3:
+        b = np.frombuffer(raw, np.uint8).reshape(-1, 3).astype(np.int32)
+        x = ((b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8 >> 8) >> 8
+    elif width == 4:
+        x = np.frombuffer(raw, "<i4") >> 16
+    else:
+        raise ValueError(f"{path}: unsupported sample width {width}")
+    x = x.reshape(-1, ch)
+
+    if channels and channels != ch:
+        mono = x.mean(axis=1, keepdims=True)
+        x = np.repeat(mono, channels, axis=1) if channels > 1 else mono
+    if rate and rate != sr and len(x):
+        n_out = int(round(len(x) * rate / sr))
+        t_out = np.arange(n_out) * (sr / rate)
+        t_in = np.arange(len(x))
+        x = np.stack([np.interp(t_out, t_in, x[:, c]) for c in range(x.shape[1])], axis=1)
+        sr = rate
+    return np.clip(x, -32768, 32767).astype(np.int16), sr
+
+def stream_commands(rate, channels, device=None, buffer_ms=40):
+    """Long-lived raw PCM player commands, in order of preference."""
+    cmds = []
+    if shutil.which("aplay") is not None:
+        cmd = ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-r", str(rate), "-c", str(channels),
+               f"--buffer-time={buffer_ms * 1000}"]
+        if device:
+            cmd += ["-D", device]
+        cmds.append(cmd + ["-"])
+    if shutil.which("pacat") is not None:
+        cmds.append(["pacat", "--playback", "--raw", "--format=s16le", f"--rate={rate}",
+                     f"--channels={channels}", f"--latency-msec={buffer_ms}"])
+    return cmds
+
+
+class AudioEngine:
+    """Mix decoded clips into one persistent raw PCM stream.
+
+    play(key) only appends to a deque; the mixer thread picks new clips up at
+    the next period. The pipe to the player is shrunk to one page and a
+    period is only written once the bytes the player has not read yet
+    (FIONREAD) are under `lead_ms`, so a slow device open or clock drift
+    cannot pile up a backlog; writes also never run ahead of real time by
+    more than `lead_ms` (for players that read faster than real time).
+
+    Per clip, stats() reports trigger -> write and trigger -> play: the
+    write time plus the audio still queued in the pipe ahead of it. The
+    player's own buffer (`buffer_ms` for aplay/pacat) comes on top.
+    `failed` counts plays refused because the player is gone; `broken` is
+    set once a write to it failed.
+    """
+
+    def __init__(self, clips, rate, channels=1, device=None, period_ms=10, lead_ms=30,
+                 buffer_ms=40, max_voices=8, cmd=None, start_check_sec=0.2):
+        self.clips = clips            # key -> int16 (frames, channels)
+        self.rate = rate
+        self.channels = channels
+        self.device = device
+        self.period = max(1, int(rate * period_ms / 1000))
+        self.lead = lead_ms / 1000.0
+        self.buffer_ms = buffer_ms
+        self.max_voices = max_voices
+        self.cmd = cmd
+        self.start_check_sec = start_check_sec
+        self.proc = None
+        self.played = 0
+        self.dropped = 0
+        self.failed = 0
+        self.broken = False
+        self._pending = deque()
+        self._voices = []             # [pcm, pos]
+        self._mix = np.zeros((self.period, channels), dtype=np.int32)
+        self._out = np.zeros((self.period, channels), dtype=np.int16)
+        self._latency = deque(maxlen=1024)    # trigger -> write
+        self._play_latency = deque(maxlen=1024)  # trigger -> write + backlog ใน pipe
+        self._bytes_per_sec = rate * channels * 2
+        self._fd = None
+        self._wake = threading.Event()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        cmds = [self.cmd] if self.cmd else stream_commands(self.rate, self.channels, self.device, self.buffer_ms)
+        for cmd in cmds:
+            try:
+                proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.DEVNULL)
+            except OSError:
+                continue
+            try:
+                # player ที่เปิด device ไม่ได้ (ไม่มีการ์ด / device ผิด) จะออกทันที: ลองคำสั่งถัดไป
+                proc.wait(timeout=self.start_check_sec)
+            except subprocess.TimeoutExpired:
+                self.proc = proc
+                break
+            proc.stdin.close()
+        if self.proc is None:
+            return False
+        self._fd = self.proc.stdin.fileno()
+        try:
+            fcntl.fcntl(self._fd, fcntl.F_SETPIPE_SZ, 4096)   # pipe เล็กสุด (1 page)
+        except (AttributeError, OSError):
+            pass                                             # Python < 3.10 ไม่มี F_SETPIPE_SZ
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="audio-engine", daemon=True)
+        self._thread.start()
+        return True
+
+    @property
+    def alive(self):
+        return self._running and not self.broken and self.proc is not None and self.proc.poll() is None
+
+    def play(self, key):
+        """Queue a decoded clip. Returns False if the engine cannot play it."""
+        if key not in self.clips:
+            return False
+        if not self.alive:
+            self.failed += 1
+            return False
+        self._pending.append((key, time.monotonic()))
+        self._wake.set()
+        return True
+
+    def _render(self):
+        mix = self._mix
+        mix[:] = 0
+        keep = []
+        for voice in self._voices:
+            pcm, pos = voice
+            n = min(self.period, len(pcm) - pos)
+            mix[:n] += pcm[pos:pos + n]
+            voice[1] = pos + n
+            if voice[1] < len(pcm):
+                keep.append(voice)
+        self._voices = keep
+        np.clip(mix, -32768, 32767, out=mix)
+        self._out[:] = mix
+        return self._out.tobytes()
+
+    def _backlog(self):
+        """Seconds of audio written to the pipe but not read by the player yet."""
+        try:
+            n = struct.unpack("i", fcntl.ioctl(self._fd, termios.FIONREAD, b"\0\0\0\0"))[0]
+        except OSError:
+            return 0.0
+        return n / self._bytes_per_sec
+
+    def _run(self):
+        period_sec = self.period / self.rate
+        t_audio = time.monotonic()   # เวลาจริงที่ตรงกับตัวอย่างถัดไปที่จะเขียน
+        while self._running:
+            # รอจน player อ่านของที่ค้างเหลือไม่เกิน lead (player ยังเปิด device ไม่เสร็จ = รอที่นี่ ไม่สะสม)
+            backlog = self._backlog()
+            if backlog > self.lead:
+                time.sleep(min(backlog - self.lead, period_sec))
+                continue
+            new = []
+            while self._pending:
+                key, t = self._pending.popleft()
+                if len(self._voices) >= self.max_voices:
+                    self.dropped += 1
+                    continue
+                self._voices.append([self.clips[key], 0])
+                new.append(t)
+            data = self._render()
+            try:
+                self.proc.stdin.write(data)
+                self.proc.stdin.flush()
+            except (BrokenPipeError, OSError, ValueError):
+                self.broken = True
+                break
+            now = time.monotonic()
+            for t in new:
+                self._latency.append(now - t)
+                self._play_latency.append(now - t + backlog)
+                self.played += 1
+            # ตามทันเวลาจริงถ้าหลุด (เช่น player อ่านช้า) แล้วเขียนล่วงหน้าไม่เกิน lead
+            t_audio = max(t_audio, now - period_sec) + period_sec
+            sleep = t_audio - self.lead - time.monotonic()
+            if sleep > 0:
+                self._wake.wait(sleep)
+                self._wake.clear()
+
+    def stats(self):
+        out = {"played": self.played, "dropped": self.dropped, "failed": self.failed, "broken": self.broken,
+               "period_ms": 1e3 * self.period / self.rate, "lead_ms": 1e3 * self.lead}
+        for name, lat in (("trigger_to_write", self._latency), ("trigger_to_play", self._play_latency)):
+            if lat:
+                ms = np.asarray(lat) * 1e3
+                out.update({f"{name}_ms": float(ms.mean()), f"{name}_p50_ms": float(np.percentile(ms, 50)),
+                            f"{name}_p95_ms": float(np.percentile(ms, 95)), f"{name}_max_ms": float(ms.max())})
+        out["player_buffer_ms"] = self.buffer_ms
+        return out
+
+    def close(self):
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        if self.proc is not None:
+            try:
+                self.proc.stdin.close()
+            except OSError:
+                pass
+            try:
+                self.proc.wait(timeout=1.0)
+            except subprocess.TimeoutExpired:
+                self.proc.terminate()
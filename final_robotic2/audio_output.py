@@ -1,73 +1,136 @@
 # audio_output.py
-import os, time, threading, subprocess, shutil
+import os, shlex, time, threading
 from pathlib import Path
 
+import audio_backends as AB
+
 EVENT_COOLDOWN_SEC = 1.0
 
 # ★ ตั้งพอร์ตเสียง (หรือใช้ ENV: AUDIO_DEVICE) ★
 # ตัวอย่าง: "plughw:1,0" (USB ลำโพงพบบ่อย), หรือ "default"
 AUDIO_DEVICE = os.environ.get("AUDIO_DEVICE", "plughw:1,0")
 
+# ลำดับ backend ที่ลองตอน init_audio (ตัวแรกที่เปิดได้ = ตัวหลัก, ตัวถัดไป = สำรองถ้าตัวหลักเล่นไม่ได้)
+#   stream = output stream เดียวเปิดค้าง (audio_engine.py)   alsa = aplay ต่ออีเวนต์   pulse = paplay ต่ออีเวนต์
+#   command = AUDIO_PLAYER_CMD ต่ออีเวนต์   file = เขียนลง WAV (AUDIO_SINK_PATH) ไม่มีเสียงออก   null = เงียบ
+# ตั้ง AUDIO_PLAYER_CMD ไว้ (ไม่ได้ตั้ง AUDIO_BACKEND) = ใช้ command
+AUDIO_PLAYER_CMD = os.environ.get("AUDIO_PLAYER_CMD", "")  # เช่น "mpv --really-quiet {wav}" หรือ stub "sleep 0.2"
+AUDIO_BACKEND = os.environ.get("AUDIO_BACKEND", "command,null" if AUDIO_PLAYER_CMD else "stream,alsa,pulse,null")
+AUDIO_RATE = int(os.environ.get("AUDIO_RATE", 0))          # 0 = ใช้ rate ของไฟล์แรก
+AUDIO_LEAD_MS = float(os.environ.get("AUDIO_LEAD_MS", 30))  # stream: เขียนล่วงหน้าได้ไม่เกินกี่ ms
+AUDIO_SINK_PATH = os.environ.get("AUDIO_SINK_PATH", "audio_sink.wav")
+# stream: คำสั่งที่อ่าน raw PCM จาก stdin แทน aplay/pacat เช่น "cat" (loopback ไม่มีเสียง สำหรับ benchmark)
+AUDIO_STREAM_CMD = os.environ.get("AUDIO_STREAM_CMD", "")
+
+# เล่นแบบ spawn: จำกัดจำนวน player พร้อมกัน; เต็มแล้ว "preempt" (หยุดตัวเก่าสุด) | "drop" | "queue"
+AUDIO_MAX_VOICES = int(os.environ.get("AUDIO_MAX_VOICES", 2))
+AUDIO_VOICE_POLICY = os.environ.get("AUDIO_VOICE_POLICY", "preempt").lower()
+
 _AUDIO_MAP = {}
 _LAST_PLAY = {}
 _LOCK = threading.Lock()
+_BACKENDS = []      # [ตัวหลัก, สำรอง] เลือกครั้งเดียวใน init_audio
 DEBUG = os.environ.get("AUDIO_DEBUG", "0") == "1"
 
 def _abs(p: str) -> str:
     return str((Path(__file__).parent / p).resolve())
 
+def make_backend(name: str, clips: dict, device=None):
+    voices = {"max_voices": AUDIO_MAX_VOICES, "policy": AUDIO_VOICE_POLICY}
+    if name == "stream":
+        return AB.StreamBackend(clips, device, AUDIO_RATE or None, AUDIO_LEAD_MS,
+                                shlex.split(AUDIO_STREAM_CMD) or None)
+    if name == "alsa":
+        return AB.AlsaBackend(clips, device, **voices)
+    if name == "pulse":
+        return AB.PulseBackend(clips, **voices)
+    if name == "command":
+        return AB.CommandBackend(clips, AUDIO_PLAYER_CMD, **voices) if AUDIO_PLAYER_CMD else None
+    if name == "file":
+        return AB.FileSinkBackend(clips, AUDIO_SINK_PATH, AUDIO_RATE or None)
+    if name == "null":
+        return AB.NullBackend(clips)
+    raise ValueError(f"unknown audio backend: {name}")
+
 def init_audio(audio_map: dict):
-    global _AUDIO_MAP
+    global _AUDIO_MAP, _BACKENDS
+    close_audio()
+    _LAST_PLAY.clear()
     _AUDIO_MAP = {k: _abs(v) for k, v in audio_map.items()}
+    clips = {k: v for k, v in _AUDIO_MAP.items() if os.path.isfile(v)}
+    missing = sorted(set(_AUDIO_MAP) - set(clips))
+    if missing:
+        print(f"[audio] missing WAV for: {', '.join(missing)}")
+
+    device = AUDIO_DEVICE
+    if AB.alsa_device_ok(device) is False:
+        print(f"[audio] ALSA device {device} not found, using the default device")
+        device = None
+
+    for name in [n.strip() for n in AUDIO_BACKEND.split(",") if n.strip()]:
+        backend = make_backend(name, clips, device)
+        if backend is None or not backend.open():
+            if DEBUG: print(f"[audio] backend {name} not available")
+            continue
+        _BACKENDS.append(backend)
+        if len(_BACKENDS) == 2:
+            break
+    if not _BACKENDS:
+        _BACKENDS = [AB.NullBackend(clips)]
+    print(f"[audio] backend: {_BACKENDS[0].describe()}"
+          + (f", fallback {_BACKENDS[1].name}" if len(_BACKENDS) > 1 else ""))
     if DEBUG:
-        print(f"[audio] device={AUDIO_DEVICE}")
+        print(f"[audio] device={device}")
         print(f"[audio] map={_AUDIO_MAP}")
 
-def _try_aplay(wav_path: str) -> bool:
-    if shutil.which("aplay") is None:
-        if DEBUG: print("[audio] aplay not found")
-        return False
-    cmd = ["aplay", "-q"]
-    if AUDIO_DEVICE:
-        cmd += ["-D", AUDIO_DEVICE]
-    cmd += [wav_path]
-    try:
-        subprocess.Popen(cmd)
-        if DEBUG: print("[audio] aplay ->", " ".join(cmd))
-        return True
-    except Exception as e:
-        if DEBUG: print("[audio] aplay error:", e)
-        return False
+def backend():
+    """The backend chosen by init_audio (None before)."""
+    return _BACKENDS[0] if _BACKENDS else None
 
-def _try_paplay(wav_path: str) -> bool:
-    if shutil.which("paplay") is None:
-        if DEBUG: print("[audio] paplay not found")
-        return False
-    cmd = ["paplay", wav_path]
-    try:
-        subprocess.Popen(cmd)
-        if DEBUG: print("[audio] paplay ->", " ".join(cmd))
-        return True
-    except Exception as e:
-        if DEBUG: print("[audio] paplay error:", e)
-        return False
+def stats():
+    if not _BACKENDS:
+        return None
+    return dict(_BACKENDS[0].stats(), backend=_BACKENDS[0].name)
+
+def format_stats():
+    st = stats()
+    if not st:
+        return "audio off"
+    if "trigger_to_play_ms" in st:
+        return (f"{st['backend']}: {st['played']} played, trigger->play {st['trigger_to_play_ms']:.1f} ms "
+                f"(p95 {st['trigger_to_play_p95_ms']:.1f}) + player buffer {st['player_buffer_ms']} ms")
+    if "started" in st:
+        return (f"{st['backend']}: {st['started']} started, {st['coalesced']} coalesced, "
+                f"{st['preempted']} preempted, {st['dropped']} dropped, {st['failed']} failed, "
+                f"{st['reaped']} reaped, {st['active']} playing")
+    return f"{st['backend']}: {st.get('played', 0)} played"
 
-def _play(wav_path: str):
-    if not os.path.isfile(wav_path):
-        if DEBUG: print("[audio] file not found:", wav_path)
-        return
-    if not _try_aplay(wav_path):
-        _try_paplay(wav_path)
+def close_audio():
+    global _BACKENDS
+    for b in _BACKENDS:
+        b.close()
+    _BACKENDS = []
 
-def handle_event(label: str):
-    wav = _AUDIO_MAP.get(label)
-    if not wav:
+def claim(label: str) -> bool:
+    """Apply the per-label cooldown. True = the label should play now."""
+    if label not in _AUDIO_MAP:
         if DEBUG: print("[audio] label not in map:", label)
-        return
-    now = time.time()
+        return False
+    now = time.monotonic()
     with _LOCK:
-        last = _LAST_PLAY.get(label, 0.0)
-        if now - last < EVENT_COOLDOWN_SEC:
-            return
+        last = _LAST_PLAY.get(label)
+        if last is not None and now - last < EVENT_COOLDOWN_SEC:
+            return False
         _LAST_PLAY[label] = now
-    threading.Thread(target=_play, args=(wav,), daemon=True).start()
+    return True
+
+def play(label: str) -> bool:
+    """Play on the chosen backend, or the fallback if it cannot (non-blocking)."""
+    for b in _BACKENDS:
+        if b.play(label):
+            return True
+    return False
+
+def handle_event(label: str) -> bool:
+    """True = passed the cooldown and a backend took it."""
+    return claim(label) and play(label)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# bench_audio.py
+# วัด latency จาก AO.handle_event(label) ถึงตอนที่ข้อมูลเสียงถูกเขียนออก (ไม่ต้องมีการ์ดเสียง รันบน CI ได้)
+#   spawn  = backend "command" + player ปลอม (python -S) ที่จดเวลา exec / เปิดไฟล์+"device" / เขียนครั้งแรก
+#   stream = AudioEngine ผ่าน player ปลอมที่อ่าน pipe ตามเวลาจริง (แทน aplay) : trigger -> เขียน / -> ถึงคิวเล่น
+#   file   = FileSinkBackend : trigger -> enqueue + ตรวจลำดับ
+# ยิงอีเวนต์ตาม --rate (คงที่หรือ --poisson) และ --mix แล้วรายงาน p50/p95/max + ผลของ cooldown (EVENT_COOLDOWN_SEC)
+#   python bench_audio.py [--paths spawn,stream,file] [--rate 5] [--events 200] [--mix Fighting:3,ILY:1]
+#   python bench_audio.py --cooldown 0 --rate 50      (ไม่มี cooldown: ดู coalesce / preempt ตอนอีเวนต์ถี่)
+#   python bench_audio.py --real                      (บน Jetson: aplay จริง วัดได้ถึง spawn / write ของ stream)
+import argparse, os, random, sys, tempfile, threading, time, wave
+import numpy as np
+
+import audio_output as AO
+
+STUB = '''import os, sys, time
+t_exec = time.monotonic()
+wav, log, hold = sys.argv[1], sys.argv[2], float(sys.argv[3])
+f = open(wav, "rb")
+f.read(44)                              # header (แทน WAV parse)
+dev = open(os.devnull, "wb")            # แทน device open
+t_open = time.monotonic()
+dev.write(f.read(4096))
+dev.flush()
+t_write = time.monotonic()
+with open(log, "a") as fh:
+    fh.write(f"{os.getpid()} {t_exec} {t_open} {t_write}\\n")
+time.sleep(hold)                        # "เล่น" ค้างไว้ให้ voice manager ทำงานเหมือนจริง
+'''
+
+# อ่าน raw PCM จาก stdin ด้วยความเร็วเท่า device จริง (ไม่มี buffer ของตัวเอง) แทน aplay -t raw
+STREAM_STUB = '''import os, sys, time
+bytes_per_sec = int(sys.argv[1])
+chunk = max(2, bytes_per_sec // 200)     # 5 ms
+t_next = time.monotonic()
+while True:
+    data = os.read(0, chunk)
+    if not data:
+        break
+    t_next += len(data) / bytes_per_sec
+    d = t_next - time.monotonic()
+    if d > 0:
+        time.sleep(d)
+'''
+
+def stream_format(audio_map):
+    """(rate, channels) the stream engine will open: AUDIO_RATE or the first clip's."""
+    for path in audio_map.values():
+        path = AO._abs(path)
+        if os.path.isfile(path):
+            with wave.open(path, "rb") as w:
+                return AO.AUDIO_RATE or w.getframerate(), w.getnchannels()
+    return AO.AUDIO_RATE or 24000, 1
+
+def dist(xs):
+    if not len(xs):
+        return "n=0"
+    ms = np.asarray(xs) * 1e3
+    return (f"n={len(ms):<5d} p50 {np.percentile(ms, 50):7.2f}  p95 {np.percentile(ms, 95):7.2f}  "
+            f"max {ms.max():7.2f} ms")
+
+def parse_mix(mix, labels):
+    if not mix:
+        return labels, [1.0] * len(labels)
+    names, weights = [], []
+    for part in mix.split(","):
+        name, _, w = part.partition(":")
+        if name not in labels:
+            raise SystemExit(f"[ERROR] no clip for label {name} (have: {', '.join(labels)})")
+        names.append(name)
+        weights.append(float(w or 1))
+    return names, weights
+
+class SpawnProbe:
+    """Wraps the voice manager's spawn() to timestamp Popen per pid and link it to the trigger."""
+
+    def __init__(self, voices):
+        self.trigger = None           # ตั้งโดย driver ก่อน handle_event (thread หลัก)
+        self.spawns = {}              # pid -> (trigger | None, t_before, t_after)
+        self._spawn = voices.spawn
+        voices.spawn = self
+
+    def __call__(self, wav):
+        main = threading.current_thread() is threading.main_thread()
+        t0 = time.monotonic()
+        proc = self._spawn(wav)
+        t1 = time.monotonic()
+        if proc is not None:
+            # เริ่มจากคิว (reaper thread) ไม่ได้เกิดจาก trigger ตอนนั้นโดยตรง
+            self.spawns[proc.pid] = (self.trigger if main else None, t0, t1)
+        return proc
+
+def drive(labels, weights, n, rate, poisson, rng, probe=None):
+    calls = []        # (t_call, label, accepted, call_sec)
+    t_next = time.monotonic()
+    for _ in range(n):
+        delay = t_next - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        label = rng.choices(labels, weights)[0]
+        t = time.monotonic()
+        if probe is not None:
+            probe.trigger = t
+        ok = AO.handle_event(label)
+        calls.append((t, label, ok, time.monotonic() - t))
+        t_next += rng.expovariate(rate) if poisson else 1.0 / rate
+    return calls
+
+def report_cooldown(calls, cooldown):
+    accepted = [(t, l) for t, l, ok, _ in calls if ok]
+    last, gaps = {}, []
+    for t, label in accepted:
+        if label in last:
+            gaps.append(t - last[label])
+        last[label] = t
+    gap = f"{1e3 * min(gaps):.0f} ms" if gaps else "-"
+    print(f"  cooldown {1e3 * cooldown:.0f} ms: {len(accepted)}/{len(calls)} accepted, "
+          f"{len(calls) - len(accepted)} suppressed; min same-label gap {gap}")
+    print(f"  handle_event call     {dist([c for *_, c in calls])}")
+    if gaps and min(gaps) < cooldown - 1e-3:     # เวลาที่นี่จดก่อน claim() เล็กน้อย
+        print("  [FAIL] a label played again inside its cooldown")
+        return False
+    return True
+
+def bench_path(path, args, audio_map, tmp):
+    print(f"== {path}")
+    AO.EVENT_COOLDOWN_SEC = args.cooldown
+    AO.AUDIO_STREAM_CMD = ""
+    log = os.path.join(tmp, f"{path}.log")
+    if path == "spawn":
+        AO.AUDIO_BACKEND = "alsa" if args.real else "command"
+        stub = os.path.join(tmp, "stub_player.py")
+        with open(stub, "w") as fh:
+            fh.write(STUB)
+        AO.AUDIO_PLAYER_CMD = f"{sys.executable} -S {stub} {{wav}} {log} {args.hold}"
+    elif path == "stream":
+        AO.AUDIO_BACKEND = "stream"
+        if not args.real:
+            stub = os.path.join(tmp, "stub_stream.py")
+            with open(stub, "w") as fh:
+                fh.write(STREAM_STUB)
+            rate, channels = stream_format(audio_map)
+            AO.AUDIO_STREAM_CMD = f"{sys.executable} -S {stub} {rate * channels * 2}"
+    else:
+        AO.AUDIO_BACKEND = "file"
+        AO.AUDIO_SINK_PATH = os.path.join(tmp, "sink.wav")
+
+    t0 = time.monotonic()
+    AO.init_audio(audio_map)
+    t_init = time.monotonic() - t0
+    backend = AO.backend()
+    if backend.name == "null":
+        print(f"  [SKIP] {path} backend not available here")
+        return True
+    print(f"  init (decode + open) {1e3 * t_init:.1f} ms")
+    labels, weights = parse_mix(args.mix, list(backend.clips))
+    probe = SpawnProbe(backend.voices) if path == "spawn" else None
+
+    calls = drive(labels, weights, args.events, args.rate, args.poisson, random.Random(args.seed), probe)
+    ok = report_cooldown(calls, args.cooldown)
+
+    if path == "stream":
+        time.sleep(2 * AO.AUDIO_LEAD_MS / 1e3)   # ให้ period สุดท้ายถูกเขียน
+        st = AO.stats()
+        for name, key in (("write", "trigger_to_write"), ("play", "trigger_to_play")):
+            if f"{key}_ms" in st:
+                print(f"  trigger -> {name:<11s}n={st['played']:<5d} p50 {st[f'{key}_p50_ms']:7.2f}  "
+                      f"p95 {st[f'{key}_p95_ms']:7.2f}  max {st[f'{key}_max_ms']:7.2f} ms")
+        buf = f"{st['player_buffer_ms']} ms (aplay/pacat)" if args.real else "none for the stub"
+        print(f"  (play = write + audio still queued in the pipe; the player's own buffer is on top: {buf})")
+        print(f"  dropped (voices full) {st['dropped']}, failed (player gone) {st['failed']}"
+              + (", stream broken" if st["broken"] else ""))
+    elif path == "file":
+        events = backend.events
+        accepted = [(t, l) for t, l, a, _ in calls if a]
+        print(f"  trigger -> enqueue    {dist([te - tc for (te, _), (tc, _) in zip(events, accepted)])}")
+        in_order = [l for _, l in events] == [l for _, l in accepted]
+        print(f"  order {'ok' if in_order else 'MISMATCH'} ({len(events)} enqueued)")
+        ok = ok and in_order
+    voices = AO.stats() if path == "spawn" else None
+    AO.close_audio()
+
+    if path == "spawn":
+        child = {}
+        if os.path.isfile(log):
+            with open(log) as fh:
+                for line in fh:
+                    pid, *ts = line.split()
+                    child[int(pid)] = [float(t) for t in ts]
+        direct = [(pid, s) for pid, s in probe.spawns.items() if s[0] is not None]
+        print(f"  trigger -> Popen      {dist([t0 - tr for _, (tr, t0, _) in direct])}")
+        print(f"  Popen (fork/exec)     {dist([t1 - t0 for _, (_, t0, t1) in direct])}")
+        if child:
+            for i, name in enumerate(("exec", "open", "1st write")):
+                lat = [child[pid][i] - tr for pid, (tr, _, _) in direct if pid in child]
+                print(f"  trigger -> {name:<11s}{dist(lat)}")
+            print("  (exec includes the stub's python -S start-up; run --real on the device for aplay)")
+        elif not args.real:
+            print("  [WARN] stub player wrote no timestamps")
+        print(f"  voices: {voices['started']} started, {voices['coalesced']} coalesced, "
+              f"{voices['preempted']} preempted, {voices['dropped']} dropped, {voices['failed']} failed")
+    return ok
+
+def main():
+    ap = argparse.ArgumentParser(description="Trigger-to-sound latency benchmark for audio_output")
+    ap.add_argument("--paths", default="spawn,stream,file")
+    ap.add_argument("--rate", type=float, default=5.0, help="events per second")
+    ap.add_argument("--events", type=int, default=200)
+    ap.add_argument("--poisson", action="store_true", help="random (exponential) gaps instead of fixed")
+    ap.add_argument("--mix", default="", help="label weights, e.g. Fighting:3,ILY:1 (default: uniform)")
+    ap.add_argument("--cooldown", type=float, default=AO.EVENT_COOLDOWN_SEC, help="EVENT_COOLDOWN_SEC")
+    ap.add_argument("--hold", type=float, default=0.5, help="stub player: seconds a clip 'plays'")
+    ap.add_argument("--real", action="store_true", help="use aplay/pacat instead of the stand-ins")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    from detect import AUDIO_MAP
+    ok = True
+    with tempfile.TemporaryDirectory(prefix="bench_audio_") as tmp:
+        for path in [p.strip() for p in args.paths.split(",") if p.strip()]:
+            if path not in ("spawn", "stream", "file"):
+                raise SystemExit(f"[ERROR] unknown path: {path}")
+            ok = bench_path(path, args, AUDIO_MAP, tmp) and ok
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
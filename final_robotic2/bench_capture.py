@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# bench_capture.py
+# วัดเฟรมค้าง (stale backlog) ของ capture: จำลอง loop ที่ประมวลผลช้ากว่ากล้อง (sleep --work-ms)
+# แล้วนับว่า read() หลังจากนั้นคืนเฟรมทันที (มาจาก buffer เก่า) กี่ครั้งก่อนต้องรอเฟรมใหม่
+#   python bench_capture.py --source test [--fmt mjpeg] [--work-ms 100] [--iters 50]
+#   python bench_capture.py --source usb --device /dev/video0 --fmt mjpeg
+#   python bench_capture.py --source usb-opencv --index 0      (cv2.VideoCapture(index) แบบเดิม)
+import argparse, statistics, time
+import cv2
+
+import gst_pipeline as GST
+
+def open_source(args, tuned):
+    if args.source == "usb-opencv":
+        cap = cv2.VideoCapture(args.index)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, args.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, args.height)
+        cap.set(cv2.CAP_PROP_FPS, args.fps)
+        if tuned:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap, f"cv2.VideoCapture({args.index}) buffersize={'1' if tuned else 'default'}"
+    if args.source == "usb":
+        els = GST.usb_elements(args.device, args.width, args.height, args.fps, args.fmt, args.decoder, tuned)
+    elif args.source == "csi":
+        els = GST.csi_elements(0, args.width, args.height, args.fps, tuned=tuned)
+    else:
+        els = GST.test_elements(args.width, args.height, args.fps, fmt=args.fmt, tuned=tuned)
+    if args.probe and tuned:
+        for pad, caps in GST.probe_caps(els) or []:
+            print(f"  caps {pad}: {caps}")
+    return GST.open_pipeline(els)
+
+def measure(cap, work_sec, iters, period):
+    for _ in range(10):            # warm-up
+        cap.read()
+    stale, waits = [], []
+    for _ in range(iters):
+        time.sleep(work_sec)       # "ประมวลผล" ช้ากว่ากล้อง
+        n = 0
+        while True:
+            t0 = time.monotonic()
+            ok, _ = cap.read()
+            dt = time.monotonic() - t0
+            if not ok:
+                return stale, waits
+            if dt >= period / 2 or n > 100:
+                waits.append(dt)
+                break
+            n += 1                 # คืนทันที = เฟรมที่ค้างอยู่ใน buffer
+        stale.append(n)
+    return stale, waits
+
+def main():
+    ap = argparse.ArgumentParser(description="Capture stale-frame backlog benchmark")
+    ap.add_argument("--source", default="test", choices=["test", "usb", "csi", "usb-opencv"])
+    ap.add_argument("--device", default="/dev/video0")
+    ap.add_argument("--index", type=int, default=0)
+    ap.add_argument("--fmt", default="raw", help="test: raw|mjpeg, usb: mjpeg|yuyv")
+    ap.add_argument("--decoder", default="jpegdec")
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    ap.add_argument("--fps", type=int, default=30)
+    ap.add_argument("--work-ms", type=float, default=100.0)
+    ap.add_argument("--iters", type=int, default=50)
+    ap.add_argument("--probe", action="store_true", help="print negotiated caps (gst-launch-1.0 -v)")
+    args = ap.parse_args()
+    if args.source != "usb-opencv" and not GST.gstreamer_available():
+        print("[ERROR] this OpenCV build has no GStreamer support")
+        return
+    if args.source == "usb" and args.fmt == "raw":
+        args.fmt = "mjpeg"
+
+    period = 1.0 / args.fps
+    for tuned in (False, True):
+        cap, desc = open_source(args, tuned)
+        if not cap.isOpened():
+            print(f"[ERROR] cannot open: {desc}")
+            continue
+        w, h, fps = GST.describe_capture(cap)
+        stale, waits = measure(cap, args.work_ms / 1e3, args.iters, period)
+        cap.release()
+        if not stale:
+            print(f"[WARN] no frames: {desc}")
+            continue
+        print(f"{'tuned' if tuned else 'default':8s} {w}x{h}@{fps:.0f}  stale/iter mean {statistics.mean(stale):5.2f} "
+              f"max {max(stale):3d}  ~{1e3 * statistics.mean(stale) * period:6.1f} ms old  "
+              f"wait {1e3 * statistics.median(waits):5.1f} ms")
+        print(f"         {desc}")
+
+if __name__ == "__main__":
+    main()
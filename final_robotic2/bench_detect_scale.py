@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# bench_detect_scale.py
+# วัดผลของ DETECT_SCALE บนคลิปที่อัดไว้: latency ของ (resize + cvtColor + hands.process)
+# และ prediction ตรงกับตอนตรวจที่ความละเอียดเต็มแค่ไหน
+#   python bench_detect_scale.py clip1.mp4 [clip2.mp4 ...] [--scales 1,0.75,0.5,0.35,0.25] [--max-frames 300]
+import argparse, statistics, time
+import cv2
+import numpy as np
+
+import detect as D
+from landmarks import create_hands, HandDetector
+
+def read_frames(path, max_frames):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def run_clip(frames, scale, classify):
+    # Hands ใหม่ทุกรอบ เพื่อให้ tracking state ไม่ข้ามระหว่าง scale
+    det = HandDetector(create_hands(D.MAX_HANDS, D.MIN_DET_CONF, D.MIN_TRK_CONF), D.MAX_HANDS, scale)
+    labels, times = [], []
+    for frame in frames:
+        t0 = time.perf_counter()
+        kps, handedness = det.detect(frame)
+        times.append(time.perf_counter() - t0)
+        labels.append(tuple(sorted(D.valid_labels(classify(kps, handedness)))))
+    det.hands.close()
+    return labels, times, det.size
+
+def main():
+    ap = argparse.ArgumentParser(description="Detection-resolution benchmark on recorded clips")
+    ap.add_argument("clips", nargs="+")
+    ap.add_argument("--scales", default="1,0.75,0.5,0.35,0.25")
+    ap.add_argument("--max-frames", type=int, default=300)
+    args = ap.parse_args()
+    # 1.0 ต้องมาก่อนเสมอ (ใช้เป็น reference)
+    scales = sorted({float(s) for s in args.scales.split(",")} | {1.0}, reverse=True)
+
+    classify = D.make_classifier(D.load_model())
+    print(f"{'clip':24s} {'scale':>5s} {'size':>10s} {'p50 ms':>7s} {'p95 ms':>7s} "
+          f"{'hand %':>7s} {'agree':>6s}")
+    for clip in args.clips:
+        frames = read_frames(clip, args.max_frames)
+        if not frames:
+            print(f"[WARN] no frames in {clip}")
+            continue
+        ref = None
+        for scale in scales:
+            labels, times, size = run_clip(frames, scale, classify)
+            if scale == 1.0:
+                ref = labels
+            ms = sorted(t * 1e3 for t in times)
+            agree = np.mean([a == b for a, b in zip(labels, ref)])
+            hand_rate = np.mean([bool(l) for l in labels]) * 100
+            print(f"{clip[-24:]:24s} {scale:5.2f} {size[0]:>4d}x{size[1]:<5d} {statistics.median(ms):7.1f} "
+                  f"{ms[int(0.95 * (len(ms) - 1))]:7.1f} {hand_rate:6.1f}% {agree:6.3f}")
+
+if __name__ == "__main__":
+    main()
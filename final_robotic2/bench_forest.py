@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# bench_forest.py
+# เทียบ latency ระหว่าง sklearn predict กับ FastForest (และเช็คว่าผลตรงกัน)
+# usage: python bench_forest.py [model.pkl] [dataset.npz|.csv]   (dataset = ชุดเดียวกับ distill.py; ไม่ใส่ = feature สุ่ม)
+import sys, time, joblib
+import numpy as np
+
+from extract import extract_features_batch
+from forest import FastForest
+
+MODEL_PATH = sys.argv[1] if len(sys.argv) >= 2 else "gesture_model.pkl"
+DATA_PATH  = sys.argv[2] if len(sys.argv) >= 3 else None
+
+def _time_per_call(fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n
+
+def main():
+    model = joblib.load(MODEL_PATH)
+    fast = FastForest.from_sklearn(model)
+    print(f"[INFO] {MODEL_PATH}: {fast.n_estimators} trees, {len(fast.feature)} nodes, depth {fast.max_depth}")
+
+    if DATA_PATH:
+        from convert_model import DEFAULT_LABELS
+        from distill import load_dataset
+        X = load_dataset(DATA_PATH, DEFAULT_LABELS.split(","))[0]
+        print(f"[INFO] {DATA_PATH}: {len(X)} samples")
+    else:
+        rng = np.random.default_rng(0)
+        X = extract_features_batch(rng.random((2000, 21, 3)))
+
+    same_label = np.array_equal(model.predict(X), fast.predict(X))
+    max_diff = np.abs(model.predict_proba(X) - fast.predict_proba(X)).max()
+    print(f"[CHECK] labels equal: {same_label}, max |proba diff|: {max_diff:.2e}")
+
+    x = X[:1]
+    sk_one   = _time_per_call(lambda: model.predict(x), 100)
+    fast_one = _time_per_call(lambda: fast.predict(x), 2000)
+    sk_batch   = _time_per_call(lambda: model.predict(X), 5) / len(X)
+    fast_batch = _time_per_call(lambda: fast.predict(X), 5) / len(X)
+    print(f"single : sklearn {sk_one*1e6:9.1f} us   fast {fast_one*1e6:9.1f} us   x{sk_one/fast_one:.0f}")
+    print(f"batch  : sklearn {sk_batch*1e6:9.1f} us/row  fast {fast_batch*1e6:9.1f} us/row")
+    # มือหลายมือในเฟรมเดียว: predict_proba ครั้งเดียว (lockstep) เทียบกับเรียกทีละมือ
+    for h in (2, 4):
+        both = _time_per_call(lambda: fast.predict_proba(X[:h]), 1000)
+        each = _time_per_call(lambda: [fast.predict_proba(X[i:i + 1]) for i in range(h)], 1000)
+        print(f"hands={h}: one call {both*1e6:7.1f} us   {h} calls {each*1e6:7.1f} us   x{each/both:.2f}")
+
+    # early-exit: จำนวนต้นที่ต้องเดินจริง ผลตรงกับ predict แค่ไหน และเวลาเฉลี่ยเทียบ predict_one บนชุดเดียวกัน
+    # (feature สุ่มทำให้ป่าลังเล -> เกือบทุกต้น; "first block" = กรณีดีสุดที่ท่าชัดจนหยุดหลัง block แรก)
+    # ใช้ dataset จริงเพื่อดูว่า early-exit คุ้มไหมก่อนเปิดใน detect.py
+    ref = fast.predict(X)
+    xs = X[:300]
+    t_one = _time_per_call(lambda: [fast.predict_one(x) for x in xs], 5) / len(xs)
+    print(f"early  : {'predict_one':12s} {'':29s}{t_one*1e6:7.1f} us")
+    for name, margin in (("exact", None), ("approx m=10", 10), ("approx m=20", 20), ("first block", 0)):
+        res = [fast.predict_one_early(x, margin=margin) for x in X]
+        agree = np.mean([lbl == r for (lbl, _), r in zip(res, ref)])
+        trees = np.mean([n for _, n in res])
+        t = _time_per_call(lambda: [fast.predict_one_early(x, margin=margin) for x in xs], 5) / len(xs)
+        print(f"early  : {name:12s} avg trees {trees:5.1f}/{fast.n_estimators}  agree {agree:.4f}  {t*1e6:7.1f} us"
+              f"  (x{t_one / t:.2f} vs predict_one)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# bench_model_load.py
+# วัดเวลา cold start ของการโหลดโมเดล: joblib.load(pkl) vs load_forest(npz)
+# แต่ละรอบรันใน process ใหม่ (รวมเวลา import) เพื่อให้ใกล้กับตอนเปิด detect.py จริง
+#   python bench_model_load.py [gesture_model.pkl] [gesture_model.npz] [runs]
+import os, sys, time, subprocess, statistics
+
+PKL  = sys.argv[1] if len(sys.argv) >= 2 else "gesture_model.pkl"
+NPZ  = sys.argv[2] if len(sys.argv) >= 3 else os.path.splitext(PKL)[0] + ".npz"
+RUNS = int(sys.argv[3]) if len(sys.argv) >= 4 else 5
+
+_SNIPPETS = {
+    "joblib.load (sklearn pickle)":
+        "import joblib; m = joblib.load({path!r}); m.predict([[0.0] * m.n_features_in_])",
+    "load_forest (compact, mmap)":
+        "from forest import load_forest; m = load_forest({path!r}); m.predict([[0.0] * 27])",
+}
+
+def _run(code):
+    # จับเวลาจากฝั่งแม่ เพื่อรวมเวลา start interpreter + import ด้วย
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-W", "ignore", "-c", code], check=True,
+                   cwd=os.path.dirname(os.path.abspath(__file__)))
+    return time.perf_counter() - t0
+
+def main():
+    if not os.path.isfile(NPZ):
+        print(f"[ERROR] {NPZ} not found, run: python convert_model.py {PKL} {NPZ}")
+        sys.exit(1)
+    base = statistics.median(_run("pass") for _ in range(RUNS))
+    print(f"interpreter start: {base*1e3:7.1f} ms (median of {RUNS})")
+    for name, path in (("joblib.load (sklearn pickle)", PKL), ("load_forest (compact, mmap)", NPZ)):
+        code = _SNIPPETS[name].format(path=os.path.abspath(path))
+        times = [_run(code) for _ in range(RUNS)]
+        med = statistics.median(times)
+        print(f"{name:30s}: {med*1e3:7.1f} ms total, {(med-base)*1e3:7.1f} ms over bare start "
+              f"(min {min(times)*1e3:.1f}, max {max(times)*1e3:.1f})")
+
+if __name__ == "__main__":
+    main()
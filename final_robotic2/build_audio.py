@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# build_audio.py
+# เตรียมไฟล์เสียงล่วงหน้า (offline) ให้ตรงกับ output device: ตอนรันไม่ต้อง resample (plughw / audio_engine)
+# - แปลง rate / channels เป็นค่าจริงของ device (อ่านจาก /proc/asound หรือ aplay --dump-hw-params) เป็น S16_LE
+# - ตัดช่วงเงียบหัว/ท้าย (gTTS มีเงียบนำหน้า -> เสียงออกช้ากว่าอีเวนต์)
+# - ปรับความดังให้เท่ากันทุกไฟล์ (RMS ของช่วงที่มีเสียง, จำกัด peak)
+# - เขียน manifest.json (duration, ตัดไปกี่ ms, gain) ; detect.py ใช้ไฟล์ใน audio_native/ เฉพาะ label ที่อยู่ใน manifest
+#   python build_audio.py                       (device จาก AUDIO_DEVICE, ไฟล์จาก detect.AUDIO_MAP)
+#   python build_audio.py --rate 48000 --channels 2 --threshold-db -45 --target-db -18
+import argparse, json, re, subprocess, wave
+from pathlib import Path
+import numpy as np
+
+from audio_engine import decode_wav
+
+HERE = Path(__file__).parent
+OUT_DIR = "audio_native"
+FALLBACK_FORMAT = (48000, 2)     # ค่าที่ USB/HDMI ส่วนใหญ่รับได้ตรง ๆ
+
+def _hw(device):
+    m = re.fullmatch(r"(?:plug)?hw:(?:CARD=)?([^,]+)(?:,(?:DEV=)?(\d+))?", device or "")
+    return (m.group(1), m.group(2) or "0") if m else None
+
+def probe_device_format(device):
+    """(rate, channels) the ALSA device plays natively, or None if unknown."""
+    hw = _hw(device)
+    if hw is None:
+        return None
+    card, dev = hw
+    card_dir = Path(f"/proc/asound/card{card}" if card.isdigit() else f"/proc/asound/{card}")
+    # USB audio: stream0 มีรายการ format ที่ device รองรับจริง
+    stream = card_dir / "stream0"
+    if stream.is_file():
+        text = stream.read_text().split("Capture:")[0]
+        rates = re.search(r"Rates:\s*([\d, ]+)", text)
+        chans = re.search(r"Channels:\s*(\d+)", text)
+        if rates and chans:
+            rates = [int(r) for r in re.findall(r"\d+", rates.group(1))]
+            return (48000 if 48000 in rates else max(rates)), int(chans.group(1))
+    try:
+        out = subprocess.run(["aplay", "-D", f"hw:{card},{dev}", "--dump-hw-params", "-d", "1", "/dev/zero"],
+                             capture_output=True, text=True, timeout=5.0)
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    text = out.stdout + out.stderr
+    rate = re.search(r"^RATE:\s*\[?(\d+)(?:\s+(\d+))?", text, re.M)
+    chans = re.search(r"^CHANNELS:\s*\[?(\d+)", text, re.M)
+    if not rate or not chans:
+        return None
+    lo, hi = int(rate.group(1)), int(rate.group(2) or rate.group(1))
+    return (48000 if lo <= 48000 <= hi else hi), int(chans.group(1))
+
+def resample(x, src, dst):
+    """float (frames, ch) -> rate dst. Polyphase (scipy) if available, else linear."""
+    if src == dst or not len(x):
+        return x
+    try:
+        from scipy.signal import resample_poly
+    except ImportError:
+        n_out = int(round(len(x) * dst / src))
+        t_out = np.arange(n_out) * (src / dst)
+        return np.stack([np.interp(t_out, np.arange(len(x)), x[:, c]) for c in range(x.shape[1])], axis=1)
+    g = np.gcd(src, dst)
+    return resample_poly(x, dst // g, src // g, axis=0)
+
+def frame_db(x, rate, frame_ms=10):
+    """RMS level per frame_ms block in dBFS (x float, full scale = 1.0)."""
+    n = max(1, int(rate * frame_ms / 1000))
+    blocks = len(x) // n
+    if not blocks:
+        return np.full(1, -120.0), n
+    e = (x[:blocks * n] ** 2).reshape(blocks, n, -1).mean(axis=(1, 2))
+    return 10 * np.log10(e + 1e-12), n
+
+def process(x, rate, threshold_db=-45.0, pad_ms=20.0, target_db=-18.0, peak_db=-1.0, fade_ms=5.0):
+    """Trim leading/trailing blocks below threshold_db, then gain so that
+    the RMS of the blocks above threshold is target_db, capped so the peak
+    stays under peak_db. Returns (x, info)."""
+    db, n = frame_db(x, rate)
+    loud = np.flatnonzero(db > threshold_db)
+    if not len(loud):
+        return x, {"trim_lead_ms": 0.0, "trim_tail_ms": 0.0, "gain_db": 0.0, "silent": True}
+    pad = int(rate * pad_ms / 1000)
+    start = max(0, loud[0] * n - pad)
+    end = min(len(x), (loud[-1] + 1) * n + pad)
+    info = {"trim_lead_ms": 1e3 * start / rate, "trim_tail_ms": 1e3 * (len(x) - end) / rate}
+    y = x[start:end].copy()
+
+    # fade สั้น ๆ ตรงรอยตัด กันเสียงคลิก
+    f = min(int(rate * fade_ms / 1000), len(y) // 2)
+    if f:
+        ramp = np.linspace(0.0, 1.0, f)[:, None]
+        y[:f] *= ramp
+        y[-f:] *= ramp[::-1]
+
+    rms_db = 10 * np.log10(np.mean(10 ** (db[loud] / 10)) + 1e-12)
+    peak = np.abs(y).max()
+    gain_db = target_db - rms_db
+    if peak > 0:
+        gain_db = min(gain_db, peak_db - 20 * np.log10(peak))
+    y *= 10 ** (gain_db / 20)
+    info.update(gain_db=float(gain_db), rms_db=float(rms_db + gain_db),
+                peak_db=float(20 * np.log10(np.abs(y).max() + 1e-12)))
+    return y, info
+
+def write_wav(path, x, rate):
+    pcm = np.clip(np.round(x * 32767), -32768, 32767).astype("<i2")
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(x.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+
+def main():
+    from detect import AUDIO_MAP
+    import audio_output as AO
+    ap = argparse.ArgumentParser(description="Convert AUDIO_MAP WAVs to the output device's native format")
+    ap.add_argument("--device", default=AO.AUDIO_DEVICE, help="ALSA device to probe (default: AUDIO_DEVICE)")
+    ap.add_argument("--rate", type=int, default=0, help="override the probed rate")
+    ap.add_argument("--channels", type=int, default=0, help="override the probed channel count")
+    ap.add_argument("--src", default="audio", help="source dir (file names from AUDIO_MAP)")
+    ap.add_argument("--out", default=OUT_DIR)
+    ap.add_argument("--threshold-db", type=float, default=-45.0, help="silence below this RMS (dBFS, 10 ms blocks)")
+    ap.add_argument("--pad-ms", type=float, default=20.0, help="keep this much before/after the sound")
+    ap.add_argument("--target-db", type=float, default=-18.0, help="RMS of the non-silent part (dBFS)")
+    ap.add_argument("--peak-db", type=float, default=-1.0)
+    args = ap.parse_args()
+
+    probed = probe_device_format(args.device)
+    rate, channels = probed or FALLBACK_FORMAT
+    rate, channels = args.rate or rate, args.channels or channels
+    print(f"[INFO] {args.device}: {'probed' if probed else 'not found, default'} {probed or FALLBACK_FORMAT}"
+          f" -> writing S16_LE {rate} Hz x{channels}")
+
+    src, out = HERE / args.src, HERE / args.out
+    out.mkdir(parents=True, exist_ok=True)
+    manifest = {"rate": rate, "channels": channels, "format": "S16_LE", "device": args.device,
+                "threshold_db": args.threshold_db, "target_db": args.target_db, "clips": {}}
+    for label, rel in AUDIO_MAP.items():
+        name = Path(rel).name
+        path = src / name
+        if not path.is_file():
+            print(f"[WARN] {label}: {path} not found")
+            continue
+        pcm, sr = decode_wav(str(path))
+        x = pcm.astype(np.float64) / 32768.0
+        dur_in = len(x) / sr
+        if x.shape[1] != channels:
+            mono = x.mean(axis=1, keepdims=True)
+            x = np.repeat(mono, channels, axis=1) if channels > 1 else mono
+        x = resample(x, sr, rate)
+        x, info = process(x, rate, args.threshold_db, args.pad_ms, args.target_db, args.peak_db)
+        write_wav(out / name, x, rate)
+        entry = {"file": name, "source": f"{args.src}/{name}", "source_rate": sr,
+                 "duration_ms": round(1e3 * len(x) / rate, 1), "source_duration_ms": round(1e3 * dur_in, 1)}
+        entry.update({k: round(v, 2) if isinstance(v, float) else v for k, v in info.items()})
+        manifest["clips"][label] = entry
+        print(f"  {label:10s} {sr} Hz {dur_in * 1e3:6.0f} ms -> {entry['duration_ms']:6.0f} ms  "
+              f"lead -{info['trim_lead_ms']:4.0f} ms  tail -{info['trim_tail_ms']:4.0f} ms  "
+              f"gain {info['gain_db']:+5.1f} dB")
+
+    with open(out / "manifest.json", "w") as fh:
+        json.dump(manifest, fh, indent=2, ensure_ascii=False)
+    print(f"[INFO] wrote {len(manifest['clips'])} clips + manifest.json to {out}")
+
+if __name__ == "__main__":
+    main()
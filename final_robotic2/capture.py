@@ -0,0 +1,139 @@
+# capture.py
+# อ่านกล้องบน thread แยก เก็บเฉพาะเฟรมล่าสุด (single slot)
+# ถ้าฝั่งประมวลผลช้ากว่ากล้อง เฟรมเก่าจะถูกทิ้งแทนที่จะค้างอยู่ใน buffer ของ driver
+import threading, time
+import cv2
+import numpy as np
+
+class LatestFrameCapture:
+    """Wrap a cv2.VideoCapture and always hand out the newest frame.
+
+    A reader thread calls `cap.read()` as fast as the camera delivers and
+    overwrites a single slot. `read()` is a drop-in for VideoCapture.read();
+    `read_frame()` also returns the capture timestamp (time.monotonic) and a
+    frame id. Frames overwritten before anyone consumed them count as dropped.
+
+    With rgb=True frames are converted BGR->RGB on the reader thread into a
+    ring of 3 preallocated buffers (one being written, the latest, the one
+    the consumer holds), so the consumer gets the format MediaPipe wants
+    without a conversion or allocation on its side. Only worth it when the
+    frame is neither displayed (BGR) nor downscaled before detection.
+
+    `read()` only reports failure once the reader has stopped (end of stream,
+    camera error or release()); a slow frame just makes it wait longer, in
+    `read_timeout` second steps.
+    """
+
+    def __init__(self, cap, name="capture", rgb=False, read_timeout=2.0):
+        self.cap = cap
+        self.name = name
+        self.rgb = rgb
+        self.read_timeout = read_timeout
+        self._bufs = None
+        self._held = -1            # index ของ buffer ที่ฝั่ง consumer ถืออยู่
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.last_timestamp = 0.0
+        self.last_frame_id = -1
+        self._cond = threading.Condition()
+        self._slot = None          # (frame, timestamp, frame_id)
+        self._consumed_id = -1
+        self._running = False
+        self._eof = False          # reader thread ออกแล้ว (ไม่มีเฟรมใหม่อีก)
+        self._release_on_exit = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._reader, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def _to_rgb(self, frame):
+        if self._bufs is None or self._bufs[0].shape != frame.shape:
+            self._bufs = [np.empty_like(frame) for _ in range(3)]
+        with self._cond:
+            latest = self._slot[3] if self._slot is not None else -1
+            idx = next(i for i in range(3) if i != latest and i != self._held)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._bufs[idx])
+        return self._bufs[idx], idx
+
+    def _reader(self):
+        try:
+            self._read_loop()
+        finally:
+            with self._cond:
+                self._eof = True
+                self._cond.notify_all()
+                release = self._release_on_exit
+            if release:
+                self.cap.release()
+
+    def _read_loop(self):
+        while self._running:
+            ok, frame = self.cap.read()
+            ts = time.monotonic()
+            idx = -1
+            if ok and self.rgb:
+                frame, idx = self._to_rgb(frame)
+            with self._cond:
+                if not ok:
+                    return
+                if self._slot is not None and self._slot[2] != self._consumed_id:
+                    self.frames_dropped += 1
+                self._slot = (frame, ts, self.frames_read, idx)
+                self.frames_read += 1
+                self._cond.notify_all()
+
+    def read_frame(self, timeout=None):
+        """Block until a frame newer than the last one returned is available
+        (at most `timeout`, default read_timeout, seconds).
+
+        Returns (ok, frame, timestamp, frame_id).
+        """
+        timeout = self.read_timeout if timeout is None else timeout
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self._eof or (self._slot is not None and self._slot[2] != self._consumed_id),
+                timeout)
+            if not ready or self._slot is None or self._slot[2] == self._consumed_id:
+                return False, None, 0.0, -1
+            frame, ts, fid, self._held = self._slot
+            self._consumed_id = fid
+        self.last_timestamp, self.last_frame_id = ts, fid
+        return True, frame, ts, fid
+
+    def stopped(self):
+        """True once no more frames can arrive (reader exited or release() called)."""
+        with self._cond:
+            return self._eof or self._thread is None or not self._running
+
+    def read(self):
+        while True:
+            ok, frame, _, _ = self.read_frame()
+            if ok or self.stopped():
+                return ok, frame
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def stats(self):
+        return {"read": self.frames_read, "dropped": self.frames_dropped,
+                "delivered": self.frames_read - self.frames_dropped}
+
+    def release(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            with self._cond:
+                if not self._eof:
+                    # reader ยังค้างใน cap.read(): release ตอนนี้ชนกับ read -> ให้ reader release เองตอนออก
+                    self._release_on_exit = True
+                    print(f"[WARN] {self.name}: reader still in cap.read(), releasing when it returns")
+                    return
+            self._thread = None
+        self.cap.release()
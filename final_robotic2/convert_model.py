@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# convert_model.py
+# แปลง gesture_model.pkl (sklearn) -> gesture_model.npz (FastForest, mmap ได้, ไม่ต้องใช้ sklearn ตอนรัน)
+#   python convert_model.py [gesture_model.pkl] [gesture_model.npz] [--labels Fighting,MiniHeart,...] [--force]
+import argparse, os
+import joblib
+import numpy as np
+
+from extract import FEATURE_LAYOUT_VERSION
+from forest import FastForest, save_forest, load_forest
+
+# class 5 ของ gesture_model.pkl คือท่าที่ไม่ใช่ท่าไหน (detect.py แสดงเป็น "error")
+DEFAULT_LABELS = "Fighting,MiniHeart,ILY,FU,Like,error"
+
+def check_labels(labels, classes, force=False):
+    """Exit unless there is one label per class (--force only warns)."""
+    if len(labels) == len(classes):
+        return
+    msg = f"{len(labels)} labels for {len(classes)} classes {list(classes)}"
+    if not force:
+        raise SystemExit(f"[ERROR] {msg} (fix --labels, or --force to write anyway)")
+    print(f"[WARN] {msg}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Convert a pickled RandomForest into a compact .npz model")
+    ap.add_argument("src", nargs="?", default="gesture_model.pkl")
+    ap.add_argument("dst", nargs="?", default=None, help="default: <src>.npz")
+    ap.add_argument("--labels", default=DEFAULT_LABELS, help="comma-separated class labels, in class-index order")
+    ap.add_argument("--force", action="store_true", help="write even if the label count does not match the classes")
+    args = ap.parse_args()
+    dst = args.dst or os.path.splitext(args.src)[0] + ".npz"
+    labels = [s.strip() for s in args.labels.split(",") if s.strip()]
+
+    model = joblib.load(args.src)
+    forest = FastForest.from_sklearn(model)
+    check_labels(labels, forest.classes_, args.force)
+    save_forest(dst, forest, class_labels=labels, feature_layout_version=FEATURE_LAYOUT_VERSION)
+
+    # ตรวจว่าไฟล์ที่เขียนให้ผลเหมือน sklearn
+    check = load_forest(dst, expected_layout=FEATURE_LAYOUT_VERSION)
+    X = np.random.default_rng(0).random((500, model.n_features_in_)) * 3
+    same = np.array_equal(model.predict(X), check.predict(X))
+    print(f"[INFO] {args.src} -> {dst} ({os.path.getsize(dst)/1024:.0f} KiB, "
+          f"{forest.n_estimators} trees, layout v{FEATURE_LAYOUT_VERSION}, labels={labels}, check={'ok' if same else 'MISMATCH'})")
+    if not same:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
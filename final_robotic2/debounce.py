@@ -0,0 +1,166 @@
+# debounce.py
+# กันท่าทางกระพริบ: ต้องเห็นท่าเดิมติดกันครบจำนวนเฟรม และเว้นช่วง cooldown ระหว่างอีเวนต์
+# GestureDebouncer: ใช้ความน่าจะเป็นจาก predict_proba + เวลาจริง (ไม่ขึ้นกับ FPS)
+import math, time
+from collections import deque
+import numpy as np
+
+def _ttt_stats(ttt, events):
+    out = {"events": events, "ttt_n": len(ttt)}
+    if ttt:
+        ms = np.asarray(ttt) * 1e3
+        out.update(ttt_mean_ms=float(ms.mean()), ttt_p50_ms=float(np.percentile(ms, 50)),
+                   ttt_p95_ms=float(np.percentile(ms, 95)))
+    return out
+
+def format_ttt(stats):
+    if not stats["ttt_n"]:
+        return f"{stats['events']} events"
+    return (f"{stats['events']} events, time-to-trigger mean {stats['ttt_mean_ms']:.0f} ms "
+            f"p50 {stats['ttt_p50_ms']:.0f} ms p95 {stats['ttt_p95_ms']:.0f} ms")
+
+class FrameDebouncer:
+    """Fire a label after it was seen in `stable_frames` consecutive frames.
+
+    `update(labels)` takes the valid labels of one frame (one per hand; empty
+    when nothing was recognised) and returns the label to fire, or None.
+    Events are at least `cooldown_sec` apart. `reset()` forgets the state
+    and the time-to-trigger stats.
+    """
+
+    def __init__(self, stable_frames=5, cooldown_sec=2.0):
+        self.stable_frames = stable_frames
+        self.cooldown_sec = cooldown_sec
+        self.reset()
+
+    def reset(self):
+        self.last_label = None
+        self.stable_count = 0
+        self.last_event_time = None  # None = ยังไม่เคยยิง (ไม่ติด cooldown แม้เวลาเริ่มที่ 0)
+        self.events = 0
+        self._onset = 0.0          # เวลาที่เริ่มเห็นท่าปัจจุบัน
+        self._ttt = deque(maxlen=512)
+
+    def update(self, labels, now=None):
+        now = time.time() if now is None else now
+        # นับต่อถ้าท่าเดิมยังอยู่ในมือใดมือหนึ่ง
+        if labels:
+            if self.last_label in labels:
+                self.stable_count += 1
+            else:
+                self.last_label = labels[0]
+                self.stable_count = 1
+                self._onset = now
+        else:
+            self.last_label = None
+            self.stable_count = 0
+
+        if self.last_label and self.stable_count >= self.stable_frames:
+            if self.last_event_time is None or (now - self.last_event_time) >= self.cooldown_sec:
+                if self.last_event_time is None or self.last_event_time < self._onset:
+                    self._ttt.append(now - self._onset)   # เฉพาะครั้งแรกของท่านี้ (ไม่นับรอบ cooldown)
+                self.last_event_time = now
+                self.events += 1
+                return self.last_label
+        return None
+
+    def stats(self):
+        return _ttt_stats(self._ttt, self.events)
+
+
+class GestureDebouncer:
+    """Fire gestures from smoothed class probabilities on a time base.
+
+    `update(probas, now)` takes one predict_proba row per hand (columns in
+    the order of `labels`, e.g. model.classes_ mapped to names) and returns
+    the label to fire, or None. Hands are combined by a per-class max, so a
+    gesture in either hand counts. Probabilities are smoothed with an EMA
+    of time constant `tau_sec` (mode "ema") or a mean over the last
+    `window_sec` (mode "window"). A label fires once its smoothed
+    probability has stayed >= `confidence` for `hold_sec`; it is only
+    dropped when it falls below `release` or another label leads, so one
+    noisy frame does not restart the hold. Labels named "error" never fire.
+    Events are at least `cooldown_sec` apart, as in FrameDebouncer.
+
+    Time-to-trigger is measured from the first frame where the label was
+    the raw (unsmoothed) top class.
+    """
+
+    def __init__(self, labels, confidence=0.5, hold_sec=0.25, cooldown_sec=2.0,
+                 mode="ema", tau_sec=0.1, window_sec=0.2, release=None):
+        self.labels = list(labels)
+        self.confidence = confidence
+        self.release = confidence - 0.15 if release is None else release
+        self.hold_sec = hold_sec
+        self.cooldown_sec = cooldown_sec
+        self.mode = mode
+        self.tau_sec = tau_sec
+        self.window_sec = window_sec
+        self._valid = np.array([l != "error" for l in self.labels])
+        self.reset()
+
+    def reset(self):
+        self.smoothed = np.zeros(len(self.labels))
+        self._window = deque()
+        self._last_t = None
+        self.candidate = None      # index ของท่าที่กำลังนับ hold
+        self._since = 0.0
+        self._raw = None
+        self._raw_since = 0.0
+        self._onset = 0.0          # onset ของ candidate ปัจจุบัน (เฟรมแรกที่เป็น raw top class)
+        self._fired_onset = None   # onset ของครั้งล่าสุดที่ยิง (กันนับ TTT ซ้ำตอน cooldown)
+        self.last_event_time = None
+        self.events = 0
+        self._ttt = deque(maxlen=512)
+
+    def _combine(self, probas):
+        if probas is None or len(probas) == 0:
+            return np.zeros(len(self.labels))
+        p = np.asarray(probas, dtype=np.float64)
+        # แถวเดียว (1-D) ต้อง copy: update() เขียนทับ (ตัด "error") และเก็บไว้ใน window
+        return p.max(axis=0) if p.ndim == 2 else p.copy()
+
+    def _smooth(self, p, now):
+        if self.mode == "window":
+            self._window.append((now, p))
+            while self._window and now - self._window[0][0] > self.window_sec:
+                self._window.popleft()
+            self.smoothed = np.mean([q for _, q in self._window], axis=0) if self._window else p
+        elif self._last_t is None:
+            self.smoothed = p.copy()
+        else:
+            alpha = 1.0 - math.exp(-max(now - self._last_t, 0.0) / self.tau_sec)
+            self.smoothed += alpha * (p - self.smoothed)
+        self._last_t = now
+
+    def update(self, probas, now=None):
+        now = time.time() if now is None else now
+        p = self._combine(probas)
+        p[~self._valid] = 0.0
+
+        raw = int(np.argmax(p)) if p.any() else None
+        if raw != self._raw:
+            self._raw, self._raw_since = raw, now
+
+        self._smooth(p, now)
+        top = int(np.argmax(self.smoothed))
+        score = self.smoothed[top]
+        if self.candidate is not None and (self.smoothed[self.candidate] < self.release or
+                                           (top != self.candidate and score >= self.confidence)):
+            self.candidate = None
+        if self.candidate is None and score >= self.confidence and self._valid[top]:
+            self.candidate, self._since = top, now
+            self._onset = self._raw_since if self._raw == top else now
+
+        if self.candidate is not None and now - self._since >= self.hold_sec:
+            if self.last_event_time is None or (now - self.last_event_time) >= self.cooldown_sec:
+                if self._fired_onset != (self.candidate, self._onset):
+                    self._ttt.append(now - self._onset)
+                    self._fired_onset = (self.candidate, self._onset)
+                self.last_event_time = now
+                self.events += 1
+                return self.labels[self.candidate]
+        return None
+
+    def stats(self):
+        return _ttt_stats(self._ttt, self.events)
@@ -1,22 +1,52 @@
-# detect.py
 #!/usr/bin/env python3
-import os, time, cv2, joblib
+# detect.py
+import json, os, time, cv2
 import numpy as np
-import mediapipe as mp
 
-from extract import extract_features
+from extract import extract_features_batch, N_FEATURES, FEATURE_LAYOUT_VERSION
+from forest import FastForest, load_forest
+from landmarks import create_hands, draw_hands, HandDetector, HandTracker
+from capture import LatestFrameCapture
+from debounce import FrameDebouncer, GestureDebouncer, format_ttt
+from scheduler import DetectScheduler
+from landmark_log import LandmarkLogWriter
+import telemetry
 import audio_output as AO
 import visual_output as VO
+from events import EventBus, JsonlSink
 from hdmi_display import place_on_hdmi
+import gst_pipeline as GST
 
 # ---------- CONFIG ----------
-AUDIO_MAP = {
-    "Fighting":  "audio/Fighting.wav",
-    "MiniHeart": "audio/MiniHeart.wav",
-    "ILY":       "audio/ILY.wav",
-    "FU":        "audio/FU.wav",
-    "Like":      "audio/Like.wav",
-}
+# audio_native/ = ไฟล์ที่ build_audio.py แปลงเป็น rate/channels ของ device และตัดเงียบแล้ว
+# เลือกต่อ label: ใช้ audio_native/ ถ้า manifest มี label นั้น (และไฟล์อยู่) ไม่งั้นใช้ audio/ เดิม
+# ตั้ง AUDIO_DIR = ใช้โฟลเดอร์นั้นกับทุก label
+_HERE = os.path.dirname(os.path.abspath(__file__))
+AUDIO_DIR = os.environ.get("AUDIO_DIR", "")
+
+def _native_clips(native_dir="audio_native"):
+    """label -> clip path for the labels listed in <native_dir>/manifest.json whose file exists."""
+    try:
+        with open(os.path.join(_HERE, native_dir, "manifest.json")) as fh:
+            clips = json.load(fh).get("clips", {})
+    except (OSError, ValueError):
+        return {}
+    return {label: f"{native_dir}/{c['file']}" for label, c in clips.items()
+            if os.path.isfile(os.path.join(_HERE, native_dir, c.get("file", "")))}
+
+def _audio_map(names):
+    if AUDIO_DIR:
+        return {label: f"{AUDIO_DIR}/{name}" for label, name in names.items()}
+    native = _native_clips()
+    return {label: native.get(label, f"audio/{name}") for label, name in names.items()}
+
+AUDIO_MAP = _audio_map({
+    "Fighting":  "Fighting.wav",
+    "MiniHeart": "MiniHeart.wav",
+    "ILY":       "ILY.wav",
+    "FU":        "FU.wav",
+    "Like":      "Like.wav",
+})
 ICON_MAP = {
     "Fighting":  "icons/Fighting.png",
     "MiniHeart": "icons/MiniHeart.png",
@@ -30,131 +60,316 @@ STABLE_FRAMES_REQUIRED = int(os.environ.get("STABLE_FRAMES", 5))
 EVENT_COOLDOWN_SEC     = float(os.environ.get("EVENT_COOLDOWN", 2.0))
 DISPLAY_DURATION_SEC   = float(os.environ.get("DISPLAY_SEC", 2.0))
 BANNER_POSITION        = os.environ.get("BANNER_POS", "top-right")  # <- ดีฟอลต์มุมขวาบน
+# "proba" = GestureDebouncer (predict_proba + เวลาจริง ไม่ขึ้นกับ FPS), "frames" = นับเฟรมติดกันแบบเดิม
+DEBOUNCE_MODE          = os.environ.get("DEBOUNCE", "proba").lower()
+DEBOUNCE_CONF          = float(os.environ.get("DEBOUNCE_CONF", 0.5))      # ความน่าจะเป็นหลัง smooth ที่ถือว่าเป็นท่านั้น
+# hold + tau ≈ ท่านิ่ง ~0.3 s (เท่ากับ STABLE_FRAMES=5 ที่ ~15 FPS) : ที่ 10 FPS ท่าที่โผล่ 1-2 เฟรมไม่ยิง
+DEBOUNCE_HOLD_SEC      = float(os.environ.get("DEBOUNCE_HOLD_SEC", 0.25)) # ต้องค้างเกิน conf นานเท่านี้
+DEBOUNCE_SMOOTH        = os.environ.get("DEBOUNCE_SMOOTH", "ema")          # "ema" | "window"
+DEBOUNCE_TAU_SEC       = float(os.environ.get("DEBOUNCE_TAU_SEC", 0.1))
+DEBOUNCE_WINDOW_SEC    = float(os.environ.get("DEBOUNCE_WINDOW_SEC", 0.2))
 
 # Model / labels
 MODEL_PATH    = os.environ.get("MODEL_PATH", "gesture_model.pkl")
+# ไฟล์ .npz จาก convert_model.py (ถ้ามีจะใช้ก่อน: โหลดเร็ว ไม่ต้อง import sklearn)
+COMPACT_MODEL_PATH = os.environ.get("MODEL_NPZ", os.path.splitext(MODEL_PATH)[0] + ".npz")
 CLASS_LABELS  = ["Fighting", "MiniHeart", "ILY", "FU", "Like"]
+FAST_MODEL    = os.environ.get("FAST_MODEL", "1") == "1"  # 1 = ใช้ FastForest แทน sklearn predict
 
 # MediaPipe conf
 MIN_DET_CONF  = float(os.environ.get("MP_DET", 0.9))
 MIN_TRK_CONF  = float(os.environ.get("MP_TRK", 0.6))
+MAX_HANDS     = int(os.environ.get("MAX_HANDS", 2))    # ทุกมือที่เจอจะถูกจำแนกใน predict ครั้งเดียว
+# ความละเอียดที่ใช้ตรวจมือ แยกจากความละเอียดที่แสดงผล (landmark เป็นค่า normalized จึงไม่กระทบฟีเจอร์)
+DETECT_SCALE  = float(os.environ.get("DETECT_SCALE", 1.0))  # ย่อเฟรมก่อน hands.process (1.0 = เต็ม)
+DETECT_MAX_W  = int(os.environ.get("DETECT_MAX_W", 0))      # จำกัดความกว้างสูงสุดตอนตรวจ (0 = ไม่จำกัด)
+# ROI tracking: ตรวจเฉพาะบริเวณรอบมือเฟรมก่อน ถ้ามือหาย/ความมั่นใจต่ำจะกลับไปตรวจทั้งเฟรม
+ROI_TRACK     = os.environ.get("ROI_TRACK", "0") == "1"
+ROI_SIZE      = int(os.environ.get("ROI_SIZE", 256))        # ขนาด crop (px) ที่ส่งเข้า MediaPipe
+ROI_PAD       = float(os.environ.get("ROI_PAD", 0.3))       # ขยายกรอบรอบมือ (สัดส่วนของขนาดมือ)
+ROI_MIN_SCORE = float(os.environ.get("ROI_MIN_SCORE", 0.8))
+ROI_REDETECT_FRAMES = int(os.environ.get("ROI_REDETECT_FRAMES", 15))   # full-frame ทุก N เฟรม หามือใหม่ (0 = ปิด)
+ROI_REDETECT_MS = float(os.environ.get("ROI_REDETECT_MS", 500))       # หรือทุก T ms (0 = ปิด)
+ROI_MAX_FRAC  = float(os.environ.get("ROI_MAX_FRAC", 0.6))     # crop รวมของมือใหญ่กว่านี้ (สัดส่วนด้านเฟรม) = ใช้ภาพเต็ม
+# ข้ามการตรวจบางเฟรมเมื่อท่านิ่ง เพื่อรักษา FPS ที่ตั้งไว้ (0 = ตรวจทุกเฟรม)
+TARGET_FPS    = float(os.environ.get("TARGET_FPS", 0))
+MAX_STRIDE    = int(os.environ.get("MAX_STRIDE", 4))          # ตรวจอย่างน้อย 1 ใน N เฟรม
+MOTION_THRESH = float(os.environ.get("MOTION_THRESH", 6.0))   # ค่าต่างเฉลี่ยของภาพย่อ (0-255) ที่ถือว่าขยับ
 
 # HDMI window
 WINDOW_NAME   = os.environ.get("WIN_NAME", "Jetson Detection (Image Banner + Speaker Audio)")
 
 # Camera config (USB / CSI)
-CAMERA_TYPE   = os.environ.get("CAMERA_TYPE", "USB").upper()  # "USB" | "CSI"
+CAMERA_TYPE   = os.environ.get("CAMERA_TYPE", "USB").upper()  # "USB" | "CSI" | "TEST" (videotestsrc)
 CAM_INDEX     = int(os.environ.get("CAM_INDEX", 0))           # for USB
+# USB: "opencv" = cv2.VideoCapture(CAM_INDEX) แบบเดิม, "gst" = v4l2src pipeline (ทิ้งเฟรมเก่าใน pipeline)
+USB_BACKEND   = os.environ.get("USB_BACKEND", "opencv").lower()
+USB_FORMAT    = os.environ.get("USB_FORMAT", "mjpeg").lower()  # "mjpeg" | "yuyv"
+MJPEG_DECODER = os.environ.get("MJPEG_DECODER", "jpegdec")     # Jetson: "nvjpegdec"
+GST_PROBE     = os.environ.get("GST_PROBE", "0") == "1"        # แสดง caps ที่ตกลงกันได้ (gst-launch-1.0 -v)
 CSI_SENSOR_ID = int(os.environ.get("CSI_ID", 0))              # for CSI
 CSI_W         = int(os.environ.get("CSI_W", 1280))
 CSI_H         = int(os.environ.get("CSI_H", 720))
 CSI_FPS       = int(os.environ.get("CSI_FPS", 30))
+# อ่านกล้องบน thread แยกและใช้เฟรมล่าสุดเสมอ (0 = cap.read() ตรงใน loop แบบเดิม)
+THREADED_CAPTURE = os.environ.get("THREADED_CAPTURE", "1") == "1"
+# thread กล้องแปลงเป็น RGB ให้เลย (ต้องใช้ THREADED_CAPTURE=1): ตรวจมือไม่ต้อง cvtColor
+# ใช้ได้เฉพาะ async_detect.py HEADLESS=1 (ไม่มีจอ -> ไม่ต้องแปลงกลับเป็น BGR) และตรวจเต็มเฟรม:
+# ถ้า DETECT_SCALE < 1 / DETECT_MAX_W การย่อก่อนแปลงใน HandDetector ถูกกว่าแปลงทั้งเฟรมบน thread กล้อง
+CAPTURE_RGB   = (os.environ.get("CAPTURE_RGB", "0") == "1" and THREADED_CAPTURE
+                 and DETECT_SCALE >= 1.0 and DETECT_MAX_W == 0)
+# บันทึก landmarks ทุกเฟรมที่ตรวจจริงลงไฟล์ binary (เล่นซ้ำด้วย replay_landmarks.py) ว่าง = ไม่บันทึก
+# (TARGET_FPS: เฟรมที่ scheduler ข้ามไม่ถูกบันทึก frame id จึงกระโดดได้)
+LANDMARK_LOG  = os.environ.get("LANDMARK_LOG", "")
+# อีเวนต์ท่าทาง: ส่งผ่าน EventBus ให้ sink แต่ละตัวทำงานบน thread ของตัวเอง
+EVENT_QUEUE   = int(os.environ.get("EVENT_QUEUE", 8))          # ขนาดคิวต่อ sink (เต็มแล้วทิ้งอีเวนต์เก่าสุด)
+EVENT_LOG     = os.environ.get("EVENT_LOG", "")                # บันทึกอีเวนต์เป็น JSONL (ว่าง = ไม่บันทึก)
 # ---------------------------------
 
+def open_gst_camera(elements):
+    if GST_PROBE:
+        # ต้อง probe ก่อนเปิดจริง (กล้องเปิดได้ทีละ process)
+        for pad, caps in GST.probe_caps(elements) or []:
+            print(f"[INFO] caps {pad}: {caps}")
+    cap, pipeline = GST.open_pipeline(elements)
+    print(f"[INFO] GStreamer: {pipeline}")
+    if cap.isOpened():
+        w, h, fps = GST.describe_capture(cap)
+        print(f"[INFO] negotiated {w}x{h} @ {fps:.1f} fps")
+    return cap
+
 def open_camera():
     if CAMERA_TYPE == "CSI":
-        gst = (
-            f"nvarguscamerasrc sensor-id={CSI_SENSOR_ID} ! "
-            f"video/x-raw(memory:NVMM), width={CSI_W}, height={CSI_H}, "
-            f"framerate={CSI_FPS}/1, format=NV12 ! "
-            f"nvvidconv ! video/x-raw, format=BGRx ! videoconvert ! appsink"
-        )
-        return cv2.VideoCapture(gst, cv2.CAP_GSTREAMER)
+        return open_gst_camera(GST.csi_elements(CSI_SENSOR_ID, CSI_W, CSI_H, CSI_FPS))
+    elif CAMERA_TYPE == "TEST":
+        return open_gst_camera(GST.test_elements(CSI_W, CSI_H, CSI_FPS))
+    elif USB_BACKEND == "gst":
+        return open_gst_camera(GST.usb_elements(f"/dev/video{CAM_INDEX}", CSI_W, CSI_H, CSI_FPS,
+                                                USB_FORMAT, MJPEG_DECODER))
     else:
         cap = cv2.VideoCapture(CAM_INDEX)
         # optional: try set resolution
         cap.set(cv2.CAP_PROP_FRAME_WIDTH,  CSI_W)
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CSI_H)
         cap.set(cv2.CAP_PROP_FPS,          CSI_FPS)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE,   1)  # backend ที่รองรับจะเก็บเฟรมค้างแค่ 1
         return cap
 
-def main():
-    # init outputs
-    AO.init_audio(AUDIO_MAP)
+def load_model():
+    global CLASS_LABELS
+    if FAST_MODEL and os.path.isfile(COMPACT_MODEL_PATH):
+        print(f"[INFO] Loading compact model: {COMPACT_MODEL_PATH}")
+        model = load_forest(COMPACT_MODEL_PATH, expected_layout=FEATURE_LAYOUT_VERSION)
+        if model.class_labels:
+            CLASS_LABELS = model.class_labels
+        return model
+
+    import joblib  # import เฉพาะตอนต้องโหลด pickle
+    print(f"[INFO] Loading model: {MODEL_PATH}")
+    model = joblib.load(MODEL_PATH)
+    if FAST_MODEL:
+        model = FastForest.from_sklearn(model)
+    return model
+
+def classify_hands(model, kps, handedness, feats, tel=telemetry.NULL):
+    """Classify all hands of one frame with a single batched predict.
+
+    kps: (H, 21, 3) landmarks; feats: preallocated (max_hands, 27) buffer.
+    Returns one dict per hand: {"hand": i, "handedness": "Left", "label": "Like",
+    "proba": predict_proba row (columns = model.classes_)}.
+    """
+    n = len(kps)
+    if n == 0:
+        return []
+    t = tel.start()
+    X = extract_features_batch(kps, out=feats[:n])
+    tel.stop("extract_features", t)
+    t = tel.start()
+    probas = model.predict_proba(X)
+    preds = model.classes_[np.argmax(probas, axis=1)]
+    tel.stop("predict", t)
+    out = []
+    for i, pred in enumerate(preds):
+        label = CLASS_LABELS[pred] if 0 <= pred < len(CLASS_LABELS) else "error"
+        out.append({"hand": i, "handedness": handedness[i][0], "label": label, "proba": probas[i]})
+    return out
+
+def make_detector(hands=None, tel=None, input_rgb=False):
+    if hands is None:
+        hands = create_hands(MAX_HANDS, MIN_DET_CONF, MIN_TRK_CONF)
+    detector = HandDetector(hands, MAX_HANDS, DETECT_SCALE, DETECT_MAX_W, telemetry=tel, input_rgb=input_rgb)
+    if ROI_TRACK:
+        # Hands อีกตัวสำหรับ crop: tracking state ของ MediaPipe ไม่ปนกับภาพเต็มเฟรม
+        roi_hands = create_hands(MAX_HANDS, MIN_DET_CONF, MIN_TRK_CONF)
+        detector = HandTracker(detector, roi_hands, ROI_PAD, ROI_SIZE, ROI_MIN_SCORE,
+                               redetect_every=ROI_REDETECT_FRAMES, redetect_ms=ROI_REDETECT_MS,
+                               max_frac=ROI_MAX_FRAC)
+    return detector
+
+def print_detector_stats(detector):
+    if isinstance(detector, HandTracker):
+        st = detector.stats()
+        print(f"[INFO] ROI tracking: {st['roi_frames']} crop / {st['full_frames']} full-frame detections, "
+              f"({st['redetects']} periodic re-detects, {st['wide']} hands too far apart), "
+              f"{st['pixels_per_frame']:.0f} px/frame to MediaPipe")
+
+def make_classifier(model, tel=None):
+    """Bind model and a feature buffer into classify(kps, handedness)."""
+    tel = tel or telemetry.NULL
+    feats = np.empty((MAX_HANDS, N_FEATURES), dtype=np.float64)
+
+    def classify(kps, handedness):
+        try:
+            return classify_hands(model, kps, handedness, feats, tel)
+        except Exception:
+            return [{"hand": i, "handedness": hd[0], "label": "error"} for i, hd in enumerate(handedness)]
+    return classify
+
+def class_names(model):
+    """Label of each predict_proba column."""
+    return [CLASS_LABELS[c] if 0 <= c < len(CLASS_LABELS) else "error" for c in model.classes_]
+
+def make_debouncer(model, stable=None, hold_sec=None, cooldown=None):
+    """Debouncer for DEBOUNCE_MODE; stable/hold_sec/cooldown override the env settings (replay sweeps)."""
+    cooldown = EVENT_COOLDOWN_SEC if cooldown is None else cooldown
+    if DEBOUNCE_MODE == "frames":
+        return FrameDebouncer(STABLE_FRAMES_REQUIRED if stable is None else stable, cooldown)
+    return GestureDebouncer(class_names(model), DEBOUNCE_CONF,
+                            DEBOUNCE_HOLD_SEC if hold_sec is None else hold_sec, cooldown,
+                            DEBOUNCE_SMOOTH, DEBOUNCE_TAU_SEC, DEBOUNCE_WINDOW_SEC)
+
+def update_debouncer(debouncer, hand_preds, now=None):
+    if isinstance(debouncer, GestureDebouncer):
+        return debouncer.update([hp["proba"] for hp in hand_preds if "proba" in hp], now)
+    return debouncer.update(valid_labels(hand_preds), now)
+
+def draw_predictions(frame, kps, hand_preds):
+    draw_hands(frame, kps)
+    h, w = frame.shape[:2]
+    for hp, hand in zip(hand_preds, kps):
+        x, y = int(hand[0, 0] * w), int(hand[0, 1] * h) + 30
+        cv2.putText(frame, f"{hp['handedness']}: {hp['label']}", (x, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+    labels = valid_labels(hand_preds)
+    if labels:
+        cv2.putText(frame, f"Gesture: {' | '.join(labels)}", (10, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 2)
+    return frame
+
+def valid_labels(hand_preds):
+    return [hp["label"] for hp in hand_preds if hp["label"] != "error"]
+
+BUS = EventBus()
+
+def init_outputs(audio=True):
     # ตั้งให้แสดง “มุมขวาบน” และย่อไอคอนให้พอดีมุม
     VO.init_visual(ICON_MAP, display_sec=DISPLAY_DURATION_SEC, position=BANNER_POSITION, max_icon_w=300)
+    BUS.subscribe("visual", lambda ev: VO.handle_event(ev.label), EVENT_QUEUE)
+    if audio:
+        AO.init_audio(AUDIO_MAP)
+        BUS.subscribe("audio", lambda ev: AO.handle_event(ev.label), EVENT_QUEUE)
+    if EVENT_LOG:
+        BUS.subscribe("log", JsonlSink(EVENT_LOG), EVENT_QUEUE)
+    BUS.start()
+
+def fire_event(label):
+    # frame loop ไม่รอ: เสียง / ป้ายภาพ / log ทำงานบน thread ของ sink เอง
+    BUS.publish(label)
+
+def shutdown_outputs():
+    BUS.stop()
+    print(f"[INFO] events: {BUS.format_stats()}")
+    print(f"[INFO] audio {AO.format_stats()}")
+    AO.close_audio()
+
+def main():
+    # init outputs
+    init_outputs()
+
+    # TELEMETRY=1 -> จับเวลาแต่ละ stage (TELEMETRY_HUD=1 แสดงบนจอ, TELEMETRY_OUT=file.jsonl|.csv)
+    tel = telemetry.from_env()
 
     # model
-    print(f"[INFO] Loading model: {MODEL_PATH}")
-    model = joblib.load(MODEL_PATH)
+    model = load_model()
+    classify = make_classifier(model, tel)
 
     # mediapipe
-    mp_hands = mp.solutions.hands
-    mp_draw  = mp.solutions.drawing_utils
-    hands = mp_hands.Hands(min_detection_confidence=MIN_DET_CONF,
-                           min_tracking_confidence=MIN_TRK_CONF)
+    detector = make_detector(tel=tel)
 
     cap = open_camera()
     if not cap or not cap.isOpened():
         print("[ERROR] cannot open camera")
         return
+    if THREADED_CAPTURE:
+        cap = LatestFrameCapture(cap).start()
 
     # HDMI window (ถ้ามีหลายจอจะย้ายไป HDMI; ถ้ามีจอเดียวก็แสดงจอนั้น)
     place_on_hdmi(WINDOW_NAME)
 
-    last_label = None
-    stable_count = 0
-    last_event_time = 0.0
+    debouncer = make_debouncer(model)
+    scheduler = DetectScheduler(TARGET_FPS, MAX_STRIDE, MOTION_THRESH) if TARGET_FPS > 0 else None
+    kps, handedness, hand_preds = np.empty((0, 21, 3), dtype=np.float32), [], []
+    lm_log = LandmarkLogWriter(LANDMARK_LOG, MAX_HANDS) if LANDMARK_LOG else None
+    frame_id = 0
 
     while True:
+        t_frame = time.monotonic()
         ok, frame = cap.read()
+        tel.stop("read", t_frame)
         if not ok:
             print("[WARN] camera read failed")
             break
 
-        img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(img_rgb)
-
-        prediction_text = ""
-        if results.multi_hand_landmarks:
-            # ใช้มือตรวจเจอ “มือแรก”
-            hand_landmarks = results.multi_hand_landmarks[0]
-            mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-
-            keypoints = [[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark]
-            if len(keypoints) == 21:
-                try:
-                    feats = extract_features(keypoints).reshape(1, -1)
-                    pred = model.predict(feats)[0]
-                    prediction_text = CLASS_LABELS[pred]
-                except Exception:
-                    prediction_text = "error"
-
-        if prediction_text:
-            cv2.putText(frame, f"Gesture: {prediction_text}", (10, 40),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 2)
-
-        # Debounce
-        now = time.time()
-        if prediction_text and prediction_text != "error":
-            if prediction_text == last_label:
-                stable_count += 1
-            else:
-                last_label = prediction_text
-                stable_count = 1
-        else:
-            last_label = None
-            stable_count = 0
-
-        # Trigger event
-        if last_label and stable_count >= STABLE_FRAMES_REQUIRED:
-            if (now - last_event_time) >= EVENT_COOLDOWN_SEC:
-                # 1) เล่นเสียงตามคลาส
-                AO.handle_event(last_label)
-                # 2) ให้ visual_output จัดการป้ายภาพ (มุมขวาบน) เอง
-                VO.handle_event(last_label)
-
-                last_event_time = now
+        # เฟรมที่ scheduler ให้ข้าม: ใช้ landmarks/prediction ล่าสุดซ้ำ (และไม่บันทึกลง log: ไม่ใช่ผลตรวจจริง)
+        if scheduler is None or scheduler.should_detect(frame):
+            t0 = time.monotonic()
+            kps, handedness = detector.detect(frame)
+            hand_preds = classify(kps, handedness)
+            if scheduler is not None:
+                scheduler.record_detect(time.monotonic() - t0, valid_labels(hand_preds))
+            if lm_log is not None:
+                lm_log.append(time.time(), frame_id, kps, handedness)
+        draw_predictions(frame, kps, hand_preds)
+        frame_id += 1
+
+        # Debounce + trigger event
+        label = update_debouncer(debouncer, hand_preds)
+        if label:
+            fire_event(label)
 
         # ซ้อนป้าย PNG ถ้ายังอยู่ในช่วงเวลา (visual_output จะเช็คเวลาเอง)
+        t = tel.start()
         frame = VO.apply_overlay(frame)
+        tel.draw_hud(frame)
+        tel.stop("overlay", t)
 
+        t = tel.start()
         cv2.imshow(WINDOW_NAME, frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        key = cv2.waitKey(1) & 0xFF
+        tel.stop("imshow", t)
+        tel.frame()
+        tel.maybe_flush()
+        if key == ord('q'):
             break
+        if scheduler is not None:
+            scheduler.record_frame(time.monotonic() - t_frame)
 
     cap.release()
     cv2.destroyAllWindows()
+    shutdown_outputs()
+    if lm_log is not None:
+        lm_log.close()
+        print(f"[INFO] landmark log: {lm_log.written} frames -> {LANDMARK_LOG} ({lm_log.dropped} dropped)")
+    if THREADED_CAPTURE:
+        st = cap.stats()
+        print(f"[INFO] capture: {st['read']} frames read, {st['dropped']} stale frames dropped")
+    print_detector_stats(detector)
+    print(f"[INFO] debounce ({DEBOUNCE_MODE}): {format_ttt(debouncer.stats())}")
+    if scheduler is not None:
+        print(f"[INFO] scheduler: {scheduler.format_stats(STABLE_FRAMES_REQUIRED)}")
+    if tel.enabled:
+        print(f"[INFO] telemetry:\n{tel.format_summary()}")
+        tel.close()
 
 if __name__ == "__main__":
     main()
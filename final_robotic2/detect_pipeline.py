@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# detect_pipeline.py
+# detect.py แบบ pipeline: capture -> landmarks -> classify(+debounce/event) -> render
+# แต่ละ stage อยู่บน thread ของตัวเอง (render อยู่บน main thread เพราะ cv2.imshow)
+# ใช้ config / helper เดียวกับ detect.py ทั้งหมด
+# MP_WORKERS=N (N>0): ย้าย landmarks ไปทำใน N process ผ่าน shared memory (ดู mp_workers.py)
+import os, time, threading, cv2
+import numpy as np
+
+import detect as D
+import visual_output as VO
+from debounce import format_ttt
+from pipeline import Pipeline, Packet, Stage
+from mp_workers import LandmarkWorkerPool
+from hdmi_display import place_on_hdmi
+
+QUEUE_SIZE = int(os.environ.get("PIPE_QUEUE", 2))
+STATS_SEC  = float(os.environ.get("PIPE_STATS_SEC", 5.0))   # พิมพ์สถิติ stage ทุกกี่วินาที (0 = ตอนจบเท่านั้น)
+MP_WORKERS = int(os.environ.get("MP_WORKERS", 0))           # 0 = MediaPipe บน thread ใน process นี้
+
+def _classify_stage(classify, debouncer, on_event):
+    def classify_stage(pkt):
+        preds = classify(pkt.data["kps"], pkt.data["handedness"])
+        pkt.data["preds"] = preds
+        label = D.update_debouncer(debouncer, preds)
+        pkt.data["event"] = label
+        if label:
+            on_event(label)
+        return pkt
+    return classify_stage
+
+def build_pipeline(cap, detector, classify, debouncer, on_event):
+    counter = {"id": 0}
+
+    def capture():
+        ok, frame = cap.read()
+        if not ok:
+            print("[WARN] camera read failed")
+            return None
+        pkt = Packet(counter["id"], time.monotonic(), frame)
+        counter["id"] += 1
+        return pkt
+
+    def landmarks(pkt):
+        kps, handedness = detector.detect(pkt.frame)
+        pkt.data["kps"] = kps.copy()   # buffer ถูกใช้ซ้ำ ต้อง copy ก่อนส่งต่อ stage ถัดไป
+        pkt.data["handedness"] = handedness
+        return pkt
+
+    return (Pipeline(QUEUE_SIZE)
+            .add("capture", capture)
+            .add("landmarks", landmarks)
+            .add("classify", _classify_stage(classify, debouncer, on_event)))
+
+def build_worker_pipeline(cap, pool, classify, debouncer, on_event, stopping):
+    """Capture reads straight into shared-memory slots; results come back in frame order.
+
+    Returns (feeder, pipe): feeder is the capture Stage feeding the pool, pipe
+    starts at the in-order pool output. Set `stopping` to end both.
+    """
+    counter = {"id": 0}
+    eof = threading.Event()
+
+    def capture():
+        while True:
+            slot, buf = pool.acquire(timeout=0.5)
+            if slot is not None:
+                break
+            if stopping.is_set():
+                return None
+        ok, frame = cap.read(buf)
+        if not ok:
+            pool.release(slot)
+            print("[WARN] camera read failed")
+            eof.set()
+            return None
+        if frame is not buf:
+            np.copyto(buf, frame)
+        pkt = Packet(counter["id"], time.monotonic(), None)
+        pool.submit(slot, pkt.frame_id, pkt.t_capture)
+        counter["id"] += 1
+        return pkt
+
+    def landmarks():
+        while True:
+            r = pool.get(timeout=0.5)
+            if r is not None:
+                break
+            if stopping.is_set() or (eof.is_set() and pool.in_flight() == 0):
+                return None
+        slot, frame_id, t_capture, kps, handedness = r
+        pkt = Packet(frame_id, t_capture, pool.frame(slot))
+        pkt.data.update(slot=slot, kps=kps, handedness=handedness)
+        return pkt
+
+    feeder = Stage("capture", capture)
+    pipe = (Pipeline(QUEUE_SIZE, on_drop=lambda pkt: pool.release(pkt.data["slot"]))
+            .add("landmarks", landmarks)
+            .add("classify", _classify_stage(classify, debouncer, on_event)))
+    return feeder, pipe
+
+def main():
+    D.init_outputs()
+    model = D.load_model()
+    classify = D.make_classifier(model)
+
+    cap = D.open_camera()
+    if not cap or not cap.isOpened():
+        print("[ERROR] cannot open camera")
+        return
+
+    place_on_hdmi(D.WINDOW_NAME)
+
+    debouncer = D.make_debouncer(model)
+    pool = feeder = detector = None
+    stopping = threading.Event()
+    if MP_WORKERS > 0:
+        ok, first = cap.read()   # ใช้ขนาดเฟรมจริงจองขนาด shared memory
+        if not ok:
+            print("[ERROR] camera read failed")
+            return
+        # slot พอสำหรับ: งานใน worker + คิวทุกช่วง + เฟรมที่กำลัง render
+        pool = LandmarkWorkerPool(first.shape, MP_WORKERS, n_slots=2 * MP_WORKERS + 2 * QUEUE_SIZE + 2,
+                                  max_hands=D.MAX_HANDS, min_det_conf=D.MIN_DET_CONF,
+                                  min_trk_conf=D.MIN_TRK_CONF, detect_scale=D.DETECT_SCALE,
+                                  detect_max_w=D.DETECT_MAX_W).start()
+        feeder, pipe = build_worker_pipeline(cap, pool, classify, debouncer, D.fire_event, stopping)
+        feeder.start()
+        pipe.start()
+        print(f"[INFO] landmarks in {MP_WORKERS} worker processes, {pool.n_slots} shared-memory slots")
+    else:
+        detector = D.make_detector()
+        pipe = build_pipeline(cap, detector, classify, debouncer, D.fire_event).start()
+
+    rendered, latency_sum = 0, 0.0
+    t_start = t_stats = time.monotonic()
+    try:
+        while True:
+            pkt = pipe.output.get(timeout=0.5)
+            if pkt is None:
+                if pipe.output.closed:
+                    break
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+                continue
+
+            frame = D.draw_predictions(pkt.frame, pkt.data["kps"], pkt.data["preds"])
+            frame = VO.apply_overlay(frame)
+            cv2.imshow(D.WINDOW_NAME, frame)
+            if pool is not None:
+                pool.release(pkt.data["slot"])
+            rendered += 1
+            latency_sum += time.monotonic() - pkt.t_capture
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+            now = time.monotonic()
+            if STATS_SEC > 0 and now - t_stats >= STATS_SEC:
+                print(f"[PIPE] {pipe.format_stats()}")
+                t_stats = now
+    finally:
+        stopping.set()
+        if feeder is not None:
+            feeder.stop()
+            feeder.join(timeout=2.0)
+        pipe.stop()
+        if pool is not None:
+            pool.close()
+        cap.release()
+        cv2.destroyAllWindows()
+        D.shutdown_outputs()
+
+    elapsed = time.monotonic() - t_start
+    if rendered:
+        print(f"[INFO] rendered {rendered} frames in {elapsed:.1f}s ({rendered / elapsed:.1f} FPS), "
+              f"capture->render {1e3 * latency_sum / rendered:.1f} ms avg")
+    print(f"[PIPE] {pipe.format_stats()}")
+    if pool is not None:
+        print(f"[INFO] workers: {pool.submitted} submitted, {pool.completed} completed, "
+              f"{pool.reordered} results arrived out of order, {pool.errors} detect errors, "
+              f"{pool.skipped} skipped, {pool.restarts} worker restarts")
+    D.print_detector_stats(detector)
+    print(f"[INFO] debounce ({D.DEBOUNCE_MODE}): {format_ttt(debouncer.stats())}")
+
+if __name__ == "__main__":
+    main()
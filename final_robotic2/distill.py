@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# distill.py
+# สร้างโมเดลที่เล็กลงจาก gesture_model.pkl แล้ววัด agreement / accuracy / ขนาดไฟล์ / latency
+# เพื่อเลือกโมเดลที่คุ้มที่สุด (Pareto) สำหรับ Jetson จากตัวเลขจริง
+#
+#   python distill.py dataset.npz [--model gesture_model.pkl] [--out-dir candidates] [--csv report.csv]
+#
+# dataset:
+#   .npz  มี X = landmarks (N, 21, 3) หรือ features (N, 27) และ y = class index หรือชื่อคลาส
+#   .csv  แถวละ 63 ค่า (x,y,z ของ 21 จุด) ตามด้วย label ในคอลัมน์สุดท้าย (มี header ได้)
+import argparse, copy, io, os, time
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from extract import extract_features_batch, N_FEATURES, FEATURE_LAYOUT_VERSION
+from forest import FastForest, save_forest
+from convert_model import DEFAULT_LABELS, check_labels
+
+# ---------- dataset ----------
+def load_dataset(path, class_labels):
+    if path.endswith(".csv"):
+        rows = np.genfromtxt(path, delimiter=",", dtype=str)
+        if rows.ndim == 1:
+            rows = rows[None]
+        try:
+            float(rows[0, 0])
+        except ValueError:
+            rows = rows[1:]  # header
+        X, y = rows[:, :-1].astype(np.float64), rows[:, -1]
+    else:
+        z = np.load(path, allow_pickle=False)
+        X, y = z["X"], z["y"]
+
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 2 and X.shape[1] == 63:
+        X = X.reshape(-1, 21, 3)
+    if X.ndim == 3:
+        X = extract_features_batch(X)
+    if X.shape[1] != N_FEATURES:
+        raise ValueError(f"{path}: expected landmarks or {N_FEATURES} features, got shape {X.shape}")
+
+    y = np.asarray(y)
+    if y.dtype.kind in "US":
+        index = {name: i for i, name in enumerate(class_labels)}
+        try:
+            y = np.array([int(v) if v.lstrip("-").isdigit() else index[v] for v in y])
+        except KeyError as e:
+            raise ValueError(f"{path}: unknown label {e} (labels: {class_labels})")
+    return X, y.astype(np.int64)
+
+# ---------- candidates ----------
+def _subset(model, trees):
+    m = copy.copy(model)
+    m.estimators_ = [model.estimators_[i] for i in trees]
+    m.n_estimators = len(trees)
+    return m
+
+def greedy_trees(model, X, target, k):
+    """Pick k trees whose soft vote best reproduces `target` (the original's labels)."""
+    fast = FastForest.from_sklearn(model)
+    per_tree = fast.value[fast.leaves(X)]        # (N, T, C)
+    target_idx = np.searchsorted(model.classes_, target)
+    acc = np.zeros((X.shape[0], per_tree.shape[2]))
+    chosen, left = [], list(range(per_tree.shape[1]))
+    for _ in range(min(k, len(left))):
+        scores = [np.mean(np.argmax(acc + per_tree[:, t], axis=1) == target_idx) for t in left]
+        best = left.pop(int(np.argmax(scores)))
+        chosen.append(best)
+        acc += per_tree[:, best]
+    return chosen
+
+def build_candidates(model, X_fit, teacher_fit, sizes, depths, seed):
+    cands = [("original", model)]
+    for k in sizes:
+        if k >= model.n_estimators:
+            continue
+        cands.append((f"first-{k}", _subset(model, list(range(k)))))
+        cands.append((f"greedy-{k}", _subset(model, greedy_trees(model, X_fit, teacher_fit, k))))
+    # ต้นไม้จำกัดความลึก เทรนใหม่ให้เลียนแบบคำตอบของโมเดลเดิม (distillation)
+    for d in depths:
+        for k in sizes:
+            rf = RandomForestClassifier(n_estimators=k, max_depth=d, random_state=seed, n_jobs=1)
+            rf.fit(X_fit, teacher_fit)
+            cands.append((f"distill-{k}x-d{d}", rf))
+    return cands
+
+# ---------- measurements ----------
+def _time_per_call(fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n
+
+def _sizes(model, class_labels):
+    pkl = io.BytesIO()
+    joblib.dump(model, pkl)
+    npz = io.BytesIO()
+    save_forest(npz, FastForest.from_sklearn(model), class_labels, FEATURE_LAYOUT_VERSION)
+    return len(pkl.getvalue()), len(npz.getvalue())
+
+def evaluate(name, model, X, y, teacher, class_labels, reps):
+    fast = FastForest.from_sklearn(model)
+    pred = fast.predict(X)
+    x = X[:1]
+    pkl_bytes, npz_bytes = _sizes(model, class_labels)
+    return {
+        "name": name,
+        "trees": len(model.estimators_),
+        "max_depth": fast.max_depth,
+        "nodes": len(fast.feature),
+        "agreement": float(np.mean(pred == teacher)),
+        "accuracy": float(np.mean(pred == y)),
+        "pkl_kib": pkl_bytes / 1024,
+        "npz_kib": npz_bytes / 1024,
+        "sklearn_us": _time_per_call(lambda: model.predict(x), max(5, reps // 20)) * 1e6,
+        "fast_us": _time_per_call(lambda: fast.predict(x), reps) * 1e6,
+    }
+
+def mark_pareto(rows):
+    # ดีกว่า = agreement สูง, fast latency ต่ำ, ไฟล์เล็ก
+    for r in rows:
+        r["pareto"] = not any(
+            o is not r
+            and o["agreement"] >= r["agreement"] and o["fast_us"] <= r["fast_us"] and o["npz_kib"] <= r["npz_kib"]
+            and (o["agreement"] > r["agreement"] or o["fast_us"] < r["fast_us"] or o["npz_kib"] < r["npz_kib"])
+            for o in rows)
+    return rows
+
+_COLUMNS = ["name", "trees", "max_depth", "nodes", "agreement", "accuracy",
+            "pkl_kib", "npz_kib", "sklearn_us", "fast_us", "pareto"]
+
+def print_report(rows):
+    print(f"{'candidate':18s} {'trees':>5s} {'depth':>5s} {'nodes':>6s} {'agree':>7s} {'acc':>7s} "
+          f"{'pkl KiB':>8s} {'npz KiB':>8s} {'sk us':>8s} {'fast us':>8s}  pareto")
+    for r in rows:
+        print(f"{r['name']:18s} {r['trees']:5d} {r['max_depth']:5d} {r['nodes']:6d} {r['agreement']:7.4f} "
+              f"{r['accuracy']:7.4f} {r['pkl_kib']:8.1f} {r['npz_kib']:8.1f} {r['sklearn_us']:8.1f} "
+              f"{r['fast_us']:8.1f}  {'*' if r['pareto'] else ''}")
+
+def write_csv(path, rows):
+    with open(path, "w") as f:
+        f.write(",".join(_COLUMNS) + "\n")
+        for r in rows:
+            f.write(",".join(f"{r[c]:.6g}" if isinstance(r[c], float) else str(r[c]) for c in _COLUMNS) + "\n")
+
+def main():
+    ap = argparse.ArgumentParser(description="Prune/distill the gesture forest and report latency vs accuracy")
+    ap.add_argument("dataset")
+    ap.add_argument("--model", default="gesture_model.pkl")
+    ap.add_argument("--labels", default=DEFAULT_LABELS)
+    ap.add_argument("--sizes", default="10,20,40", help="tree counts to try")
+    ap.add_argument("--depths", default="6,8", help="max_depth values for distilled forests")
+    ap.add_argument("--test-frac", type=float, default=0.3)
+    ap.add_argument("--reps", type=int, default=1000, help="timed single-sample calls per candidate")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out-dir", default=None, help="write every candidate as <name>.npz")
+    ap.add_argument("--force", action="store_true", help="write candidates even if the label count does not match")
+    ap.add_argument("--csv", default=None)
+    args = ap.parse_args()
+
+    class_labels = [s.strip() for s in args.labels.split(",") if s.strip()]
+    sizes  = [int(s) for s in args.sizes.split(",") if s]
+    depths = [int(s) for s in args.depths.split(",") if s]
+
+    model = joblib.load(args.model)
+    if args.out_dir:
+        # label ตามเลขคลาสของโมเดลเดิม (ตัวที่ distill อาจเห็นไม่ครบทุกคลาส แต่ใช้เลขชุดเดียวกัน)
+        check_labels(class_labels, model.classes_, args.force)
+    X, y = load_dataset(args.dataset, class_labels)
+    teacher = model.predict(X)
+
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(X))
+    n_test = max(1, int(len(X) * args.test_frac))
+    test, fit = order[:n_test], order[n_test:]
+    print(f"[INFO] {args.dataset}: {len(X)} samples ({len(fit)} fit / {len(test)} eval), "
+          f"original accuracy {np.mean(teacher[test] == y[test]):.4f}")
+
+    cands = build_candidates(model, X[fit], teacher[fit], sizes, depths, args.seed)
+    rows = [evaluate(name, m, X[test], y[test], teacher[test], class_labels, args.reps) for name, m in cands]
+    print_report(mark_pareto(rows))
+
+    if args.csv:
+        write_csv(args.csv, rows)
+        print(f"[INFO] report -> {args.csv}")
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+        for name, m in cands:
+            path = os.path.join(args.out_dir, name + ".npz")
+            save_forest(path, FastForest.from_sklearn(m), class_labels, FEATURE_LAYOUT_VERSION)
+        print(f"[INFO] {len(cands)} candidates -> {args.out_dir}/")
+
+if __name__ == "__main__":
+    main()
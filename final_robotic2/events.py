@@ -0,0 +1,140 @@
+# events.py
+# Event bus: frame loop แค่ publish อีเวนต์ (ไม่รอใคร) แต่ละ sink (เสียง / ป้ายภาพ / log / ...)
+# มีคิวขนาดจำกัดและ worker thread ของตัวเอง sink ที่ช้าจะไม่ทำให้กล้อง/การตรวจช้าตาม
+# คิวเต็ม -> ทิ้งอีเวนต์เก่าสุดของ sink นั้น (นับใน dropped)
+import json, threading, time
+
+from pipeline import DropOldestQueue
+
+class Event:
+    __slots__ = ("label", "t", "wall", "data")
+
+    def __init__(self, label, data):
+        self.label = label
+        self.t = time.monotonic()     # เวลา publish (ใช้วัด latency ของ sink)
+        self.wall = time.time()
+        self.data = data
+
+
+class Sink:
+    """One subscriber: bounded drop-oldest queue + worker thread calling fn(event)."""
+
+    def __init__(self, name, fn, maxsize=16):
+        self.name = name
+        self.fn = fn
+        self.queue = DropOldestQueue(maxsize)
+        self.delivered = 0
+        self.errors = 0
+        self.wait_sum = 0.0           # publish -> เริ่ม fn
+        self.wait_max = 0.0
+        self.run_sum = 0.0            # เวลาใน fn
+        self.run_max = 0.0
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"sink-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            ev = self.queue.get(timeout=0.5)
+            if ev is None:
+                if self.queue.closed:
+                    break
+                continue
+            t0 = time.monotonic()
+            try:
+                self.fn(ev)
+                self.delivered += 1
+            except Exception as e:
+                if not self.errors:   # แจ้งครั้งแรกครั้งเดียว ที่เหลือนับใน errors
+                    print(f"[WARN] event sink {self.name}: {e}")
+                self.errors += 1
+            t1 = time.monotonic()
+            wait, run = t0 - ev.t, t1 - t0
+            self.wait_sum += wait
+            self.run_sum += run
+            self.wait_max = max(self.wait_max, wait)
+            self.run_max = max(self.run_max, run)
+
+    def stop(self, timeout=2.0):
+        # คิวที่ปิดแล้วยังส่งของที่ค้างอยู่ให้ worker จนหมด แล้วค่อยปิด fn (ถ้ามี close เช่น JsonlSink)
+        self.queue.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return                # worker ยังอยู่ใน fn: ไม่ปิดทับ
+            self._thread = None
+        close = getattr(self.fn, "close", None)
+        if close is not None:
+            close()
+
+    def stats(self):
+        n = max(self.delivered + self.errors, 1)
+        return {"delivered": self.delivered, "dropped": self.queue.dropped, "errors": self.errors,
+                "max_depth": self.queue.max_depth,
+                "wait_ms": 1e3 * self.wait_sum / n, "wait_max_ms": 1e3 * self.wait_max,
+                "run_ms": 1e3 * self.run_sum / n, "run_max_ms": 1e3 * self.run_max}
+
+
+class EventBus:
+    """publish(label, **data) enqueues one Event per sink and returns at once."""
+
+    def __init__(self):
+        self.sinks = []
+        self.published = 0
+        self._running = False
+
+    def subscribe(self, name, fn, maxsize=16):
+        sink = Sink(name, fn, maxsize)
+        self.sinks.append(sink)
+        if self._running:
+            sink.start()
+        return sink
+
+    def start(self):
+        self._running = True
+        for sink in self.sinks:
+            sink.start()
+        return self
+
+    def publish(self, label, **data):
+        ev = Event(label, data)
+        for sink in self.sinks:
+            sink.queue.put(ev)
+        self.published += 1
+        return ev
+
+    def stop(self, timeout=2.0):
+        self._running = False
+        for sink in self.sinks:
+            sink.stop(timeout)
+
+    def stats(self):
+        return {sink.name: sink.stats() for sink in self.sinks}
+
+    def format_stats(self):
+        parts = []
+        for name, s in self.stats().items():
+            parts.append(f"{name}: {s['delivered']} ok/{s['dropped']} dropped/{s['errors']} err, "
+                         f"wait {s['wait_ms']:.2f} ms (max {s['wait_max_ms']:.1f}), "
+                         f"run {s['run_ms']:.2f} ms (max {s['run_max_ms']:.1f})")
+        return f"{self.published} published; " + "; ".join(parts)
+
+
+class JsonlSink:
+    """Sink fn appending one JSON line per event (time, label, data).
+
+    close() closes the file; Sink.stop (from EventBus.stop) calls it.
+    """
+
+    def __init__(self, path):
+        self.fh = open(path, "a", buffering=1)
+
+    def __call__(self, ev):
+        self.fh.write(json.dumps({"time": round(ev.wall, 3), "label": ev.label, **ev.data}) + "\n")
+
+    def close(self):
+        self.fh.close()
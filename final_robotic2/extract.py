@@ -1,42 +1,76 @@
 import numpy as np
- 
+
+N_LANDMARKS = 21
+N_FEATURES  = 27
+# เพิ่มเลขนี้ทุกครั้งที่ลำดับ/สูตรฟีเจอร์เปลี่ยน (โมเดลที่ export ไว้จะเช็คค่านี้)
+FEATURE_LAYOUT_VERSION = 1
+
+PAIRS = [
+    (0, 4), (0, 8), (0, 12), (0, 16), (0, 20),
+    (4, 8), (8, 12), (12, 16), (16, 20),
+    (5, 9), (9, 13), (13, 17)
+]
+
+ANGLES = [
+    (0, 1, 2), (1, 2, 3), (2, 3, 4),
+    (0, 5, 6), (5, 6, 7), (6, 7, 8),
+    (0, 9,10), (9,10,11), (10,11,12),
+    (0,13,14), (13,14,15), (14,15,16),
+    (0,17,18), (17,18,19), (18,19,20)
+]
+
+# index arrays สำหรับ fancy indexing (คำนวณครั้งเดียวตอน import)
+_PI, _PJ = (np.array(c) for c in zip(*PAIRS))
+_AA, _AB, _AC = (np.array(c) for c in zip(*ANGLES))
+_N_PAIRS = len(PAIRS)
+
 def euclidean(p1, p2):
     return np.linalg.norm(np.array(p1) - np.array(p2))
- 
+
 def angle_between(a, b, c):
     ba = np.array(a) - np.array(b)
     bc = np.array(c) - np.array(b)
     cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc) + 1e-6)
-    return np.arccos(np.clip(cosine_angle, -1.0, 1.0))  
- 
-def extract_features(keypoints):
- 
-    keypoints = np.array(keypoints)
-    if keypoints.shape != (21, 3):
+    return np.arccos(np.clip(cosine_angle, -1.0, 1.0))
+
+def extract_features_batch(keypoints, out=None):
+    """(N, 21, 3) -> (N, 27): 12 distances then 15 joint angles per hand.
+
+    Pass a preallocated `out` of shape (N, 27) to avoid allocating the result.
+    """
+    keypoints = np.asarray(keypoints, dtype=np.float64)
+    if keypoints.ndim != 3 or keypoints.shape[1:] != (N_LANDMARKS, 3):
+        raise ValueError("Expected input shape (N, 21, 3), got {}".format(keypoints.shape))
+    n = keypoints.shape[0]
+    if out is None:
+        out = np.empty((n, N_FEATURES), dtype=np.float64)
+    elif out.shape != (n, N_FEATURES):
+        raise ValueError("Expected out shape {}, got {}".format((n, N_FEATURES), out.shape))
+
+    d = keypoints[:, _PI] - keypoints[:, _PJ]
+    np.sqrt(np.einsum("nki,nki->nk", d, d), out=out[:, :_N_PAIRS])
+
+    b  = keypoints[:, _AB]
+    ba = keypoints[:, _AA] - b
+    bc = keypoints[:, _AC] - b
+    dot = np.einsum("nki,nki->nk", ba, bc)
+    norm = np.sqrt(np.einsum("nki,nki->nk", ba, ba) * np.einsum("nki,nki->nk", bc, bc))
+    cos = dot / (norm + 1e-6)
+    np.arccos(np.clip(cos, -1.0, 1.0, out=cos), out=out[:, _N_PAIRS:])
+    return out
+
+def extract_features(keypoints, out=None):
+
+    keypoints = np.asarray(keypoints, dtype=np.float64)
+    if keypoints.shape != (N_LANDMARKS, 3):
         raise ValueError("Expected input shape (21, 3), got {}".format(keypoints.shape))
- 
-    features = []
- 
-    pairs = [
-        (0, 4), (0, 8), (0, 12), (0, 16), (0, 20),
-        (4, 8), (8, 12), (12, 16), (16, 20),    
-        (5, 9), (9, 13), (13, 17)
-    ]
- 
-    for i, j in pairs:
-        dist = euclidean(keypoints[i], keypoints[j])
-        features.append(dist)
- 
-    angles = [
-        (0, 1, 2), (1, 2, 3), (2, 3, 4),
-        (0, 5, 6), (5, 6, 7), (6, 7, 8),
-        (0, 9,10), (9,10,11), (10,11,12),
-        (0,13,14), (13,14,15), (14,15,16),
-        (0,17,18), (17,18,19), (18,19,20)
-    ]
- 
-    for a, b, c in angles:
-        ang = angle_between(keypoints[a], keypoints[b], keypoints[c])
-        features.append(ang)
- 
-    return np.array(features)
\ No newline at end of file
+
+    if out is not None:
+        # reshape ของ array ที่ไม่ contiguous จะได้สำเนา (เขียนแล้วหาย) จึงตรวจก่อน
+        if (not isinstance(out, np.ndarray) or out.size != N_FEATURES or not out.flags.c_contiguous
+                or out.dtype not in (np.float32, np.float64)):
+            raise ValueError("out must be a C-contiguous float32/float64 array of {} values, got {}".format(
+                N_FEATURES, getattr(out, "shape", type(out))))
+        extract_features_batch(keypoints[None], out=out.reshape(1, N_FEATURES))
+        return out
+    return extract_features_batch(keypoints[None])[0]
@@ -0,0 +1,288 @@
+# forest.py
+# Array-backed inference for the sklearn RandomForestClassifier in gesture_model.pkl.
+# ต้นไม้ทุกต้นถูก flatten เป็น array ต่อเนื่อง แล้วเดินทุกต้นพร้อมกันด้วย NumPy
+# (ไม่เรียก sklearn บน hot path)
+import math, struct, zipfile
+import numpy as np
+
+# เวอร์ชันของไฟล์ .npz ที่ save_forest เขียน (เปลี่ยนเมื่อชุด array/ความหมายเปลี่ยน)
+FORMAT_VERSION = 1
+_ARRAYS = ("feature", "threshold", "children", "value", "roots", "classes")
+# predict_proba ที่มีแถวไม่เกินนี้ (มือในเฟรมเดียว) เดินแบบ lockstep ต่อแถว: เร็วกว่า leaves() ที่เน้น batch ใหญ่
+SMALL_BATCH = 4
+
+
+class FastForest:
+    """All trees of a forest flattened into contiguous node arrays.
+
+    Node i of the flattened forest tests `x[feature[i]] <= threshold[i]` and
+    moves to `children[i, 0]` (left) or `children[i, 1]` (right). Leaves point
+    to themselves, so every tree can be walked for `max_depth` steps in lockstep.
+    `value[i]` holds the normalized class distribution of node i.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, classes, max_depth,
+                 class_labels=None, feature_layout_version=None):
+        self.feature   = np.ascontiguousarray(feature,   dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.children  = np.ascontiguousarray(children,  dtype=np.intp)
+        self.value     = np.ascontiguousarray(value,     dtype=np.float64)
+        self.roots     = np.ascontiguousarray(roots,     dtype=np.intp)
+        self.classes_  = np.asarray(classes)
+        self.max_depth = int(max_depth)
+        self.class_labels = None if class_labels is None else [str(c) for c in class_labels]
+        self.feature_layout_version = feature_layout_version
+        self.n_estimators = len(self.roots)
+        # สถิติของ predict_one_early (ไว้ดูว่าประหยัดไปกี่ต้น)
+        self.early_calls = 0
+        self.early_trees = 0
+        # children[i, 0/1] เป็นดัชนีใน array แบบแบน: 2*node + go_right
+        self._flat_children = self.children.ravel()
+        self._left = np.ascontiguousarray(self.children[:, 0])
+        self._right = np.ascontiguousarray(self.children[:, 1])
+        self._early = None
+
+    @classmethod
+    def from_sklearn(cls, model):
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("only single-output forests are supported")
+        feature, threshold, children, value, roots = [], [], [], [], []
+        offset, max_depth = 0, 0
+        for est in model.estimators_:
+            t = est.tree_
+            n = t.node_count
+            idx = np.arange(n)
+            leaf = t.children_left == -1
+            f = np.where(leaf, 0, t.feature)
+            left  = np.where(leaf, idx, t.children_left)  + offset
+            right = np.where(leaf, idx, t.children_right) + offset
+            v = t.value[:, 0, :].astype(np.float64)
+            s = v.sum(axis=1, keepdims=True)
+            v = np.divide(v, s, out=np.zeros_like(v), where=s > 0)
+
+            feature.append(f)
+            threshold.append(t.threshold)
+            children.append(np.stack([left, right], axis=1))
+            value.append(v)
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, t.max_depth)
+
+        return cls(np.concatenate(feature), np.concatenate(threshold),
+                   np.concatenate(children), np.concatenate(value),
+                   np.array(roots), model.classes_, max_depth)
+
+    # ---------- inference ----------
+    def _walk_one(self, x, t0, t1, nxt):
+        """Leaves of trees t0..t1-1 for one float32 sample. Every split of those
+        trees is decided in one vectorized pass (nodes of a tree are contiguous),
+        so the depth loop is a single gather per level."""
+        lo = self.roots[t0]
+        hi = self.roots[t1] if t1 < self.n_estimators else len(self.feature)
+        go_right = x[self.feature[lo:hi]] > self.threshold[lo:hi]
+        np.copyto(nxt[lo:hi], self._left[lo:hi])
+        np.copyto(nxt[lo:hi], self._right[lo:hi], where=go_right)
+        node = self.roots[t0:t1]
+        for _ in range(self.max_depth):
+            node = nxt[node]
+        return node
+
+    def leaves_one(self, x):
+        """Leaf index reached in every tree for one sample of shape (n_features,)."""
+        # sklearn เทียบ threshold กับ X แบบ float32
+        x = np.asarray(x, dtype=np.float32)
+        return self._walk_one(x, 0, self.n_estimators, np.empty(len(self.feature), dtype=np.intp))
+
+    def leaves(self, X):
+        """Leaf indices of shape (n_samples, n_trees)."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2:
+            raise ValueError("Expected 2D input, got shape {}".format(X.shape))
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.n_estimators))
+        for _ in range(self.max_depth):
+            go_right = X[rows, self.feature[node]] > self.threshold[node]
+            node = self._flat_children[2 * node + go_right]
+        return node
+
+    def tree_depths(self):
+        """Number of splits on the longest root-to-leaf path of every tree."""
+        depth = np.zeros(self.n_estimators, dtype=np.intp)
+        frontier, d = self.roots, 0
+        while len(frontier):
+            frontier = frontier[self._left[frontier] != frontier]     # เฉพาะ node ที่ยังไม่ใช่ leaf
+            d += 1
+            depth[np.searchsorted(self.roots, frontier, side="right") - 1] = d
+            frontier = np.concatenate([self._left[frontier], self._right[frontier]])
+        return depth
+
+    def _early_tables(self):
+        # ลำดับต้นไม้ไม่มีผลกับผลรวมโหวต: จัด node ใหม่ให้ต้นตื้นมาก่อน (ยังต่อเนื่องทีละต้น)
+        # block แรก ๆ จึงวน depth น้อยรอบ และยังตัดสินทุก split ของ block ได้ใน pass เดียว
+        if self._early is None:
+            depth = self.tree_depths()
+            order = np.argsort(depth, kind="stable")
+            ends = np.append(self.roots[1:], len(self.feature))
+            idx = np.concatenate([np.arange(self.roots[t], ends[t]) for t in order])
+            new_id = np.empty_like(idx)
+            new_id[idx] = np.arange(len(idx))
+            sizes = (ends - self.roots)[order]
+            self._early = (self.feature[idx], self.threshold[idx],
+                           new_id[self._left[idx]], new_id[self._right[idx]],
+                           np.ascontiguousarray(self.value[idx].T),      # (classes, nodes): รวมโหวตเร็วกว่า
+                           new_id[self.roots[order]],
+                           [0] + np.cumsum(sizes).tolist(), depth[order].tolist())
+        return self._early
+
+    @staticmethod
+    def _walk_block(x, t0, t1, tab):
+        """Leaves (shallow-first layout) of trees t0..t1-1 for one float32 sample.
+
+        Every split of the block is decided in one compare over its nodes, then
+        each level is a single gather through that next-node table. Per level
+        this is one NumPy call instead of the four a path walk needs (feature,
+        x, threshold, child), which is what dominates at one sample.
+        """
+        feature, threshold, left, right, _, roots, bounds, depth = tab
+        lo, hi = bounds[t0], bounds[t1]
+        nxt = np.where(x.take(feature[lo:hi]) > threshold[lo:hi], right[lo:hi], left[lo:hi])
+        node = roots[t0:t1]
+        if lo:
+            nxt -= lo
+            node = node - lo
+        for _ in range(depth[t1 - 1]):
+            node = nxt.take(node)
+        return node + lo if lo else node
+
+    def predict_one_early(self, x, margin=None, min_block=10):
+        """Predict one sample, stopping once the remaining trees cannot change the winner.
+
+        Each tree adds a probability vector summing to 1, so once the leader's
+        lead over the runner-up is larger than the number of trees left, the
+        argmax is final and the result equals predict(). That can first happen
+        after half the forest plus one, so the exact mode walks that block,
+        checks once, and otherwise walks the rest. With `margin` set (in tree
+        votes) a first block of max(margin, min_block) trees is checked before
+        that, and evaluation also stops once the lead reaches the margin:
+        approximate, and never more trees than the exact mode (it passes the
+        same boundaries with the same votes).
+
+        Trees are walked shallowest first (the order does not change the
+        vote), each block looping only to its deepest tree's depth.
+
+        Returns (label, n_trees_evaluated).
+        """
+        x = np.asarray(x, dtype=np.float32)
+        tab = self._early_tables()
+        value_t = tab[4]
+        n_total = self.n_estimators
+        # เช็คบ่อยกว่านี้ไม่คุ้ม: ค่าโสหุ้ยต่อ block มากกว่าต้นที่อาจประหยัดได้
+        half = min(n_total, max(min_block, n_total // 2 + 1))
+        ends = [half, n_total]
+        if margin is not None:
+            ends.insert(0, min(half, max(min_block, math.ceil(margin))))
+        acc = np.zeros(value_t.shape[0])
+        done = 0
+        for end in ends:
+            if end <= done:
+                continue
+            acc += value_t.take(self._walk_block(x, done, end, tab), axis=1).sum(axis=1)
+            done = end
+            top = sorted(acc.tolist())
+            lead = top[-1] - (top[-2] if len(top) > 1 else 0.0)
+            if lead > n_total - done or (margin is not None and lead >= margin):
+                break
+
+        self.early_calls += 1
+        self.early_trees += done
+        return self.classes_[np.argmax(acc)], done
+
+    def predict_proba_one(self, x):
+        return self.value[self.leaves_one(x)].mean(axis=0)
+
+    def predict_one(self, x):
+        return self.classes_[np.argmax(self.predict_proba_one(x))]
+
+    def _proba_small(self, X):
+        """predict_proba for a few samples (e.g. the hands of one frame) in lockstep.
+
+        Each sample gets its own next-node table (one compare over all nodes),
+        laid side by side with offsets, so all samples walk together with one
+        gather per level. Per-call overhead is paid once instead of per sample.
+        """
+        n, n_trees = len(self.feature), self.n_estimators
+        off = np.arange(0, len(X) * n, n)
+        nxt = np.where(X.take(self.feature, axis=1) > self.threshold, self._right, self._left)
+        nxt += off[:, None]
+        nxt = nxt.ravel()
+        node = (self.roots + off[:, None]).ravel()
+        for _ in range(self.max_depth):
+            node = nxt.take(node)
+        node -= np.repeat(off, n_trees)
+        return self.value.take(node, axis=0).reshape(len(X), n_trees, -1).sum(axis=1) / n_trees
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        if X.ndim == 2 and 0 < X.shape[0] <= SMALL_BATCH:
+            return self._proba_small(X.astype(np.float32, copy=False))
+        return self.value[self.leaves(X)].mean(axis=1)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+# ---------- compact file format ----------
+# .npz แบบไม่บีบอัด: แต่ละ array เป็นไฟล์ .npy ที่เก็บต่อกันใน zip
+# จึง mmap ได้ตรง ๆ และเปิดด้วย np.load ธรรมดาก็ได้ (ไม่ต้อง import sklearn)
+
+def save_forest(path, forest, class_labels=None, feature_layout_version=None):
+    labels = class_labels if class_labels is not None else forest.class_labels
+    layout = feature_layout_version if feature_layout_version is not None else forest.feature_layout_version
+    arrays = {name: getattr(forest, name if name != "classes" else "classes_") for name in _ARRAYS}
+    np.savez(path,
+             format_version=np.int64(FORMAT_VERSION),
+             max_depth=np.int64(forest.max_depth),
+             feature_layout_version=np.int64(-1 if layout is None else layout),
+             class_labels=np.array([] if labels is None else list(labels), dtype=str),
+             **arrays)
+
+def _npz_members(path, mmap_mode):
+    members = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as fh:
+        for info in zf.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if mmap_mode is None or info.compress_type != zipfile.ZIP_STORED:
+                with zf.open(info) as m:
+                    members[name] = np.lib.format.read_array(m)
+                continue
+            # local file header: 30 ไบต์ + ชื่อไฟล์ + extra field แล้วจึงเป็นข้อมูล .npy
+            fh.seek(info.header_offset)
+            hdr = fh.read(30)
+            name_len, extra_len = struct.unpack("<HH", hdr[26:30])
+            fh.seek(info.header_offset + 30 + name_len + extra_len)
+            major, _ = np.lib.format.read_magic(fh)
+            read_header = (np.lib.format.read_array_header_1_0 if major == 1
+                           else np.lib.format.read_array_header_2_0)
+            shape, fortran, dtype = read_header(fh)
+            if dtype.hasobject:
+                raise ValueError("object arrays are not allowed in a compact model: " + name)
+            if len(shape) == 0:
+                members[name] = np.frombuffer(fh.read(dtype.itemsize), dtype=dtype)[0]
+            else:
+                members[name] = np.memmap(path, dtype=dtype, mode=mmap_mode, shape=shape,
+                                          order="F" if fortran else "C", offset=fh.tell())
+    return members
+
+def load_forest(path, mmap_mode="r", expected_layout=None):
+    """Load a model written by save_forest. Arrays are memory-mapped when mmap_mode is set."""
+    z = _npz_members(path, mmap_mode)
+    version = int(z.get("format_version", -1))
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported model format version {version} (expected {FORMAT_VERSION})")
+    layout = int(z["feature_layout_version"])
+    if expected_layout is not None and layout != expected_layout:
+        raise ValueError(f"{path}: feature layout v{layout} does not match extract.py v{expected_layout}")
+    labels = [str(c) for c in z["class_labels"]] or None
+    return FastForest(z["feature"], z["threshold"], z["children"], z["value"], z["roots"],
+                      z["classes"], int(z["max_depth"]),
+                      class_labels=labels, feature_layout_version=layout)
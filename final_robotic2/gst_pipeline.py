@@ -0,0 +1,91 @@
+# gst_pipeline.py
+# สร้าง GStreamer pipeline แบบ latency ต่ำสำหรับ cv2.VideoCapture(..., cv2.CAP_GSTREAMER)
+# - USB: v4l2src เลือก MJPEG (jpegdec) หรือ YUYV
+# - CSI: nvarguscamerasrc -> nvvidconv
+# - TEST: videotestsrc is-live=true (ทดสอบบนเครื่อง Linux ธรรมดาที่ไม่มีกล้อง)
+# ทุกแบบจบด้วย queue แบบ leaky + appsink drop=true max-buffers=1 sync=false
+# เฟรมเก่าจะถูกทิ้งใน pipeline แทนที่จะค้างรอให้ loop มาอ่าน
+import re, shutil, subprocess
+import cv2
+
+LEAKY_QUEUE = "queue max-size-buffers=1 max-size-bytes=0 max-size-time=0 leaky=downstream"
+LOW_LATENCY_SINK = "appsink drop=true max-buffers=1 sync=false"
+DEFAULT_SINK = "appsink"
+
+def _bgr_tail(tuned=True, queue=True):
+    if not tuned:
+        return ["videoconvert", "video/x-raw, format=BGR", DEFAULT_SINK]
+    return ([LEAKY_QUEUE] if queue else []) + ["videoconvert", "video/x-raw, format=BGR", LOW_LATENCY_SINK]
+
+def usb_elements(device="/dev/video0", width=1280, height=720, fps=30, fmt="mjpeg",
+                 decoder="jpegdec", tuned=True):
+    """v4l2src pipeline. fmt "mjpeg" (camera compresses, decode with `decoder`,
+    e.g. "nvjpegdec" on Jetson) or "yuyv" (raw, limited fps at high resolution)."""
+    src = f"v4l2src device={device}"
+    if fmt == "mjpeg":
+        head = [src, f"image/jpeg, width={width}, height={height}, framerate={fps}/1"]
+        if tuned:
+            head.append(LEAKY_QUEUE)   # ทิ้ง JPEG เก่าก่อน decode จะได้ไม่ decode เฟรมที่ไม่ใช้
+        head.append(decoder)
+        return head + _bgr_tail(tuned, queue=False)
+    if fmt == "yuyv":
+        head = [src, f"video/x-raw, format=YUY2, width={width}, height={height}, framerate={fps}/1"]
+        return head + _bgr_tail(tuned)
+    raise ValueError(f"unknown USB format: {fmt}")
+
+def csi_elements(sensor_id=0, width=1280, height=720, fps=30, flip=0, tuned=True):
+    """nvarguscamerasrc pipeline (Jetson). nvvidconv does the NVMM copy and
+    NV12->BGRx on the VIC; videoconvert only drops the alpha byte."""
+    return [f"nvarguscamerasrc sensor-id={sensor_id}",
+            f"video/x-raw(memory:NVMM), width={width}, height={height}, framerate={fps}/1, format=NV12",
+            f"nvvidconv flip-method={flip}",
+            "video/x-raw, format=BGRx"] + _bgr_tail(tuned)
+
+def test_elements(width=1280, height=720, fps=30, pattern="ball", fmt="raw", tuned=True):
+    """videotestsrc as a live source. fmt="mjpeg" encodes + decodes JPEG to
+    exercise the same decode path as a USB MJPEG camera."""
+    head = [f"videotestsrc is-live=true pattern={pattern}",
+            f"video/x-raw, width={width}, height={height}, framerate={fps}/1"]
+    if fmt == "mjpeg":
+        head += ["jpegenc"] + ([LEAKY_QUEUE] if tuned else []) + ["jpegdec"]
+        return head + _bgr_tail(tuned, queue=False)
+    return head + _bgr_tail(tuned)
+
+def to_string(elements):
+    return " ! ".join(elements)
+
+def open_pipeline(elements):
+    pipeline = to_string(elements)
+    return cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER), pipeline
+
+def gstreamer_available():
+    return re.search(r"GStreamer:\s+YES", cv2.getBuildInformation()) is not None
+
+def probe_caps(elements, num_buffers=3, timeout=10.0):
+    """Run the pipeline with gst-launch-1.0 -v (fakesink instead of appsink)
+    and return the caps negotiated on each pad, in pipeline order.
+
+    Returns a list of (pad, caps) or None if gst-launch-1.0 is missing/fails.
+    """
+    if shutil.which("gst-launch-1.0") is None:
+        return None
+    els = list(elements)
+    els[0] = f"{els[0]} num-buffers={num_buffers}"
+    els[-1] = "fakesink sync=false"
+    cmd = ["gst-launch-1.0", "-v"] + " ! ".join(els).split()
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout).stdout
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    caps, seen = [], set()
+    for m in re.finditer(r"^/GstPipeline:\S+?/(\S+?)\.GstPad:(\S+): caps = (.+)$", out, re.M):
+        key = (m.group(1), m.group(2))
+        if key not in seen:
+            seen.add(key)
+            caps.append((f"{m.group(1)}.{m.group(2)}", m.group(3).strip()))
+    return caps
+
+def describe_capture(cap):
+    """What OpenCV reports after negotiation: (width, height, fps)."""
+    return (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            cap.get(cv2.CAP_PROP_FPS))
@@ -0,0 +1,164 @@
+# landmark_log.py
+# บันทึก landmarks ต่อเฟรมเป็นไฟล์ binary แบบ append-only (ไม่มีภาพ) แล้วเปิดกลับด้วย np.memmap
+# header 16 byte + record ขนาดคงที่ (numpy structured dtype) ต่อกันไปเรื่อย ๆ
+# ถ้าโปรแกรมตายกลางคัน record สุดท้ายที่เขียนไม่ครบจะถูกตัดทิ้ง (ตอนอ่าน และตัดออกจากไฟล์ก่อนเขียนต่อ)
+import os, queue, struct, threading, time
+import numpy as np
+
+MAGIC = b"LMKLOG\x00\x01"
+FORMAT_VERSION = 1
+HEADER_SIZE = 16
+HANDEDNESS_CODES = {"": 0, "Left": 1, "Right": 2}
+HANDEDNESS_NAMES = ("", "Left", "Right")
+
+def record_dtype(max_hands=2):
+    return np.dtype([
+        ("t", "<f8"),                       # time.time() ตอนได้เฟรม
+        ("frame", "<u4"),
+        ("n_hands", "u1"),
+        ("handedness", "u1", (max_hands,)),  # HANDEDNESS_CODES
+        ("score", "<f4", (max_hands,)),
+        ("kps", "<f4", (max_hands, 21, 3)),
+    ])
+
+def _header(max_hands):
+    return MAGIC + struct.pack("<HHI", FORMAT_VERSION, max_hands, record_dtype(max_hands).itemsize)
+
+
+class LandmarkLogWriter:
+    """Append per-frame landmarks to `path` from a background thread.
+
+    append() only copies into a preallocated batch; full batches (or a partial
+    one every `flush_sec`) are handed to the writer thread, which writes them
+    with a single write + flush. If the writer falls `max_pending` batches
+    behind, new batches are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, path, max_hands=2, batch=256, flush_sec=1.0, max_pending=64):
+        self.path = path
+        self.max_hands = max_hands
+        self.dtype = record_dtype(max_hands)
+        self.batch_size = batch
+        self.flush_sec = flush_sec
+        size = os.path.getsize(path) if os.path.isfile(path) else 0
+        self.truncated = 0
+        if 0 < size < HEADER_SIZE:
+            # header เขียนไม่ครบ (ตายตอนสร้างไฟล์) -> เริ่มไฟล์ใหม่
+            with open(path, "rb") as f:
+                if not _header(max_hands).startswith(f.read()):
+                    raise ValueError(f"{path}: not a landmark log")
+            self.truncated = size
+            size = 0
+        elif size:
+            _check_header(path, max_hands)
+            # record สุดท้ายเขียนไม่ครบ (ตายกลางคัน) -> ตัดทิ้งก่อน append ไม่งั้น record ใหม่จะเหลื่อม
+            self.truncated = (size - HEADER_SIZE) % self.dtype.itemsize
+        if self.truncated:
+            print(f"[WARN] {path}: dropping {self.truncated} bytes of a torn write")
+            os.truncate(path, size - self.truncated if size else 0)
+        new = size == 0
+        self._fh = open(path, "ab")
+        if new:
+            self._fh.write(_header(max_hands))
+            self._fh.flush()
+        self._batch = np.zeros(batch, dtype=self.dtype)
+        self._n = 0
+        self._last_flush = time.monotonic()
+        self._q = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="landmark-log", daemon=True)
+        self._thread.start()
+        self.written = 0
+        self.dropped = 0
+
+    def append(self, t, frame_id, kps, handedness):
+        rec = self._batch[self._n]
+        n = min(len(kps), self.max_hands)
+        rec["t"] = t
+        rec["frame"] = frame_id
+        rec["n_hands"] = n
+        rec["kps"][:n] = kps[:n]
+        rec["kps"][n:] = 0
+        rec["handedness"][:] = 0
+        rec["score"][:] = 0
+        for i in range(n):
+            rec["handedness"][i] = HANDEDNESS_CODES.get(handedness[i][0], 0)
+            rec["score"][i] = handedness[i][1]
+        self._n += 1
+        if self._n == self.batch_size or time.monotonic() - self._last_flush >= self.flush_sec:
+            self._hand_off()
+
+    def _hand_off(self):
+        if self._n == 0:
+            return
+        try:
+            self._q.put_nowait(self._batch[:self._n].tobytes())
+        except queue.Full:
+            self.dropped += self._n
+        self._n = 0
+        self._last_flush = time.monotonic()
+
+    def _run(self):
+        while True:
+            data = self._q.get()
+            if data is None:
+                break
+            self._fh.write(data)
+            self._fh.flush()
+            self.written += len(data) // self.dtype.itemsize
+
+    def close(self):
+        self._hand_off()
+        self._q.put(None)
+        self._thread.join()
+        self._fh.close()
+
+
+def _check_header(path, max_hands=None):
+    with open(path, "rb") as f:
+        head = f.read(HEADER_SIZE)
+    if len(head) < HEADER_SIZE or head[:8] != MAGIC:
+        raise ValueError(f"{path}: not a landmark log")
+    version, hands, itemsize = struct.unpack("<HHI", head[8:])
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path}: format version {version}, expected {FORMAT_VERSION}")
+    if max_hands is not None and hands != max_hands:
+        raise ValueError(f"{path}: recorded with max_hands={hands}, writer has {max_hands}")
+    if record_dtype(hands).itemsize != itemsize:
+        raise ValueError(f"{path}: record size {itemsize} does not match this version")
+    return hands
+
+def open_log(path, mode="r"):
+    """Memory-map a landmark log as a structured array of records."""
+    hands = _check_header(path)
+    dtype = record_dtype(hands)
+    n = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+    if n == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, offset=HEADER_SIZE, shape=(n,))
+
+def frame_handedness(rec):
+    return [(HANDEDNESS_NAMES[c], float(s)) for c, s in
+            zip(rec["handedness"][:rec["n_hands"]], rec["score"][:rec["n_hands"]])]
+
+def iter_proba_batches(records, model, chunk=65536):
+    """Classify a log in chunks: one extract_features_batch + predict_proba per chunk.
+
+    Yields (records_chunk, probas, ends): probas holds one predict_proba row
+    per hand (columns = model.classes_), frames in order, and frame i owns
+    rows ends[i-1]:ends[i] (hand order kept), the same rows detect.py gives
+    the debouncer.
+    """
+    from extract import extract_features_batch, N_FEATURES
+
+    feats = np.empty((chunk * records.dtype["kps"].shape[0], N_FEATURES), dtype=np.float64)
+    for start in range(0, len(records), chunk):
+        recs = records[start:start + chunk]
+        n_hands = recs["n_hands"].astype(np.intp)
+        mask = np.arange(recs["kps"].shape[1]) < n_hands[:, None]   # (F, max_hands)
+        kps = recs["kps"][mask]                                        # มือทั้งหมดเรียงตามเฟรม
+        if len(kps):
+            X = extract_features_batch(kps, out=feats[:len(kps)])
+            probas = model.predict_proba(X)
+        else:
+            probas = np.zeros((0, len(model.classes_)))
+        yield recs, probas, np.cumsum(n_hands)
@@ -0,0 +1,232 @@
+# landmarks.py
+# MediaPipe Hands -> numpy: แปลงผลเป็น array (H, 21, 3) + handedness ครั้งเดียว
+# ส่วนอื่นของ pipeline (features / predict / วาด) ทำงานกับ array นี้อย่างเดียว
+import time
+import cv2
+import numpy as np
+import mediapipe as mp
+
+from telemetry import NULL as NULL_TELEMETRY
+
+mp_hands = mp.solutions.hands
+HAND_CONNECTIONS = tuple(mp_hands.HAND_CONNECTIONS)
+
+def create_hands(max_hands=2, min_det_conf=0.9, min_trk_conf=0.6):
+    return mp_hands.Hands(max_num_hands=max_hands,
+                          min_detection_confidence=min_det_conf,
+                          min_tracking_confidence=min_trk_conf)
+
+def results_to_arrays(results, out):
+    """Copy `results.multi_hand_landmarks` into `out` (max_hands, 21, 3).
+
+    Returns (kps, handedness): kps is a view `out[:H]`, handedness a list of
+    (label, score) per hand, e.g. ("Left", 0.98).
+    """
+    hands = results.multi_hand_landmarks or []
+    n = min(len(hands), out.shape[0])
+    for i in range(n):
+        lms = hands[i].landmark
+        if len(lms) != out.shape[1]:
+            n = i
+            break
+        for j, lm in enumerate(lms):
+            out[i, j, 0] = lm.x
+            out[i, j, 1] = lm.y
+            out[i, j, 2] = lm.z
+
+    handedness = []
+    for i in range(n):
+        try:
+            c = results.multi_handedness[i].classification[0]
+            handedness.append((c.label, float(c.score)))
+        except (TypeError, IndexError, AttributeError):
+            handedness.append(("", 0.0))
+    return out[:n], handedness
+
+def draw_hands(frame, kps, color=(0, 255, 0), point_color=(0, 0, 255)):
+    """Draw normalized (H, 21, 3) landmarks on a BGR frame."""
+    h, w = frame.shape[:2]
+    for hand in kps:
+        pts = np.empty((hand.shape[0], 2), dtype=np.int32)
+        pts[:, 0] = hand[:, 0] * w
+        pts[:, 1] = hand[:, 1] * h
+        for a, b in HAND_CONNECTIONS:
+            cv2.line(frame, tuple(pts[a]), tuple(pts[b]), color, 2)
+        for p in pts:
+            cv2.circle(frame, tuple(p), 4, point_color, -1)
+    return frame
+
+def detect_size(frame_w, frame_h, scale=1.0, max_width=0):
+    """Detection image size for a frame. Aspect ratio is kept, so normalized
+    landmarks (and everything in extract.py) are the same as at full size."""
+    s = scale
+    if max_width and frame_w * s > max_width:
+        s = max_width / float(frame_w)
+    s = min(max(s, 0.05), 1.0)
+    return max(1, int(round(frame_w * s))), max(1, int(round(frame_h * s)))
+
+
+class HandDetector:
+    """hands.process on a (optionally) downscaled copy of the frame.
+
+    The display frame is never modified; detection runs on a preallocated
+    resized RGB buffer. detect(frame_bgr) -> (kps view (H, 21, 3), handedness).
+    With input_rgb=True frames are already RGB (e.g. LatestFrameCapture(rgb=True))
+    and the conversion is skipped. With `telemetry`, times the "cvtColor"
+    (resize + BGR->RGB) and "hands.process" stages.
+    """
+
+    def __init__(self, hands, max_hands=2, scale=1.0, max_width=0, telemetry=None, input_rgb=False):
+        self.hands = hands
+        self.input_rgb = input_rgb
+        self.tel = telemetry or NULL_TELEMETRY
+        self.scale = scale
+        self.max_width = max_width
+        self.kps_buf = np.empty((max_hands, 21, 3), dtype=np.float32)
+        self.size = None
+        self._small = None
+        self._rgb = None
+
+    def _buffers(self, frame):
+        h, w = frame.shape[:2]
+        size = detect_size(w, h, self.scale, self.max_width)
+        if size != self.size:
+            self.size = size
+            self._small = np.empty((size[1], size[0], 3), dtype=np.uint8) if size != (w, h) else None
+            self._rgb = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        return size
+
+    def detect(self, frame_bgr):
+        tel = self.tel
+        t = tel.start()
+        size = self._buffers(frame_bgr)
+        if self.input_rgb:
+            # RGB อยู่แล้ว: ย่อลง buffer ตรง ๆ หรือส่งเฟรมเข้า MediaPipe เลย
+            rgb = frame_bgr
+            if self._small is not None:
+                rgb = cv2.resize(frame_bgr, size, dst=self._rgb, interpolation=cv2.INTER_AREA)
+        else:
+            src = frame_bgr
+            if self._small is not None:
+                src = cv2.resize(frame_bgr, size, dst=self._small, interpolation=cv2.INTER_AREA)
+            rgb = cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        tel.stop("cvtColor", t)
+        t = tel.start()
+        results = self.hands.process(rgb)
+        tel.stop("hands.process", t)
+        return results_to_arrays(results, self.kps_buf)
+
+
+class HandTracker:
+    """Detect inside a crop around the previous frame's hands.
+
+    After a full-frame detection, the next frames run `roi_hands.process` on a
+    square crop (landmark bbox + `pad`, resized to `roi_size` px) and map the
+    landmarks back to full-frame normalized coordinates, so extract.py sees the
+    same values. Falls back to `full` (a HandDetector) when the crop finds
+    fewer hands than before or a handedness score drops below `min_score`.
+
+    The crop cannot see a hand entering elsewhere, so a full-frame detection
+    is also forced every `redetect_every` frames / `redetect_ms` ms (0 = off).
+    When the hands are far apart and their union crop would exceed
+    `max_frac` of the frame side, the next frame is detected full-frame
+    instead (one Hands instance keeps one tracking state, so a crop per hand
+    is not an option here).
+    """
+
+    def __init__(self, full, roi_hands, pad=0.3, roi_size=256, min_score=0.8, min_frac=0.15,
+                 redetect_every=15, redetect_ms=500.0, max_frac=0.6):
+        self.full = full
+        self.roi_hands = roi_hands
+        self.pad = pad
+        self.roi_size = roi_size
+        self.min_score = min_score
+        self.min_frac = min_frac
+        self.redetect_every = redetect_every
+        self.redetect_ms = redetect_ms
+        self.max_frac = max_frac
+        self.kps_buf = np.empty_like(full.kps_buf)
+        self._crop = np.empty((roi_size, roi_size, 3), dtype=np.uint8)
+        self._rgb = np.empty((roi_size, roi_size, 3), dtype=np.uint8)
+        self.roi = None          # (x0, y0, size) ใน pixel ของเฟรมเต็ม
+        self._n_hands = 0
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.redetects = 0       # full-frame ตามรอบ (หามือใหม่นอก crop)
+        self.wide = 0            # full-frame เพราะมือห่างกันจน crop ใหญ่เกิน max_frac
+        self.pixels = 0          # จำนวน pixel ที่ส่งเข้า MediaPipe รวมทุกเฟรม
+        self._since_full = 0
+        self._t_full = 0.0
+
+    def _roi_from(self, kps, w, h):
+        if len(kps) == 0:
+            return None
+        xs, ys = kps[:, :, 0] * w, kps[:, :, 1] * h
+        x_min, x_max, y_min, y_max = xs.min(), xs.max(), ys.min(), ys.max()
+        side = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.pad)
+        side = int(min(max(side, self.min_frac * min(w, h)), min(w, h)))
+        cx, cy = (x_min + x_max) / 2, (y_min + y_max) / 2
+        if side > self.max_frac * min(w, h):
+            self.wide += 1
+            return None
+        x0 = int(min(max(cx - side / 2, 0), w - side))
+        y0 = int(min(max(cy - side / 2, 0), h - side))
+        return x0, y0, side
+
+    def _detect_roi(self, frame_bgr):
+        h, w = frame_bgr.shape[:2]
+        x0, y0, side = self.roi
+        tel = self.full.tel
+        t = tel.start()
+        crop = frame_bgr[y0:y0 + side, x0:x0 + side]
+        interp = cv2.INTER_AREA if side > self.roi_size else cv2.INTER_LINEAR
+        if self.full.input_rgb:
+            cv2.resize(crop, (self.roi_size, self.roi_size), dst=self._rgb, interpolation=interp)
+        else:
+            cv2.resize(crop, (self.roi_size, self.roi_size), dst=self._crop, interpolation=interp)
+            cv2.cvtColor(self._crop, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        tel.stop("cvtColor", t)
+        t = tel.start()
+        results = self.roi_hands.process(self._rgb)
+        tel.stop("hands.process", t)
+        kps, handedness = results_to_arrays(results, self.kps_buf)
+        self.pixels += self.roi_size * self.roi_size
+        if len(kps) < self._n_hands or any(score < self.min_score for _, score in handedness):
+            return None
+        # crop -> เฟรมเต็ม (z ของ MediaPipe อยู่ในสเกลเดียวกับ x)
+        kps[:, :, 0] = (x0 + kps[:, :, 0] * side) / w
+        kps[:, :, 1] = (y0 + kps[:, :, 1] * side) / h
+        kps[:, :, 2] *= side / float(w)
+        return kps, handedness
+
+    def _redetect_due(self):
+        return ((self.redetect_every and self._since_full >= self.redetect_every)
+                or (self.redetect_ms and 1e3 * (time.monotonic() - self._t_full) >= self.redetect_ms))
+
+    def detect(self, frame_bgr):
+        h, w = frame_bgr.shape[:2]
+        out = None
+        if self.roi is not None:
+            if self._redetect_due():
+                self.redetects += 1
+            else:
+                out = self._detect_roi(frame_bgr)
+        if out is not None:
+            self.roi_frames += 1
+            self._since_full += 1
+        else:
+            out = self.full.detect(frame_bgr)
+            self.full_frames += 1
+            self.pixels += self.full.size[0] * self.full.size[1]
+            self._since_full = 0
+            self._t_full = time.monotonic()
+        kps, handedness = out
+        self._n_hands = len(kps)
+        self.roi = self._roi_from(kps, w, h)
+        return kps, handedness
+
+    def stats(self):
+        n = self.roi_frames + self.full_frames
+        return {"roi_frames": self.roi_frames, "full_frames": self.full_frames,
+                "redetects": self.redetects, "wide": self.wide,
+                "pixels_per_frame": self.pixels / n if n else 0.0}
@@ -0,0 +1,250 @@
+# mp_workers.py
+# รัน MediaPipe Hands ใน worker process หลายตัว (ใช้ได้หลาย core ไม่ติด GIL)
+# เฟรมอยู่ใน multiprocessing.shared_memory แบบ ring ของ slot: ส่งแค่เลข slot ไปให้ worker
+# (ไม่ pickle ภาพ) และรับกลับมาแค่ landmarks (H, 21, 3) + handedness แล้วเรียงตาม frame id
+# แต่ละ worker มี task queue ของตัวเอง แจกเฟรมแบบ round-robin: tracker ของ MediaPipe ใน worker
+# เห็นทุก ๆ n_workers เฟรมตามลำดับ (ไม่ใช่เฟรมสุ่มที่ worker อื่นแย่งไป)
+import threading, time, queue
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from collections import deque
+
+import numpy as np
+
+def _attach(name):
+    # worker ใช้ resource tracker ตัวเดียวกับ process แม่ (spawn) จึงไม่ต้อง unregister เอง
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python >= 3.13
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+def _worker_main(shm_name, shape, task_q, result_q, max_hands, det_conf, trk_conf,
+                 detect_scale, detect_max_w):
+    from landmarks import create_hands, HandDetector
+
+    shm = _attach(shm_name)
+    frames = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    hands = create_hands(max_hands, det_conf, trk_conf)
+    detector = HandDetector(hands, max_hands, detect_scale, detect_max_w)
+    try:
+        while True:
+            task = task_q.get()
+            if task is None:
+                break
+            slot, frame_id = task
+            try:
+                kps, handedness = detector.detect(frames[slot])
+                result_q.put((slot, frame_id, kps.copy(), handedness, None))
+            except Exception as e:
+                # เฟรมเดียวพังไม่ให้ worker ตาย: ส่งผลว่าง (ไม่มีมือ) กลับไปแทน
+                result_q.put((slot, frame_id, np.zeros((0, 21, 3), np.float32), [], repr(e)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        hands.close()
+        del frames
+        shm.close()
+
+
+class LandmarkWorkerPool:
+    """Landmark detection in `n_workers` processes over shared-memory frame slots.
+
+    Producer side:  slot, buf = pool.acquire();  write a BGR frame into buf
+                    (e.g. cap.read(buf));  pool.submit(slot, frame_id, t_capture)
+    Consumer side:  pool.get() -> (slot, frame_id, t_capture, kps, handedness)
+                    in submission order; pool.release(slot) once the frame in
+                    pool.frame(slot) is no longer needed.
+
+    Frames go round-robin to per-worker task queues, so each worker's
+    MediaPipe tracker sees every `n_workers`-th frame in order.
+
+    A frame whose detect() raised comes back with no hands (counted in
+    `errors`). A worker that dies is restarted with a fresh task queue
+    (`restarts`). A frame whose result has not come back `result_timeout`
+    seconds after submit is skipped by get() (`skipped`) so a lost task
+    cannot stall the ordered output; its slot is only freed once the late
+    result arrives or its worker has been restarted, since the worker may
+    still be reading it. A worker still holding a skipped frame after
+    2 * result_timeout is considered hung and killed (then restarted).
+    """
+
+    def __init__(self, frame_shape, n_workers=2, n_slots=None, max_hands=2,
+                 min_det_conf=0.9, min_trk_conf=0.6, detect_scale=1.0, detect_max_w=0,
+                 result_timeout=2.0):
+        self.n_workers = n_workers
+        self.result_timeout = result_timeout
+        self.n_slots = n_slots or n_workers + 4
+        self.shape = (self.n_slots,) + tuple(frame_shape)
+        self._shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.shape)))
+        self.frames = np.ndarray(self.shape, dtype=np.uint8, buffer=self._shm.buf)
+
+        self._ctx = mp.get_context("spawn")   # fork หลังมี thread/MediaPipe แล้วไม่ปลอดภัย
+        self._result_q = self._ctx.Queue()
+        self._worker_args = (max_hands, min_det_conf, min_trk_conf, detect_scale, detect_max_w)
+        self._task_qs = [None] * n_workers
+        self._gen = [0] * n_workers     # เพิ่มทุกครั้งที่ restart: งานของ gen เก่าไม่มีใครอ่าน slot แล้ว
+        self._next_worker = 0
+        self._procs = [self._new_worker(i) for i in range(n_workers)]
+
+        self._free = queue.Queue()
+        for i in range(self.n_slots):
+            self._free.put(i)
+        self._pending = deque()     # frame id ที่ส่งไปแล้ว ตามลำดับ
+        self._done = {}             # frame id -> ผลที่กลับมาแล้ว (รอเรียง)
+        self._t_capture = {}
+        self._submit = {}           # frame id -> (slot, เวลา submit, worker, gen) ใช้ตัดเฟรมที่ผลไม่กลับมา
+        self._late = {}             # frame id ที่ skip ไปแล้วแต่ worker อาจยังอ่าน slot -> (slot, เวลา submit, worker)
+        self._t_ready = None        # ผลแรกกลับมา (worker โหลด model เสร็จ) เริ่มนับ timeout จากตรงนี้
+        self._cond = threading.Condition()
+        self._collector = threading.Thread(target=self._collect, name="mp-collect", daemon=True)
+        self._running = False
+        self.submitted = 0
+        self.completed = 0
+        self.reordered = 0
+        self.errors = 0
+        self.restarts = 0
+        self.skipped = 0
+
+    def _new_worker(self, i):
+        self._task_qs[i] = self._ctx.Queue()
+        self._gen[i] += 1
+        return self._ctx.Process(target=_worker_main, name=f"mp-hands-{i}", daemon=True,
+                                 args=(self._shm.name, self.shape, self._task_qs[i], self._result_q)
+                                 + self._worker_args)
+
+    def start(self):
+        self._running = True
+        for p in self._procs:
+            p.start()
+        self._collector.start()
+        return self
+
+    # ---------- producer ----------
+    def acquire(self, timeout=None):
+        """Reserve a free slot. Returns (slot, frame view) or (None, None) on timeout."""
+        try:
+            slot = self._free.get(timeout=timeout)
+        except queue.Empty:
+            return None, None
+        return slot, self.frames[slot]
+
+    def submit(self, slot, frame_id, t_capture=None):
+        with self._cond:
+            worker = self._next_worker
+            self._next_worker = (worker + 1) % self.n_workers
+            self._pending.append(frame_id)
+            self._t_capture[frame_id] = time.monotonic() if t_capture is None else t_capture
+            self._submit[frame_id] = (slot, time.monotonic(), worker, self._gen[worker])
+            self.submitted += 1
+            self._task_qs[worker].put((slot, frame_id))
+
+    def release(self, slot):
+        self._free.put(slot)
+
+    def frame(self, slot):
+        return self.frames[slot]
+
+    # ---------- consumer ----------
+    def _check_workers(self):
+        now = time.monotonic()
+        with self._cond:
+            hung = {w for _, t_submit, w in self._late.values() if now - t_submit > 2 * self.result_timeout}
+        for i in hung:
+            p = self._procs[i]
+            if p.is_alive():
+                print(f"[WARN] {p.name} hung, killing")
+                p.kill()                        # SIGKILL: terminate() ไม่พอถ้า process ค้าง/ถูก stop
+        for i, p in enumerate(self._procs):
+            if self._running and not p.is_alive():
+                print(f"[WARN] {p.name} exited (code {p.exitcode}), restarting")
+                p.join(timeout=1.0)
+                with self._cond:
+                    old_q = self._task_qs[i]
+                    self._procs[i] = self._new_worker(i)
+                    # worker ตายแล้ว: slot ของเฟรมที่ skip ไปไม่มีใครอ่านอีก คืนได้
+                    for frame_id in [f for f, (_, _, w) in self._late.items() if w == i]:
+                        self._free.put(self._late.pop(frame_id)[0])
+                old_q.cancel_join_thread()      # งานค้างใน queue เก่าทิ้งไป (จะถูก skip ตาม timeout)
+                old_q.close()
+                self._procs[i].start()
+                self.restarts += 1
+
+    def _collect(self):
+        t_check = time.monotonic()
+        while self._running:
+            if time.monotonic() - t_check >= 0.2:
+                t_check = time.monotonic()
+                self._check_workers()
+                with self._cond:
+                    self._cond.notify_all()     # ให้ get() ตรวจ timeout ของเฟรมหัวคิว
+            try:
+                slot, frame_id, kps, handedness, error = self._result_q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            with self._cond:
+                if self._t_ready is None:
+                    self._t_ready = time.monotonic()
+                if error is not None:
+                    if not self.errors:   # แจ้งครั้งแรกครั้งเดียว ที่เหลือนับใน errors
+                        print(f"[WARN] landmark worker: {error}")
+                    self.errors += 1
+                if frame_id not in self._submit:
+                    # ถูก skip ไปแล้ว (ผลมาช้าเกิน result_timeout): worker อ่าน slot เสร็จแล้ว คืนได้
+                    late = self._late.pop(frame_id, None)
+                    if late is not None:
+                        self._free.put(late[0])
+                    continue
+                if self._pending and self._pending[0] != frame_id:
+                    self.reordered += 1
+                self._done[frame_id] = (slot, kps, handedness)
+                self._cond.notify_all()
+
+    def _head_ready(self):
+        if not self._pending:
+            return False
+        head = self._pending[0]
+        if head in self._done:
+            return True
+        if self._t_ready is None:
+            return False                        # worker ยังโหลด model อยู่ ไม่นับ timeout
+        return time.monotonic() - max(self._submit[head][1], self._t_ready) > self.result_timeout
+
+    def get(self, timeout=None):
+        """Next result in frame-id order: (slot, frame_id, t_capture, kps, handedness), or None."""
+        with self._cond:
+            while True:
+                if not self._cond.wait_for(self._head_ready, timeout):
+                    return None
+                frame_id = self._pending.popleft()
+                slot, t_submit, worker, gen = self._submit.pop(frame_id)
+                t_capture = self._t_capture.pop(frame_id)
+                if frame_id in self._done:
+                    break
+                # ผลไม่กลับมา (worker ตาย / ค้าง): ข้ามเฟรมนี้แล้วดูเฟรมถัดไป
+                self.skipped += 1
+                if gen != self._gen[worker]:
+                    self._free.put(slot)        # worker เจ้าของถูก restart แล้ว ไม่มีใครอ่าน slot นี้
+                else:
+                    self._late[frame_id] = (slot, t_submit, worker)   # คืนเมื่อผลมาถึง / worker ถูก restart
+            slot, kps, handedness = self._done.pop(frame_id)
+            self.completed += 1
+        return slot, frame_id, t_capture, kps, handedness
+
+    def in_flight(self):
+        with self._cond:
+            return len(self._pending)
+
+    def close(self):
+        self._running = False
+        for q in self._task_qs:
+            q.put(None)
+        for p in self._procs:
+            p.join(timeout=3.0)
+            if p.is_alive():
+                p.terminate()
+        self._collector.join(timeout=1.0)
+        del self.frames
+        self._shm.close()
+        self._shm.unlink()
@@ -0,0 +1,182 @@
+# pipeline.py
+# Runtime แบบแบ่ง stage: แต่ละ stage มี worker thread ของตัวเอง ต่อกันด้วยคิวขนาดจำกัด
+# คิวเต็มเมื่อไหร่จะทิ้งของเก่าสุด (drop-oldest) เพื่อให้ stage ถัดไปได้เฟรมใหม่เสมอ
+# throughput จึงขึ้นกับ stage ที่ช้าที่สุด แทนที่จะเป็นผลรวมของทุก stage
+import threading, time
+from collections import deque
+
+class DropOldestQueue:
+    """Bounded FIFO; put() on a full queue discards the oldest item.
+
+    `on_drop(item)` is called for every discarded item (e.g. to free a buffer).
+    """
+
+    def __init__(self, maxsize=2, on_drop=None):
+        self.maxsize = maxsize
+        self.on_drop = on_drop
+        self.dropped = 0
+        self.max_depth = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, item):
+        old = None
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                old = self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._cond.notify()
+        if old is not None and self.on_drop is not None:
+            self.on_drop(old)
+
+    def get(self, timeout=None):
+        """Return the next item, or None on timeout / when closed and empty."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            return self._items.popleft() if self._items else None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def __len__(self):
+        return len(self._items)
+
+
+class Packet:
+    """One frame travelling through the pipeline."""
+    __slots__ = ("frame_id", "t_capture", "frame", "data", "t_stage")
+
+    def __init__(self, frame_id, t_capture, frame):
+        self.frame_id = frame_id
+        self.t_capture = t_capture
+        self.frame = frame
+        self.data = {}
+        self.t_stage = {}   # ชื่อ stage -> เวลาที่ stage นั้นทำเสร็จ (monotonic)
+
+
+class Stage:
+    """Run `fn(packet)` on a worker thread: in_q -> fn -> out_q.
+
+    fn may return None to drop the packet (in_q.on_drop is called for it, as
+    for queue drops). A stage without in_q is a source:
+    fn() is called repeatedly and returns new packets (None = end of stream).
+    """
+
+    def __init__(self, name, fn, in_q=None, out_q=None):
+        self.name = name
+        self.fn = fn
+        self.in_q = in_q
+        self.out_q = out_q
+        self.processed = 0
+        self.busy_sec = 0.0
+        self.errors = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"stage-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.in_q is not None:
+                pkt = self.in_q.get(timeout=0.1)
+                if pkt is None:
+                    if self.in_q.closed:
+                        break
+                    continue
+            else:
+                pkt = None
+            t0 = time.monotonic()
+            try:
+                out = self.fn(pkt) if self.in_q is not None else self.fn()
+            except Exception as e:
+                self.errors += 1
+                print(f"[pipeline] {self.name} error: {e}")
+                out = None
+                if self.in_q is None:
+                    break
+            t1 = time.monotonic()
+            if self.in_q is None and out is None:
+                break
+            self.busy_sec += t1 - t0
+            self.processed += 1
+            if out is not None:
+                out.t_stage[self.name] = t1
+                if self.out_q is not None:
+                    self.out_q.put(out)
+            elif self.in_q.on_drop is not None:
+                self.in_q.on_drop(pkt)
+        if self.out_q is not None:
+            self.out_q.close()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+class Pipeline:
+    """Chain of stages connected by DropOldestQueue. The last queue is read by the caller."""
+
+    def __init__(self, queue_size=2, on_drop=None):
+        self.queue_size = queue_size
+        self.on_drop = on_drop
+        self.stages = []
+        self.queues = []
+
+    def add(self, name, fn):
+        in_q = self.queues[-1] if self.queues else None
+        out_q = DropOldestQueue(self.queue_size, self.on_drop)
+        self.stages.append(Stage(name, fn, in_q, out_q))
+        self.queues.append(out_q)
+        return self
+
+    @property
+    def output(self):
+        return self.queues[-1]
+
+    def start(self):
+        for st in self.stages:
+            st.start()
+        return self
+
+    def stop(self):
+        for st in self.stages:
+            st.stop()
+        for q in self.queues:
+            q.close()
+        for st in self.stages:
+            st.join(timeout=2.0)
+
+    def stats(self):
+        """Per stage: processed count, mean busy ms, and depth/drops of its output queue."""
+        out = []
+        for st, q in zip(self.stages, self.queues):
+            out.append({
+                "stage": st.name,
+                "processed": st.processed,
+                "avg_ms": 1e3 * st.busy_sec / st.processed if st.processed else 0.0,
+                "errors": st.errors,
+                "queue_depth": len(q),
+                "queue_max": q.max_depth,
+                "queue_dropped": q.dropped,
+            })
+        return out
+
+    def format_stats(self):
+        return " | ".join(f"{s['stage']}: {s['avg_ms']:.1f}ms q={s['queue_depth']}/{self.queue_size} "
+                          f"drop={s['queue_dropped']}" for s in self.stats())
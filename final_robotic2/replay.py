@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# replay.py
+# รัน pipeline เดียวกับ detect.py จากไฟล์วิดีโอ / โฟลเดอร์รูป โดยไม่เปิดหน้าต่าง (ใช้บนเครื่อง build ที่ไม่มีกล้อง/จอ)
+# capture -> MediaPipe -> features -> predict -> debounce -> AO/VO event
+#   python replay.py clip.mp4 [--pace] [--out preds.csv] [--mute] [--no-draw] [--max-frames N]
+#   python replay.py frames_dir/ --fps 30
+# เวลาใน debounce ใช้เวลาของสื่อ (frame / fps) ผลจึงเหมือนเดิมทุกครั้งไม่ว่าจะรันเร็วแค่ไหน
+import argparse, glob, os, sys, time
+import cv2
+
+import detect as D
+import telemetry
+from debounce import format_ttt
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+class ImageDirSource:
+    """cv2.VideoCapture-like reader over the sorted images of a directory."""
+
+    def __init__(self, path, fps=30.0):
+        self.files = sorted(f for f in glob.glob(os.path.join(path, "*"))
+                            if f.lower().endswith(IMAGE_EXTS))
+        self.fps = fps
+        self.pos = 0
+
+    def isOpened(self):
+        return bool(self.files)
+
+    def read(self):
+        while self.pos < len(self.files):
+            frame = cv2.imread(self.files[self.pos])
+            self.pos += 1
+            if frame is not None:
+                return True, frame
+        return False, None
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.files)
+        return 0.0
+
+    def release(self):
+        pass
+
+def open_source(path, fps=None):
+    if os.path.isdir(path):
+        return ImageDirSource(path, fps or 30.0)
+    return cv2.VideoCapture(path)
+
+def main():
+    ap = argparse.ArgumentParser(description="Headless replay of the detect pipeline")
+    ap.add_argument("source", help="video file or directory of images")
+    ap.add_argument("--fps", type=float, default=0, help="source FPS (default: from the file, 30 for images)")
+    ap.add_argument("--pace", action="store_true", help="play at source FPS instead of max speed")
+    ap.add_argument("--max-frames", type=int, default=0)
+    ap.add_argument("--out", help="per-frame predictions (.csv)")
+    ap.add_argument("--mute", action="store_true", help="do not call audio_output on events")
+    ap.add_argument("--no-draw", action="store_true", help="skip landmark drawing and banner overlay")
+    ap.add_argument("-v", "--verbose", action="store_true", help="print every frame")
+    args = ap.parse_args()
+
+    cap = open_source(args.source, args.fps)
+    if not cap or not cap.isOpened():
+        print(f"[ERROR] cannot open {args.source}")
+        sys.exit(1)
+    fps = args.fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    D.init_outputs(audio=not args.mute)
+
+    tel = telemetry.from_env()
+    model = D.load_model()
+    classify = D.make_classifier(model, tel)
+    detector = D.make_detector(tel=tel)
+    debouncer = D.make_debouncer(model)
+
+    out = open(args.out, "w") if args.out else None
+    if out:
+        out.write("frame,media_sec,hands,labels,event\n")
+
+    events = []
+    frames = hand_frames = 0
+    detect_sec = 0.0
+    t_start = time.monotonic()
+    while not args.max_frames or frames < args.max_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        t_media = frames / fps
+        if args.pace:
+            delay = t_start + t_media - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        t0 = time.monotonic()
+        kps, handedness = detector.detect(frame)
+        hand_preds = classify(kps, handedness)
+        detect_sec += time.monotonic() - t0
+
+        labels = D.valid_labels(hand_preds)
+        label = D.update_debouncer(debouncer, hand_preds, now=t_media)
+        if label:
+            events.append((frames, t_media, label))
+            D.fire_event(label)
+            print(f"[EVENT] frame {frames} t={t_media:.2f}s -> {label}")
+
+        if not args.no_draw:
+            D.draw_predictions(frame, kps, hand_preds)
+            D.VO.apply_overlay(frame)
+
+        if out:
+            out.write(f"{frames},{t_media:.3f},{len(kps)},{'|'.join(labels)},{label or ''}\n")
+        if args.verbose:
+            print(f"{frames:6d} {t_media:8.3f}s hands={len(kps)} {' | '.join(labels)}")
+        hand_frames += len(kps) > 0
+        frames += 1
+        tel.frame()
+        tel.maybe_flush()
+
+    wall = time.monotonic() - t_start
+    cap.release()
+    D.shutdown_outputs()
+    if out:
+        out.close()
+
+    print(f"[INFO] {frames} frames ({frames / fps:.1f}s of media) in {wall:.2f}s: "
+          f"{frames / max(wall, 1e-9):.1f} FPS, {1e3 * detect_sec / max(frames, 1):.1f} ms/frame detect+classify, "
+          f"hands in {100.0 * hand_frames / max(frames, 1):.1f}% of frames")
+    print(f"[INFO] {len(events)} events: " + ", ".join(f"{l}@{t:.2f}s" for _, t, l in events))
+    print(f"[INFO] debounce ({D.DEBOUNCE_MODE}): {format_ttt(debouncer.stats())}")
+    D.print_detector_stats(detector)
+    if tel.enabled:
+        print(f"[INFO] telemetry:\n{tel.format_summary()}")
+        tel.close()
+
+if __name__ == "__main__":
+    main()
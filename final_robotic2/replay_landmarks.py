@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# replay_landmarks.py
+# เล่นไฟล์ landmark log (จาก LANDMARK_LOG=... python detect.py) ผ่าน features -> predict_proba -> debounce
+# ไม่มี MediaPipe/ภาพ จึงเร็วมาก ใช้ทำ load test และจูน debounce แบบ offline
+# debouncer เดียวกับ detect.py (DEBOUNCE=proba|frames): --sweep ไล่ค่า DEBOUNCE_HOLD_SEC (proba) หรือ STABLE_FRAMES (frames)
+#   python replay_landmarks.py run.lmk [--stable 5] [--hold 0.25] [--cooldown 2.0] [--sweep 0.1,0.25,0.5] [--repeat 10]
+import argparse, os, time
+import numpy as np
+
+import detect as D
+from landmark_log import open_log, iter_proba_batches
+
+def load_batch_model():
+    # predict ทีละหลายหมื่นแถว: tree walk ของ sklearn (Cython) เร็วกว่า FastForest ที่เน้น latency ต่อ 1 แถว
+    if os.path.isfile(D.MODEL_PATH):
+        import joblib
+        print(f"[INFO] Loading model: {D.MODEL_PATH}")
+        return joblib.load(D.MODEL_PATH)
+    return D.load_model()
+
+def run_debounce(debouncer, times, probas, ends, names):
+    # แถว proba ของแต่ละเฟรม -> hand_preds แบบเดียวกับ detect.classify_hands
+    events, s = [], 0
+    top = probas.argmax(axis=1) if len(probas) else np.zeros(0, dtype=np.intp)
+    for t, e in zip(times, ends):
+        hand_preds = [{"label": names[top[i]], "proba": probas[i]} for i in range(s, e)]
+        s = e
+        label = D.update_debouncer(debouncer, hand_preds, now=t)
+        if label:
+            events.append((t, label))
+    return events
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay a landmark log without vision")
+    ap.add_argument("log")
+    ap.add_argument("--stable", type=int, default=D.STABLE_FRAMES_REQUIRED, help="DEBOUNCE=frames")
+    ap.add_argument("--hold", type=float, default=D.DEBOUNCE_HOLD_SEC, help="DEBOUNCE=proba")
+    ap.add_argument("--cooldown", type=float, default=D.EVENT_COOLDOWN_SEC)
+    ap.add_argument("--sweep", help="comma-separated hold seconds (proba) or STABLE_FRAMES (frames) to compare")
+    ap.add_argument("--chunk", type=int, default=65536)
+    ap.add_argument("--repeat", type=int, default=1, help="replay the log N times (load test)")
+    ap.add_argument("-v", "--verbose", action="store_true", help="print every event")
+    args = ap.parse_args()
+
+    records = open_log(args.log)
+    if not len(records):
+        print(f"[WARN] {args.log} has no records")
+        return
+    model = load_batch_model()
+    print(f"[INFO] {len(records)} frames, {int(records['n_hands'].sum())} hands, "
+          f"{records['t'][-1] - records['t'][0]:.1f}s recorded")
+
+    names = D.class_names(model)
+    frames_mode = D.DEBOUNCE_MODE == "frames"
+    def debouncer(value=None):
+        if frames_mode:
+            return D.make_debouncer(model, stable=args.stable if value is None else int(value), cooldown=args.cooldown)
+        return D.make_debouncer(model, hold_sec=args.hold if value is None else value, cooldown=args.cooldown)
+
+    t0 = time.monotonic()
+    t_classify = 0.0
+    for _ in range(args.repeat):
+        t = time.monotonic()
+        times, probas, ends, n_rows = [], [], [], 0
+        for recs, p, e in iter_proba_batches(records, model, args.chunk):
+            times.extend(recs["t"].tolist())
+            ends.append(e + n_rows)      # ends ของแต่ละ chunk นับจาก 0: เลื่อนเป็น index ในแถวรวม
+            probas.append(p)
+            n_rows += len(p)
+        probas, ends = np.concatenate(probas), np.concatenate(ends)
+        t_classify += time.monotonic() - t
+        events = run_debounce(debouncer(), times, probas, ends, names)
+    elapsed = time.monotonic() - t0
+    n = len(records) * args.repeat
+    print(f"[INFO] {n} frames in {elapsed:.2f}s ({n / elapsed * 60 / 1e6:.2f} M frames/min; "
+          f"features+predict {t_classify:.2f}s)")
+    setting = f"STABLE_FRAMES={args.stable}" if frames_mode else f"hold={args.hold}s"
+    print(f"[INFO] DEBOUNCE={D.DEBOUNCE_MODE} {setting} cooldown={args.cooldown}s: {len(events)} events")
+    if args.verbose:
+        t_first = records["t"][0]
+        for t, label in events:
+            print(f"  {t - t_first:8.2f}s {label}")
+
+    if args.sweep:
+        print(f"{'stable' if frames_mode else 'hold':>6s} {'events':>6s}  per label")
+        for value in (float(s) for s in args.sweep.split(",")):
+            ev = run_debounce(debouncer(value), times, probas, ends, names)
+            counts = {}
+            for _, label in ev:
+                counts[label] = counts.get(label, 0) + 1
+            print(f"{value:6g} {len(ev):6d}  " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# scheduler.py
+# เลือกว่าเฟรมไหนต้องรัน MediaPipe + forest เพื่อให้ได้ FPS ที่ตั้งไว้
+# เฟรมที่ข้ามจะใช้ landmarks/prediction ล่าสุดซ้ำ และกลับไปตรวจทุกเฟรมเมื่อท่าเปลี่ยนหรือภาพขยับ
+import math, time
+import cv2
+import numpy as np
+
+class DetectScheduler:
+    """Adaptive detection stride for a target display FPS.
+
+    Per frame: call should_detect(frame); if True run detection and then
+    record_detect(seconds, labels). Call record_frame(seconds) with the full
+    frame time. Costs are exponential moving averages, so the stride follows
+    thermal slow-downs. Stride > 1 is only used while the predicted labels
+    stay the same; a label change or motion in a small grey thumbnail goes
+    back to every-frame detection.
+    """
+
+    def __init__(self, target_fps=30.0, max_stride=4, motion_thresh=6.0, stable_needed=3, alpha=0.2):
+        self.target_fps = target_fps
+        self.max_stride = max_stride
+        self.motion_thresh = motion_thresh
+        self.stable_needed = stable_needed
+        self.alpha = alpha
+        self.detect_cost = 0.0      # EMA วินาทีต่อการตรวจ 1 ครั้ง
+        self.other_cost = 0.0       # EMA วินาทีต่อเฟรม ไม่รวมการตรวจ
+        self.stride = 1
+        self.frames = 0
+        self.detections = 0
+        self.motion_resets = 0
+        self.label_resets = 0
+        self._since_detect = 0
+        self._last_labels = None
+        self._stable = 0
+        self._thumb = None
+        self._thumb_buf = np.empty((18, 32), dtype=np.uint8)
+        self._gray_small = np.empty((18, 32, 3), dtype=np.uint8)
+        self._detected_this_frame = False
+        self._t_start = time.monotonic()
+
+    def _ema(self, old, new):
+        return new if old == 0.0 else old + self.alpha * (new - old)
+
+    def _motion(self, frame):
+        cv2.resize(frame, (32, 18), dst=self._gray_small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._gray_small, cv2.COLOR_BGR2GRAY, dst=self._thumb_buf)
+        if self._thumb is None:
+            return True
+        return float(cv2.absdiff(self._thumb_buf, self._thumb).mean()) > self.motion_thresh
+
+    def _target_stride(self):
+        if self._stable < self.stable_needed:
+            return 1
+        budget = 1.0 / self.target_fps
+        if self.detect_cost + self.other_cost <= budget:
+            return 1
+        spare = budget - self.other_cost
+        if spare <= 0:
+            return self.max_stride
+        return min(self.max_stride, max(1, math.ceil(self.detect_cost / spare)))
+
+    def should_detect(self, frame):
+        self.frames += 1
+        self._since_detect += 1
+        moved = self._motion(frame)
+        if moved and self._since_detect < self.stride:
+            self.motion_resets += 1
+            self.stride = 1
+        detect = moved or self._since_detect >= self.stride
+        self._detected_this_frame = detect
+        return detect
+
+    def record_detect(self, seconds, labels):
+        self.detections += 1
+        self._since_detect = 0
+        self.detect_cost = self._ema(self.detect_cost, seconds)
+        self._thumb = self._thumb_buf.copy()
+        labels = tuple(sorted(labels))
+        if labels == self._last_labels:
+            self._stable += 1
+        else:
+            if self.stride > 1:
+                self.label_resets += 1
+            self._stable = 0
+        self._last_labels = labels
+        self.stride = self._target_stride()
+
+    def record_frame(self, seconds):
+        other = seconds - (self.detect_cost if self._detected_this_frame else 0.0)
+        self.other_cost = self._ema(self.other_cost, max(other, 0.0))
+
+    def stats(self, stable_frames=None):
+        elapsed = max(time.monotonic() - self._t_start, 1e-9)
+        out = {
+            "frames": self.frames,
+            "detections": self.detections,
+            "display_fps": self.frames / elapsed,
+            "detect_fps": self.detections / elapsed,
+            "detect_ratio": self.detections / self.frames if self.frames else 0.0,
+            "stride": self.stride,
+            "detect_ms": self.detect_cost * 1e3,
+            "other_ms": self.other_cost * 1e3,
+            "motion_resets": self.motion_resets,
+            "label_resets": self.label_resets,
+        }
+        if stable_frames and out["display_fps"] > 0:
+            # debounce นับเฟรมที่แสดงผล: เวลาเท่าเดิมแต่ใช้ผลตรวจจริงน้อยลง
+            out["debounce_sec"] = stable_frames / out["display_fps"]
+            out["debounce_detections"] = stable_frames * out["detect_ratio"]
+        return out
+
+    def format_stats(self, stable_frames=None):
+        s = self.stats(stable_frames)
+        text = (f"display {s['display_fps']:.1f} FPS, detect {s['detect_fps']:.1f}/s "
+                f"({100 * s['detect_ratio']:.0f}% of frames, stride {s['stride']}), "
+                f"detect {s['detect_ms']:.1f} ms, rest {s['other_ms']:.1f} ms, "
+                f"resets motion={s['motion_resets']} label={s['label_resets']}")
+        if "debounce_sec" in s:
+            text += (f"; STABLE_FRAMES={stable_frames} = {1e3 * s['debounce_sec']:.0f} ms "
+                     f"~ {s['debounce_detections']:.1f} real detections")
+        return text
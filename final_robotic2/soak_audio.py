@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# soak_audio.py
+# soak test ของ voice manager: ยิง handle_event จำนวนมาก (ค่าเริ่มต้น 100k) แบบ spawn
+# ใช้ player ปลอม (sleep) แทน aplay แล้วพิมพ์จำนวน child process (รวม zombie) กับ RSS เป็นระยะ
+# ค่าต้องคงที่ตลอด ถ้าโตขึ้นเรื่อย ๆ แปลว่ามี process/หน่วยความจำรั่ว
+#   python soak_audio.py [--events 100000] [--rate 2000] [--policy preempt|drop|queue] [--voices 2]
+import argparse, os, random, sys, time
+
+def children():
+    """(alive, zombie) child processes of this process, from /proc."""
+    me, alive, zombie = str(os.getpid()), 0, 0
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if fields[1] == me:
+            if fields[0] == "Z":
+                zombie += 1
+            else:
+                alive += 1
+    return alive, zombie
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+def main():
+    ap = argparse.ArgumentParser(description="Audio voice manager soak test")
+    ap.add_argument("--events", type=int, default=100_000)
+    ap.add_argument("--rate", type=float, default=2000.0, help="events per second (0 = as fast as possible)")
+    ap.add_argument("--policy", default="preempt", choices=["preempt", "drop", "queue"])
+    ap.add_argument("--voices", type=int, default=2)
+    ap.add_argument("--player", default="sleep 0.2", help="stub player command ({wav} = file)")
+    ap.add_argument("--report", type=int, default=10_000, help="print every N events")
+    args = ap.parse_args()
+
+    # ต้องตั้งก่อน import audio_output (อ่าน ENV ตอน import)
+    os.environ.update(AUDIO_BACKEND="command", AUDIO_PLAYER_CMD=args.player,
+                      AUDIO_MAX_VOICES=str(args.voices), AUDIO_VOICE_POLICY=args.policy)
+    import audio_output as AO
+    from detect import AUDIO_MAP
+    AO.EVENT_COOLDOWN_SEC = 0.0
+    AO.init_audio(AUDIO_MAP)
+    labels = list(AO.backend().clips)
+    if AO.backend().name != "command" or not labels:
+        print("[ERROR] stub player not available or no audio files found")
+        sys.exit(1)
+
+    rng = random.Random(0)     # สุ่ม label (มีซ้ำติดกัน -> coalesce)
+    period = 1.0 / args.rate if args.rate > 0 else 0.0
+    t0 = time.monotonic()
+    procs, rss = [], []
+    for i in range(1, args.events + 1):
+        AO.handle_event(rng.choice(labels))
+        if period:
+            sleep = t0 + i * period - time.monotonic()
+            if sleep > 0:
+                time.sleep(sleep)
+        if i % args.report == 0:
+            alive, zombie = children()
+            st = AO.stats()
+            procs.append(alive + zombie)
+            rss.append(rss_kb())
+            print(f"{i:7d} events  children {alive} alive/{zombie} zombie  rss {rss[-1] / 1024:6.1f} MB  "
+                  f"active {st['active']} queued {st['queued']}  started {st['started']} "
+                  f"coalesced {st['coalesced']} preempted {st['preempted']} dropped {st['dropped']} "
+                  f"reaped {st['reaped']} failed {st['failed']}")
+
+    elapsed = time.monotonic() - t0
+    AO.close_audio()
+    alive, zombie = children()
+    print(f"[INFO] {args.events} events in {elapsed:.1f} s; children max {max(procs)}, after close "
+          f"{alive + zombie}; rss {min(rss) / 1024:.1f}..{max(rss) / 1024:.1f} MB")
+    # นอกจาก voice ที่เล่นอยู่ อาจมีตัวที่ถูก preempt แล้วรอ reaper รอบถัดไป (poll ทุก 50 ms)
+    if max(procs) > args.voices * 4 or alive + zombie or max(rss) > min(rss) * 1.1:
+        print("[FAIL] child processes / memory not bounded")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
-# test_output.py
 #!/usr/bin/env python3
+# test_output.py
 import sys, time, cv2, numpy as np, os
 import audio_output as AO
 import visual_output as VO
 from hdmi_display import place_on_hdmi
+import telemetry
+
+# TELEMETRY=1 -> จับเวลา handle_event / overlay / imshow (TELEMETRY_HUD=1, TELEMETRY_OUT=file.jsonl|.csv)
+tel = telemetry.from_env()
 
 AUDIO_MAP = {
     "Fighting":  "audio/Fighting.wav",
@@ -41,16 +45,23 @@ def one_shot_test(label: str):
 
     place_on_hdmi(WIN_ONE)
 
-    AO.handle_event(label)
-    VO.handle_event(label)
+    with tel.stage("handle_event"):
+        AO.handle_event(label)
+        VO.handle_event(label)
 
     t_end = time.time() + DISPLAY_DURATION_SEC + 0.3
     while time.time() <= t_end:
         frame = np.zeros((FRAME_H, FRAME_W, 3), dtype=np.uint8)
-        frame = VO.apply_overlay(frame)
+        with tel.stage("overlay"):
+            frame = VO.apply_overlay(frame)
         cv2.putText(frame, f"TEST CLASS: {label}", (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0,255,0), 2)
-        cv2.imshow(WIN_ONE, frame)
-        if cv2.waitKey(1) & 0xFF == 27: break
+        tel.draw_hud(frame)
+        with tel.stage("imshow"):
+            cv2.imshow(WIN_ONE, frame)
+            key = cv2.waitKey(1) & 0xFF
+        tel.frame()
+        tel.maybe_flush()
+        if key == 27: break
     cv2.destroyAllWindows()
 
 def interactive_mode():
@@ -64,17 +75,22 @@ def interactive_mode():
 
     while True:
         frame = np.zeros((FRAME_H, FRAME_W, 3), dtype=np.uint8)
-        frame = VO.apply_overlay(frame)
+        with tel.stage("overlay"):
+            frame = VO.apply_overlay(frame)
         cv2.putText(frame, "Press 1..5 to trigger class, ESC to exit", (20, 50),
                     cv2.FONT_HERSHEY_SIMPLEX, 1.0, (200,200,200), 2)
+        tel.draw_hud(frame)
         cv2.imshow(WIN_INT, frame)
         k = cv2.waitKey(15) & 0xFF
+        tel.frame()
+        tel.maybe_flush()
         if k == 27: break
         if k in key2label:
             lbl = key2label[k]
             print("->", lbl)
-            AO.handle_event(lbl)
-            VO.handle_event(lbl)
+            with tel.stage("handle_event"):
+                AO.handle_event(lbl)
+                VO.handle_event(lbl)
     cv2.destroyAllWindows()
 
 if __name__ == "__main__":
@@ -88,3 +104,6 @@ if __name__ == "__main__":
         one_shot_test(label)
     else:
         interactive_mode()
+    if tel.enabled:
+        print(tel.format_summary())
+        tel.close()
@@ -0,0 +1,5 @@
+# tests/conftest.py
+# ให้ import โมดูลใน final_robotic2 ได้ตรง ๆ (สคริปต์ในโฟลเดอร์นี้ไม่ได้เป็น package)
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
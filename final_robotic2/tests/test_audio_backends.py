@@ -0,0 +1,47 @@
+# tests/test_audio_backends.py
+import numpy as np
+
+import audio_output as AO
+from audio_engine import AudioEngine
+from audio_backends import CommandBackend, NullBackend, VoiceManager
+
+class FakeProc:
+    def __init__(self):
+        self.pid = id(self)
+    def poll(self):
+        return None
+    def terminate(self):
+        pass
+    def wait(self, timeout=None):
+        return 0
+
+def test_request_reports_failed_spawn():
+    vm = VoiceManager(lambda wav: None, max_voices=2)
+    assert vm.request("Like", "like.wav") is False
+    assert vm.stats()["failed"] == 1
+    vm.close()
+
+def test_request_true_when_started_coalesced_or_dropped_by_policy():
+    vm = VoiceManager(lambda wav: FakeProc(), max_voices=1, policy="drop")
+    assert vm.request("Like", "like.wav") is True
+    assert vm.request("Like", "like.wav") is True      # coalesced
+    assert vm.request("ILY", "ily.wav") is True        # drop = ตั้งใจ ไม่ fallback
+    assert vm.stats()["dropped"] == 1
+    vm.close()
+
+def test_failed_spawn_falls_back_to_next_backend(monkeypatch):
+    primary = CommandBackend({"Like": "like.wav"}, "/nonexistent/player {wav}")
+    primary.voices = VoiceManager(lambda wav: None)
+    fallback = NullBackend({"Like": "like.wav"})
+    monkeypatch.setattr(AO, "_BACKENDS", [primary, fallback])
+    assert AO.play("Like") is True
+    assert fallback.played == 1
+    primary.close()
+
+def test_engine_start_fails_when_player_exits_at_once():
+    clips = {"Like": np.zeros((80, 1), np.int16)}
+    assert AudioEngine(clips, 8000, cmd=["false"]).start() is False
+    engine = AudioEngine(clips, 8000, cmd=["cat"])
+    assert engine.start() is True
+    engine.close()
+    assert engine.play("Like") is False and engine.stats()["failed"] == 1
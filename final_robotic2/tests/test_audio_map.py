@@ -0,0 +1,25 @@
+# tests/test_audio_map.py
+import json
+
+import detect as D
+
+NAMES = {"ILY": "ILY.wav", "Like": "Like.wav"}
+
+def test_native_clip_used_per_label(tmp_path, monkeypatch):
+    native = tmp_path / "audio_native"
+    native.mkdir()
+    (native / "ILY.wav").write_bytes(b"")
+    (native / "manifest.json").write_text(json.dumps({"clips": {
+        "ILY": {"file": "ILY.wav"},
+        "Like": {"file": "Like.wav"},          # อยู่ใน manifest แต่ไม่มีไฟล์
+    }}))
+    monkeypatch.setattr(D, "_HERE", str(tmp_path))
+    monkeypatch.setattr(D, "AUDIO_DIR", "")
+    assert D._audio_map(NAMES) == {"ILY": "audio_native/ILY.wav", "Like": "audio/Like.wav"}
+
+def test_no_manifest_or_explicit_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(D, "_HERE", str(tmp_path))
+    monkeypatch.setattr(D, "AUDIO_DIR", "")
+    assert D._audio_map(NAMES) == {"ILY": "audio/ILY.wav", "Like": "audio/Like.wav"}
+    monkeypatch.setattr(D, "AUDIO_DIR", "mp3")
+    assert D._audio_map(NAMES) == {"ILY": "mp3/ILY.wav", "Like": "mp3/Like.wav"}
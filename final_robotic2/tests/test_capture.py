@@ -0,0 +1,61 @@
+# tests/test_capture.py
+import threading, time
+
+import numpy as np
+
+from capture import LatestFrameCapture
+
+class FakeCap:
+    """VideoCapture stand-in: `delays[i]` seconds before frame i, then end of stream."""
+    def __init__(self, delays, gate=None):
+        self.delays = list(delays)
+        self.gate = gate
+        self.i = 0
+        self.reading = False
+        self.released_while_reading = False
+        self.released = False
+
+    def read(self):
+        self.reading = True
+        try:
+            if self.gate is not None:
+                self.gate.wait()
+            if self.i >= len(self.delays):
+                return False, None
+            time.sleep(self.delays[self.i])
+            self.i += 1
+            return True, np.full((4, 4, 3), self.i, np.uint8)
+        finally:
+            self.reading = False
+
+    def release(self):
+        self.released_while_reading = self.reading
+        self.released = True
+
+def test_slow_frame_is_not_end_of_stream():
+    # เฟรม 2 มาช้ากว่า read_timeout หลายเท่า; เฟรม 3 เว้นห่างพอที่ consumer จะอ่านเฟรม 2 ทัน
+    cap = LatestFrameCapture(FakeCap([0.0, 0.3, 0.3]), read_timeout=0.05).start()
+    got = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        got.append(int(frame[0, 0, 0]))
+        time.sleep(0.02)
+    cap.release()
+    assert got[-1] == 3 and 2 in got
+
+def test_release_waits_for_reader_blocked_in_read():
+    gate = threading.Event()
+    fake = FakeCap([0.0] * 5, gate=gate)
+    cap = LatestFrameCapture(fake).start()
+    time.sleep(0.05)
+    cap.release()                      # reader ยังค้างใน read (join timeout)
+    assert not fake.released
+    assert cap.stopped()
+    gate.set()                         # read คืนค่า -> reader ออกแล้ว release เอง
+    for _ in range(100):
+        if fake.released:
+            break
+        time.sleep(0.01)
+    assert fake.released and not fake.released_while_reading
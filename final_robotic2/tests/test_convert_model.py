@@ -0,0 +1,33 @@
+# tests/test_convert_model.py
+import sys
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+import convert_model
+from extract import N_FEATURES
+
+def pickled_model(tmp_path, n_classes=3):
+    rng = np.random.default_rng(0)
+    X = rng.random((120, N_FEATURES))
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, np.arange(120) % n_classes)
+    src = tmp_path / "m.pkl"
+    joblib.dump(model, src)
+    return src
+
+def run(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["convert_model.py", *map(str, argv)])
+    convert_model.main()
+
+def test_label_count_mismatch_is_an_error(tmp_path, monkeypatch):
+    src, dst = pickled_model(tmp_path), tmp_path / "m.npz"
+    with pytest.raises(SystemExit, match="2 labels for 3 classes"):
+        run(monkeypatch, src, dst, "--labels", "a,b")
+    assert not dst.exists()
+
+def test_force_writes_anyway(tmp_path, monkeypatch):
+    src, dst = pickled_model(tmp_path), tmp_path / "m.npz"
+    run(monkeypatch, src, dst, "--labels", "a,b", "--force")
+    assert dst.exists()
@@ -0,0 +1,16 @@
+# tests/test_events.py
+import json
+
+from events import EventBus, JsonlSink
+
+def test_bus_stop_flushes_and_closes_jsonl_sink(tmp_path):
+    path = tmp_path / "events.jsonl"
+    sink = JsonlSink(str(path))
+    bus = EventBus()
+    bus.subscribe("log", sink)
+    bus.start()
+    bus.publish("Like", source="test")
+    bus.stop()
+    assert sink.fh.closed
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(r["label"], r["source"]) for r in rows] == [("Like", "test")]
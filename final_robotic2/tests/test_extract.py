@@ -0,0 +1,31 @@
+# tests/test_extract.py
+import numpy as np
+import pytest
+
+from extract import N_FEATURES, extract_features, extract_features_batch, euclidean, angle_between, PAIRS, ANGLES
+
+def reference(kps):
+    # สูตรเดิมแบบทีละคู่/ทีละมุม
+    return np.array([euclidean(kps[i], kps[j]) for i, j in PAIRS] +
+                    [angle_between(kps[a], kps[b], kps[c]) for a, b, c in ANGLES])
+
+def test_batch_matches_scalar_reference():
+    kps = np.random.default_rng(0).random((5, 21, 3))
+    assert np.allclose(extract_features_batch(kps), [reference(k) for k in kps])
+
+def test_out_is_written_in_place():
+    kps = np.random.default_rng(1).random((21, 3))
+    for dtype in (np.float64, np.float32):
+        out = np.zeros(N_FEATURES, dtype=dtype)
+        assert extract_features(kps, out=out) is out
+        assert np.allclose(out, reference(kps), atol=1e-5)
+
+@pytest.mark.parametrize("out", [
+    np.zeros((2, N_FEATURES))[:, 0],             # ไม่ contiguous
+    np.zeros(2 * N_FEATURES)[::2],               # ไม่ contiguous (reshape จะได้สำเนา)
+    np.zeros(N_FEATURES, dtype=np.int64),
+    np.zeros(N_FEATURES + 1),
+])
+def test_bad_out_raises(out):
+    with pytest.raises(ValueError):
+        extract_features(np.zeros((21, 3)), out=out)
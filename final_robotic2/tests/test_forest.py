@@ -0,0 +1,38 @@
+# tests/test_forest.py
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from forest import FastForest
+
+def forest_and_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 8))
+    y = (X[:, 0] + 0.5 * X[:, 1] > 0).astype(int) + (X[:, 2] > 1)
+    model = RandomForestClassifier(n_estimators=60, max_depth=6, random_state=0).fit(X, y)
+    return model, FastForest.from_sklearn(model), rng.normal(size=(200, 8))
+
+def test_leaves_one_matches_sklearn():
+    model, fast, X = forest_and_data()
+    assert np.array_equal(np.stack([fast.leaves_one(x) for x in X]), fast.leaves(X))
+    assert np.array_equal([fast.predict_one(x) for x in X], model.predict(X))
+
+def test_early_exit_exact_and_never_more_trees_when_approx():
+    model, fast, X = forest_and_data()
+    ref = model.predict(X)
+    for x, r in zip(X, ref):
+        label, n_exact = fast.predict_one_early(x)
+        assert label == r
+        for margin in (0, 5, 10, 20):
+            approx, n_approx = fast.predict_one_early(x, margin=margin)
+            assert n_approx <= n_exact
+            if margin >= 5:      # margin 0 = หยุดหลัง block แรกเสมอ (ใช้วัดกรณีดีสุดเท่านั้น)
+                assert approx == label
+
+def test_tree_depths_match_sklearn():
+    model, fast, _ = forest_and_data()
+    assert fast.tree_depths().tolist() == [e.tree_.max_depth for e in model.estimators_]
+
+def test_small_batch_proba_matches_sklearn():
+    model, fast, X = forest_and_data()
+    for h in range(1, 7):        # ทั้ง lockstep (<= SMALL_BATCH) และ leaves() แบบ batch
+        assert np.allclose(fast.predict_proba(X[:h]), model.predict_proba(X[:h]))
@@ -0,0 +1,53 @@
+# tests/test_hand_tracker.py
+from types import SimpleNamespace
+
+import numpy as np
+
+from landmarks import HandTracker
+from telemetry import NULL
+
+def hand(x, y, r=0.05):
+    kps = np.zeros((21, 3), np.float32)
+    kps[:, 0] = np.linspace(x - r, x + r, 21)
+    kps[:, 1] = np.linspace(y - r, y + r, 21)
+    return kps
+
+class FullDetector:
+    """HandDetector stand-in: returns fixed hands for the whole frame."""
+    def __init__(self, hands):
+        self.hands = hands
+        self.kps_buf = np.empty((2, 21, 3), np.float32)
+        self.size = (320, 240)
+        self.tel = NULL
+        self.input_rgb = False
+        self.calls = 0
+
+    def detect(self, frame):
+        self.calls += 1
+        return np.array(self.hands, np.float32), [("Right", 0.99)] * len(self.hands)
+
+class RoiHands:
+    """Hands stand-in for the crop: one centred, confident hand."""
+    def process(self, rgb):
+        lm = [SimpleNamespace(x=x, y=y, z=0.0) for x, y in zip(np.linspace(0.4, 0.6, 21), np.linspace(0.4, 0.6, 21))]
+        cls = SimpleNamespace(classification=[SimpleNamespace(label="Right", score=0.99)])
+        return SimpleNamespace(multi_hand_landmarks=[SimpleNamespace(landmark=lm)], multi_handedness=[cls])
+
+def run(tracker, n):
+    frame = np.zeros((240, 320, 3), np.uint8)
+    for _ in range(n):
+        tracker.detect(frame)
+
+def test_periodic_full_frame_redetect():
+    full = FullDetector([hand(0.5, 0.5)])
+    tracker = HandTracker(full, RoiHands(), redetect_every=5, redetect_ms=0)
+    run(tracker, 12)
+    # เฟรม 0 (ไม่มี ROI), 6, 12 ... = full-frame ; ที่เหลือ crop
+    assert tracker.full_frames == 2 and tracker.roi_frames == 10
+    assert tracker.redetects == 1
+
+def test_hands_far_apart_use_full_frame():
+    full = FullDetector([hand(0.1, 0.2), hand(0.9, 0.8)])
+    tracker = HandTracker(full, RoiHands(), redetect_every=0, redetect_ms=0, max_frac=0.6)
+    run(tracker, 5)
+    assert tracker.roi_frames == 0 and full.calls == 5 and tracker.wide == 5
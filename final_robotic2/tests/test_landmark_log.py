@@ -0,0 +1,57 @@
+# tests/test_landmark_log.py
+import numpy as np
+
+from landmark_log import LandmarkLogWriter, open_log, HEADER_SIZE
+
+def write(path, frames, t0=0.0):
+    w = LandmarkLogWriter(str(path), batch=4)
+    for f in frames:
+        kps = np.full((1, 21, 3), f, dtype=np.float32)
+        w.append(t0 + f, f, kps, [("Right", 0.9)])
+    w.close()
+    return w
+
+def test_resume_after_torn_write(tmp_path):
+    path = tmp_path / "run.lmk"
+    write(path, range(3))
+    with open(path, "ab") as f:
+        f.write(b"\xaa" * 50)             # record ที่เขียนไม่ครบตอนตาย
+    w = write(path, range(3, 6), t0=100.0)
+    assert w.truncated == 50
+
+    recs = open_log(str(path))
+    assert list(recs["frame"]) == [0, 1, 2, 3, 4, 5]
+    assert list(recs["t"][3:]) == [103.0, 104.0, 105.0]
+    assert recs["kps"][5, 0, 0, 0] == 5.0
+    assert (path.stat().st_size - HEADER_SIZE) % recs.dtype.itemsize == 0
+
+def test_resume_after_torn_header(tmp_path):
+    path = tmp_path / "run.lmk"
+    write(path, range(2))
+    data = path.read_bytes()
+    path.write_bytes(data[:HEADER_SIZE // 2])
+    write(path, range(2))
+    assert list(open_log(str(path))["frame"]) == [0, 1]
+
+class RowModel:
+    # แถว proba = ค่า x ของ landmark แรก: เช็คว่าแถวของมือแต่ละมืออยู่ตรงเฟรม
+    classes_ = np.array([0, 1])
+
+    def predict_proba(self, X):
+        return np.stack([X[:, 0], -X[:, 0]], axis=1)
+
+def test_proba_batches_keep_hands_per_frame(tmp_path, monkeypatch):
+    import extract
+    monkeypatch.setattr(extract, "extract_features_batch",
+                        lambda kps, out=None: np.asarray(kps[:, 0, :1], dtype=np.float64))
+    path = tmp_path / "run.lmk"
+    w = LandmarkLogWriter(str(path), batch=4)
+    w.append(0.0, 0, np.full((2, 21, 3), 1.0, dtype=np.float32), [("Left", 0.9), ("Right", 0.9)])
+    w.append(1.0, 1, np.zeros((0, 21, 3), dtype=np.float32), [])
+    w.append(2.0, 2, np.full((1, 21, 3), 3.0, dtype=np.float32), [("Right", 0.9)])
+    w.close()
+
+    from landmark_log import iter_proba_batches
+    chunks = list(iter_proba_batches(open_log(str(path)), RowModel(), chunk=2))
+    assert [list(e) for _, _, e in chunks] == [[2, 2], [1]]
+    assert [list(p[:, 0]) for _, p, _ in chunks] == [[1.0, 1.0], [3.0]]
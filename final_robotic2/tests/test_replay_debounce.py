@@ -0,0 +1,69 @@
+# tests/test_replay_debounce.py
+# replay.py ป้อนเวลาสื่อ (frame / fps) ที่เริ่มจาก 0: ท่าที่ค้างตั้งแต่เฟรมแรกต้องยิงได้ทันที ไม่ติด cooldown
+import numpy as np
+
+import detect as D
+from debounce import FrameDebouncer, GestureDebouncer
+
+LABELS = D.CLASS_LABELS + ["error"]
+FPS = 30.0
+
+def hand(label):
+    proba = np.zeros(len(LABELS))
+    proba[LABELS.index(label)] = 1.0
+    return {"label": label, "handedness": "Right", "proba": proba}
+
+def replay(debouncer, n_frames=90):
+    events = []
+    for frame in range(n_frames):
+        label = D.update_debouncer(debouncer, [hand("ILY")], now=frame / FPS)
+        if label:
+            events.append((frame, label))
+    return events
+
+def test_frames_debouncer_fires_from_t0():
+    deb = FrameDebouncer(stable_frames=5, cooldown_sec=2.0)
+    events = replay(deb)
+    assert events[0] == (4, "ILY")
+    assert deb.stats()["ttt_p50_ms"] < 200
+
+def test_gesture_debouncer_fires_from_t0():
+    deb = GestureDebouncer(LABELS, cooldown_sec=2.0)
+    events = replay(deb)
+    assert events[0][1] == "ILY" and events[0][0] < 10
+    assert deb.stats()["ttt_p50_ms"] < 300
+
+def test_cooldown_still_applies_after_first_event():
+    deb = FrameDebouncer(stable_frames=5, cooldown_sec=2.0)
+    frames = [f for f, _ in replay(deb, 150)]
+    assert frames == [4, 4 + 60, 4 + 120]
+
+def test_gesture_debouncer_ignores_short_blip_at_low_fps():
+    # ค่าดีฟอลต์: ที่ 10 FPS ท่าที่โผล่ 2 เฟรมต้องไม่ยิง แต่ท่าที่ค้างต้องยิงภายใน ~5 เฟรม
+    blip = GestureDebouncer(LABELS, cooldown_sec=2.0)
+    held = GestureDebouncer(LABELS, cooldown_sec=2.0)
+    fired = []
+    for frame in range(20):
+        now = frame / 10.0
+        if D.update_debouncer(blip, [hand("ILY")] if frame < 2 else [], now=now):
+            fired.append(("blip", frame))
+        if D.update_debouncer(held, [hand("ILY")], now=now):
+            fired.append(("held", frame))
+    assert fired and fired[0][0] == "held" and fired[0][1] <= 5
+    assert all(name == "held" for name, _ in fired)
+
+def test_gesture_debouncer_does_not_modify_caller_proba():
+    deb = GestureDebouncer(LABELS, cooldown_sec=2.0)
+    proba = np.zeros(len(LABELS))
+    proba[LABELS.index("error")] = 0.7
+    proba[LABELS.index("ILY")] = 0.3
+    deb.update(proba, now=0.0)
+    assert proba[LABELS.index("error")] == 0.7
+
+def test_gesture_debouncer_stats_and_reset_before_update():
+    deb = GestureDebouncer(LABELS, cooldown_sec=2.0)
+    assert deb.stats() == {"events": 0, "ttt_n": 0}
+    deb.reset()
+    assert replay(deb)[0][1] == "ILY"
+    deb.reset()
+    assert deb.stats()["events"] == 0 and deb.candidate is None
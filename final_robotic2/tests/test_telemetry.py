@@ -0,0 +1,38 @@
+# tests/test_telemetry.py
+import threading, time
+
+import numpy as np
+
+from telemetry import Telemetry
+
+def test_stage_timers_are_per_call():
+    tel = Telemetry()
+    outer = tel.stage("x")
+    with outer:
+        time.sleep(0.05)
+        with tel.stage("x"):           # ชื่อเดียวกันซ้อน/คนละ thread ต้องไม่ทับ t0 กัน
+            pass
+    v = tel._rings["x"].values()
+    assert len(v) == 2 and v.max() >= 0.05 and v.min() < 0.01
+
+def test_stage_from_threads():
+    tel = Telemetry()
+    def work(sec):
+        with tel.stage("s"):
+            time.sleep(sec)
+    threads = [threading.Thread(target=work, args=(s,)) for s in (0.02, 0.08)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    v = np.sort(tel._rings["s"].values())
+    assert v[0] < 0.06 and v[1] >= 0.08
+
+def test_hud_summary_refreshes_on_interval(monkeypatch):
+    tel = Telemetry(hud=True, hud_sec=10.0)
+    frame = np.zeros((200, 300, 3), np.uint8)
+    calls = []
+    summary = tel.summary
+    monkeypatch.setattr(tel, "summary", lambda: calls.append(1) or summary())
+    tel.record("a", 0.01)
+    for _ in range(20):
+        tel.draw_hud(frame)
+    assert len(calls) == 1
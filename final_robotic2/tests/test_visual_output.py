@@ -0,0 +1,20 @@
+# tests/test_visual_output.py
+import numpy as np
+
+import visual_output as VO
+
+def test_banner_shows_until_expiry_and_is_not_cleared_by_render(monkeypatch):
+    icon = np.full((4, 4, 4), 255, np.uint8)
+    monkeypatch.setattr(VO, "_icon_cache", {"Like": icon})
+    monkeypatch.setattr(VO, "DISPLAY_DURATION_SEC", 2.0)
+    now = [100.0]
+    monkeypatch.setattr(VO, "_now", lambda: now[0])
+
+    VO.handle_event("Like")
+    assert VO.apply_overlay(np.zeros((16, 16, 3), np.uint8)).any()
+    now[0] = 103.0
+    assert not VO.apply_overlay(np.zeros((16, 16, 3), np.uint8)).any()
+    # อีเวนต์ใหม่หลังหมดเวลา ต้องไม่ถูก render รอบก่อนลบทิ้ง
+    VO.handle_event("Like")
+    assert VO._banner == ("Like", 105.0)
+    assert VO.apply_overlay(np.zeros((16, 16, 3), np.uint8)).any()
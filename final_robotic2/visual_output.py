@@ -8,8 +8,10 @@ BANNER_POSITION = "center"   # "center" | "top-left" | "top-right" | "bottom-lef
 MAX_ICON_WIDTH = 480
 
 _icon_cache: Dict[str, np.ndarray] = {}
-_active_label = None
-_banner_end_time = 0.0
+# (label, เวลาหมด) เก็บเป็น tuple เดียว: handle_event อาจถูกเรียกจาก thread ของ event bus
+# ขณะ apply_overlay อยู่ใน render loop — อ่าน/เขียนครั้งเดียวจึงไม่ได้ label กับเวลาคนละชุด
+_banner = None
+_now = time.monotonic      # นาฬิกาของป้าย (เทสแทนที่ได้โดยไม่แตะ time ทั้งโปรแกรม)
 
 def init_visual(icon_map: dict, display_sec: float = 2.0, position: str = "center", max_icon_w: int = 480):
     global DISPLAY_DURATION_SEC, BANNER_POSITION, MAX_ICON_WIDTH, _icon_cache
@@ -19,16 +21,14 @@ def init_visual(icon_map: dict, display_sec: float = 2.0, position: str = "cente
     _icon_cache = _load_icons(icon_map)
 
 def handle_event(label: str):
-    global _active_label, _banner_end_time
-    _active_label = label
-    _banner_end_time = time.time() + DISPLAY_DURATION_SEC
+    global _banner
+    _banner = (label, _now() + DISPLAY_DURATION_SEC)
 
 def apply_overlay(frame):
-    global _active_label, _banner_end_time
-    if not _active_label or time.time() > _banner_end_time:
-        _active_label = None
+    banner = _banner        # ไม่ล้างค่าที่นี่ (จะทับอีเวนต์ที่เพิ่งเข้ามา) แค่ดูว่าหมดเวลาหรือยัง
+    if banner is None or _now() > banner[1]:
         return frame
-    icon = _icon_cache.get(_active_label)
+    icon = _icon_cache.get(banner[0])
     if icon is None:
         return frame
     return _overlay_rgba(frame, icon, BANNER_POSITION, margin=24)
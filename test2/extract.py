@@ -1,42 +1,54 @@
 import numpy as np
- 
+
+# ฟีเจอร์ 27 ค่าต่อมือ: ระยะ 12 คู่ แล้วมุมข้อนิ้ว 15 มุม (ลำดับต้องตรงกับตอนเทรนโมเดล)
+PAIRS = [
+    (0, 4), (0, 8), (0, 12), (0, 16), (0, 20),
+    (4, 8), (8, 12), (12, 16), (16, 20),
+    (5, 9), (9, 13), (13, 17)
+]
+
+ANGLES = [
+    (0, 1, 2), (1, 2, 3), (2, 3, 4),
+    (0, 5, 6), (5, 6, 7), (6, 7, 8),
+    (0, 9,10), (9,10,11), (10,11,12),
+    (0,13,14), (13,14,15), (14,15,16),
+    (0,17,18), (17,18,19), (18,19,20)
+]
+
+# index arrays สำหรับ fancy indexing (คำนวณครั้งเดียวตอน import)
+_PI, _PJ = (np.array(c) for c in zip(*PAIRS))
+_AA, _AB, _AC = (np.array(c) for c in zip(*ANGLES))
+
 def euclidean(p1, p2):
     return np.linalg.norm(np.array(p1) - np.array(p2))
- 
+
 def angle_between(a, b, c):
     ba = np.array(a) - np.array(b)
     bc = np.array(c) - np.array(b)
     cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc) + 1e-6)
-    return np.arccos(np.clip(cosine_angle, -1.0, 1.0))  
- 
+    return np.arccos(np.clip(cosine_angle, -1.0, 1.0))
+
+def extract_features_batch(keypoints):
+    """(N, 21, 3) -> (N, 27) ทุกมือในครั้งเดียว (ไม่มี loop ต่อคู่/ต่อมุม)"""
+    keypoints = np.asarray(keypoints, dtype=np.float64)
+    if keypoints.ndim != 3 or keypoints.shape[1:] != (21, 3):
+        raise ValueError("Expected input shape (N, 21, 3), got {}".format(keypoints.shape))
+
+    d = keypoints[:, _PI] - keypoints[:, _PJ]
+    dist = np.sqrt(np.einsum("nki,nki->nk", d, d))
+
+    b  = keypoints[:, _AB]
+    ba = keypoints[:, _AA] - b
+    bc = keypoints[:, _AC] - b
+    dot = np.einsum("nki,nki->nk", ba, bc)
+    norm = np.sqrt(np.einsum("nki,nki->nk", ba, ba) * np.einsum("nki,nki->nk", bc, bc))
+    ang = np.arccos(np.clip(dot / (norm + 1e-6), -1.0, 1.0))
+    return np.concatenate([dist, ang], axis=1)
+
 def extract_features(keypoints):
- 
-    keypoints = np.array(keypoints)
+
+    keypoints = np.asarray(keypoints, dtype=np.float64)
     if keypoints.shape != (21, 3):
         raise ValueError("Expected input shape (21, 3), got {}".format(keypoints.shape))
- 
-    features = []
- 
-    pairs = [
-        (0, 4), (0, 8), (0, 12), (0, 16), (0, 20),
-        (4, 8), (8, 12), (12, 16), (16, 20),    
-        (5, 9), (9, 13), (13, 17)
-    ]
- 
-    for i, j in pairs:
-        dist = euclidean(keypoints[i], keypoints[j])
-        features.append(dist)
- 
-    angles = [
-        (0, 1, 2), (1, 2, 3), (2, 3, 4),
-        (0, 5, 6), (5, 6, 7), (6, 7, 8),
-        (0, 9,10), (9,10,11), (10,11,12),
-        (0,13,14), (13,14,15), (14,15,16),
-        (0,17,18), (17,18,19), (18,19,20)
-    ]
- 
-    for a, b, c in angles:
-        ang = angle_between(keypoints[a], keypoints[b], keypoints[c])
-        features.append(ang)
- 
-    return np.array(features)
\ No newline at end of file
+
+    return extract_features_batch(keypoints[None])[0]
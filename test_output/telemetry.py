@@ -0,0 +1,197 @@
+# telemetry.py
+# จับเวลาแต่ละ stage ด้วย monotonic clock เก็บใน ring buffer ขนาดคงที่
+# สรุป p50/p95/p99 วาด HUD บนเฟรม และเขียนสรุปเป็นช่วง ๆ ลง JSONL / CSV
+# ถ้า enabled=False ทุก method แทบไม่มีต้นทุน (return ทันที)
+import json, os, time
+import cv2
+import numpy as np
+
+class _Ring:
+    __slots__ = ("buf", "idx", "count", "total")
+
+    def __init__(self, size):
+        self.buf = np.zeros(size, dtype=np.float64)
+        self.idx = 0
+        self.count = 0
+        self.total = 0
+
+    def add(self, v):
+        self.buf[self.idx] = v
+        self.idx = (self.idx + 1) % len(self.buf)
+        if self.count < len(self.buf):
+            self.count += 1
+        self.total += 1
+
+    def values(self):
+        return self.buf[:self.count]
+
+
+class _StageTimer:
+    # ตัวใหม่ทุกครั้งที่เรียก stage(): t0 เป็นของการเรียกนั้น ใช้ชื่อเดียวกันจากหลาย thread ได้
+    __slots__ = ("tel", "name", "t0")
+
+    def __init__(self, tel, name):
+        self.tel, self.name = tel, name
+        self.t0 = time.monotonic()
+
+    def __enter__(self):
+        self.t0 = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        self.tel.record(self.name, time.monotonic() - self.t0)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL = _NullTimer()
+
+
+class Telemetry:
+    """Per-stage latency statistics.
+
+        t = tel.start(); ...; tel.stop("read", t)
+        with tel.stage("hands.process"): ...
+        tel.frame()                       # once per displayed frame (FPS)
+        tel.draw_hud(frame); tel.maybe_flush()
+
+    `path` ending in .csv writes one row per stage per flush, anything else
+    writes one JSON object per flush. The HUD redraws every frame but its
+    percentiles are recomputed only every `hud_sec`.
+    """
+
+    def __init__(self, enabled=True, window=512, path=None, flush_sec=5.0, hud=False, hud_sec=0.5):
+        self.enabled = enabled
+        self.window = window
+        self.path = path
+        self.flush_sec = flush_sec
+        self.hud = hud and enabled
+        self.hud_sec = hud_sec
+        self._rings = {}
+        self._hud_lines = []
+        self._hud_time = 0.0
+        self._frame_times = _Ring(window)
+        self._last_frame = 0.0
+        self._last_flush = time.monotonic()
+        self._t0 = time.time()
+        self._fh = None
+        if enabled and path:
+            new = not os.path.isfile(path) or os.path.getsize(path) == 0
+            self._fh = open(path, "a", buffering=1)
+            if path.endswith(".csv") and new:
+                self._fh.write("time,stage,count,mean_ms,p50_ms,p95_ms,p99_ms,max_ms\n")
+
+    # ---------- recording ----------
+    def start(self):
+        return time.monotonic() if self.enabled else 0.0
+
+    def stop(self, name, t0):
+        if self.enabled:
+            self.record(name, time.monotonic() - t0)
+
+    def record(self, name, seconds):
+        ring = self._rings.get(name)
+        if ring is None:
+            ring = self._rings[name] = _Ring(self.window)
+        ring.add(seconds)
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL
+        return _StageTimer(self, name)
+
+    def frame(self):
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if self._last_frame:
+            self._frame_times.add(now - self._last_frame)
+        self._last_frame = now
+
+    # ---------- summaries ----------
+    def fps(self):
+        v = self._frame_times.values()
+        return 1.0 / v.mean() if len(v) and v.mean() > 0 else 0.0
+
+    def summary(self):
+        out = {}
+        for name, ring in self._rings.items():
+            v = ring.values() * 1e3
+            if not len(v):
+                continue
+            p50, p95, p99 = np.percentile(v, (50, 95, 99))
+            out[name] = {"count": ring.total, "mean_ms": float(v.mean()), "p50_ms": float(p50),
+                         "p95_ms": float(p95), "p99_ms": float(p99), "max_ms": float(v.max())}
+        return out
+
+    def format_summary(self):
+        lines = [f"FPS {self.fps():.1f}"]
+        for name, s in self.summary().items():
+            lines.append(f"{name:16s} p50 {s['p50_ms']:6.2f}  p95 {s['p95_ms']:6.2f}  "
+                         f"p99 {s['p99_ms']:6.2f} ms  (n={s['count']})")
+        return "\n".join(lines)
+
+    def draw_hud(self, frame, origin=(10, 80)):
+        if not self.hud:
+            return frame
+        x, y = origin
+        now = time.monotonic()
+        if now - self._hud_time >= self.hud_sec:
+            # percentile ของทุก stage แพงเกินจะทำทุกเฟรม: คำนวณใหม่ทุก hud_sec
+            self._hud_time = now
+            self._hud_lines = [f"FPS {self.fps():.1f}"] + [f"{n}: {s['p50_ms']:.1f}/{s['p95_ms']:.1f} ms"
+                                                           for n, s in self.summary().items()]
+        for i, text in enumerate(self._hud_lines):
+            cv2.putText(frame, text, (x, y + 22 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 255, 255), 1)
+        return frame
+
+    # ---------- export ----------
+    def flush(self):
+        if self._fh is None:
+            return
+        now = time.time()
+        summary = self.summary()
+        if self.path.endswith(".csv"):
+            for name, s in summary.items():
+                self._fh.write(f"{now:.3f},{name},{s['count']},{s['mean_ms']:.3f},{s['p50_ms']:.3f},"
+                               f"{s['p95_ms']:.3f},{s['p99_ms']:.3f},{s['max_ms']:.3f}\n")
+            self._fh.write(f"{now:.3f},fps,{self._frame_times.total},{self.fps():.3f},,,,\n")
+        else:
+            self._fh.write(json.dumps({"time": round(now, 3), "uptime_sec": round(now - self._t0, 3),
+                                       "fps": round(self.fps(), 3), "stages": summary}) + "\n")
+
+    def maybe_flush(self):
+        if self._fh is None or self.flush_sec <= 0:
+            return
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_sec:
+            self._last_flush = now
+            self.flush()
+
+    def close(self):
+        if self._fh is not None:
+            self.flush()
+            self._fh.close()
+            self._fh = None
+
+
+def from_env(prefix="TELEMETRY"):
+    """Telemetry configured by TELEMETRY=1, TELEMETRY_HUD=1, TELEMETRY_OUT=path, TELEMETRY_FLUSH_SEC,
+    TELEMETRY_HUD_SEC."""
+    return Telemetry(enabled=os.environ.get(prefix, "0") == "1",
+                     window=int(os.environ.get(f"{prefix}_WINDOW", 512)),
+                     path=os.environ.get(f"{prefix}_OUT") or None,
+                     flush_sec=float(os.environ.get(f"{prefix}_FLUSH_SEC", 5.0)),
+                     hud=os.environ.get(f"{prefix}_HUD", "0") == "1",
+                     hud_sec=float(os.environ.get(f"{prefix}_HUD_SEC", 0.5)))
+
+# ใช้เป็นค่า default ของ parameter telemetry ในโมดูลอื่น (ไม่ต้องเช็ค None)
+NULL = Telemetry(enabled=False)
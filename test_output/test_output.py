@@ -4,6 +4,10 @@ import sys, time, cv2, numpy as np, os, subprocess, re
 
 import audio_output as AO
 import visual_output as VO
+import telemetry
+
+# TELEMETRY=1 -> จับเวลา handle_event / overlay / imshow (TELEMETRY_HUD=1, TELEMETRY_OUT=file.jsonl|.csv)
+tel = telemetry.from_env()
 
 # ---------------- CONFIG ----------------
 AUDIO_MAP = {
@@ -112,17 +116,24 @@ def one_shot_test(label: str):
     place_window_on_hdmi(WINDOW_ONESHOT)
 
     # ยิงอีเวนต์
-    AO.handle_event(label)
-    VO.handle_event(label)
+    with tel.stage("handle_event"):
+        AO.handle_event(label)
+        VO.handle_event(label)
 
     t_end = time.time() + DISPLAY_DURATION_SEC + 0.2
     while time.time() <= t_end:
         frame = np.zeros((FRAME_H, FRAME_W, 3), dtype=np.uint8)
-        frame = VO.apply_overlay(frame)
+        with tel.stage("overlay"):
+            frame = VO.apply_overlay(frame)
         cv2.putText(frame, f"TEST CLASS: {label}", (20, 50),
                     cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 2)
-        cv2.imshow(WINDOW_ONESHOT, frame)
-        if cv2.waitKey(1) & 0xFF == 27:  # ESC
+        tel.draw_hud(frame)
+        with tel.stage("imshow"):
+            cv2.imshow(WINDOW_ONESHOT, frame)
+            key = cv2.waitKey(1) & 0xFF
+        tel.frame()
+        tel.maybe_flush()
+        if key == 27:  # ESC
             break
     cv2.destroyAllWindows()
 
@@ -147,19 +158,24 @@ def interactive_mode():
 
     while True:
         frame = np.zeros((FRAME_H, FRAME_W, 3), dtype=np.uint8)
-        frame = VO.apply_overlay(frame)
+        with tel.stage("overlay"):
+            frame = VO.apply_overlay(frame)
         cv2.putText(frame, "Press 1..5 to trigger class, ESC to exit",
                     (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (200, 200, 200), 2)
+        tel.draw_hud(frame)
         cv2.imshow(WINDOW_INTERACTIVE, frame)
 
         k = cv2.waitKey(15) & 0xFF
+        tel.frame()
+        tel.maybe_flush()
         if k == 27:
             break
         if k in label_keys:
             lbl = label_keys[k]
             print(f"-> Trigger: {lbl}")
-            AO.handle_event(lbl)
-            VO.handle_event(lbl)
+            with tel.stage("handle_event"):
+                AO.handle_event(lbl)
+                VO.handle_event(lbl)
 
     cv2.destroyAllWindows()
 
@@ -176,3 +192,6 @@ if __name__ == "__main__":
         one_shot_test(label)
     else:
         interactive_mode()
+    if tel.enabled:
+        print(tel.format_summary())
+        tel.close()